@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.dependencies import UserContext, get_current_user
+from app.services import ai_service
+
+router = APIRouter(prefix=f"{settings.API_V1_PREFIX}/ai")
+
+
+@router.get("/suggestions/{suggestion_id}/stream", response_class=StreamingResponse)
+async def stream_suggestion(
+    suggestion_id: str,
+    current_user: UserContext = Depends(get_current_user),
+) -> StreamingResponse:
+    events = await ai_service.stream_suggestion(current_user.user_id, suggestion_id)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Sem cache nem buffer de proxy: cada evento sai assim que gerado
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
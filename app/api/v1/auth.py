@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from supabase import Client
 
-from app.core.dependencies import get_supabase_client
+from app.core.config import settings
+from app.core.dependencies import get_supabase_auth_client, get_supabase_client
+from app.core.supabase_client import SupabaseClient
 
 _bearer = HTTPBearer()
 from app.schemas.auth import (
@@ -22,60 +23,60 @@ from app.schemas.auth import (
 )
 from app.services import auth_service
 
-router = APIRouter()
+router = APIRouter(prefix=f"{settings.API_V1_PREFIX}/auth")
 
 
 @router.post("/register", response_model=RegisterResponse, status_code=201)
-def register(
+async def register(
     data: RegisterRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> RegisterResponse:
-    return auth_service.register(data, supabase)
+    return await auth_service.register(data, supabase)
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(
+async def login(
     data: LoginRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> LoginResponse:
-    return auth_service.login(data, supabase)
+    return await auth_service.login(data, supabase)
 
 
 @router.post("/refresh", response_model=RefreshResponse)
-def refresh(
+async def refresh(
     data: RefreshRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> RefreshResponse:
-    return auth_service.refresh(data, supabase)
+    return await auth_service.refresh(data, supabase)
 
 
 @router.post("/forgot-password", response_model=ForgotPasswordResponse)
-def forgot_password(
+async def forgot_password(
     data: ForgotPasswordRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> ForgotPasswordResponse:
-    return auth_service.forgot_password(data, supabase)
+    return await auth_service.forgot_password(data, supabase)
 
 
 @router.post("/reset-password", response_model=ResetPasswordResponse)
-def reset_password(
+async def reset_password(
     data: ResetPasswordRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> ResetPasswordResponse:
-    return auth_service.reset_password(data, supabase)
+    return await auth_service.reset_password(data, supabase)
 
 
 @router.post("/logout", response_model=LogoutResponse)
-def logout(
+async def logout(
     credentials: HTTPAuthorizationCredentials = Depends(_bearer),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> LogoutResponse:
-    return auth_service.logout(credentials.credentials, supabase)
+    return await auth_service.logout(credentials.credentials, supabase)
 
 
 @router.post("/resend-confirmation", response_model=ResendConfirmationResponse)
-def resend_confirmation(
+async def resend_confirmation(
     data: ResendConfirmationRequest,
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_auth_client),
 ) -> ResendConfirmationResponse:
-    return auth_service.resend_confirmation(data, supabase)
+    return await auth_service.resend_confirmation(data, supabase)
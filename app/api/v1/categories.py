@@ -3,9 +3,10 @@ from __future__ import annotations
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
-from supabase import Client
 
+from app.core.config import settings
 from app.core.dependencies import UserContext, get_current_user, get_supabase_client
+from app.core.supabase_client import SupabaseClient
 from app.schemas.category import (
     CategoriesListResponse,
     CategoryCreateRequest,
@@ -15,41 +16,41 @@ from app.schemas.category import (
 )
 from app.services import category_service
 
-router = APIRouter()
+router = APIRouter(prefix=f"{settings.API_V1_PREFIX}/categories")
 
 
 @router.get("/", response_model=CategoriesListResponse)
-def list_categories(
+async def list_categories(
     type: Annotated[str | None, Query(description="Filtrar por tipo: fixa, variavel")] = None,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> CategoriesListResponse:
-    return category_service.list_categories(current_user.user_id, type, supabase)
+    return await category_service.list_categories(current_user.user_id, type, supabase)
 
 
 @router.post("/", response_model=CategoryResponse, status_code=201)
-def create_category(
+async def create_category(
     data: CategoryCreateRequest,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> CategoryResponse:
-    return category_service.create_category(current_user.user_id, data, supabase)
+    return await category_service.create_category(current_user.user_id, data, supabase)
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_id: int,
     data: CategoryUpdateRequest,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> CategoryResponse:
-    return category_service.update_category(current_user.user_id, category_id, data, supabase)
+    return await category_service.update_category(current_user.user_id, category_id, data, supabase)
 
 
 @router.delete("/{category_id}", response_model=CategoryDeleteResponse)
-def delete_category(
+async def delete_category(
     category_id: int,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> CategoryDeleteResponse:
-    return category_service.delete_category(current_user.user_id, category_id, supabase)
+    return await category_service.delete_category(current_user.user_id, category_id, supabase)
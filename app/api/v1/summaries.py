@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.core.dependencies import UserContext, get_current_user, get_supabase_client
+from app.core.supabase_client import SupabaseClient
+from app.schemas.summary import MonthlySummaryResponse
+from app.services import summary_service
+
+router = APIRouter(prefix=f"{settings.API_V1_PREFIX}/summaries")
+
+
+@router.get("/monthly", response_model=MonthlySummaryResponse)
+async def get_monthly_summary(
+    month: str | None = Query(None, pattern=r"^\d{4}-\d{2}$", description="AAAA-MM; padrão: mês anterior"),
+    current_user: UserContext = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase_client),
+) -> MonthlySummaryResponse:
+    return await summary_service.get_monthly_summary(current_user.user_id, month, supabase)
@@ -1,83 +1,138 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
-from supabase import Client
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
+from app.core.config import settings
 from app.core.dependencies import UserContext, get_current_user, get_supabase_client
+from app.core.supabase_client import SupabaseClient
 from app.schemas.transaction import (
+    TransactionBatchRequest,
+    TransactionBatchResponse,
     TransactionCreateRequest,
     TransactionDeleteResponse,
+    TransactionImportResponse,
     TransactionResponse,
     TransactionSummary,
     TransactionUpdateRequest,
     TransactionsListResponse,
 )
-from app.services import transaction_service
+from app.services import transaction_import_service, transaction_service
 
-router = APIRouter()
+router = APIRouter(prefix=f"{settings.API_V1_PREFIX}/transactions")
 
 
 @router.get("/summary", response_model=TransactionSummary)
-def get_summary(
+async def get_summary(
     date_from: Annotated[Optional[date], Query()] = None,
     date_to: Annotated[Optional[date], Query()] = None,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionSummary:
-    return transaction_service.get_summary(current_user.user_id, date_from, date_to, supabase)
+    return await transaction_service.get_summary(current_user.user_id, date_from, date_to, supabase)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_transactions(
+    format: Annotated[Literal["csv", "ndjson"], Query(description="csv (compatível com o import) ou ndjson")] = "csv",
+    type: Annotated[Optional[str], Query(description="entrada ou saida")] = None,
+    category_id: Annotated[Optional[int], Query()] = None,
+    date_from: Annotated[Optional[date], Query()] = None,
+    date_to: Annotated[Optional[date], Query()] = None,
+    current_user: UserContext = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase_client),
+) -> StreamingResponse:
+    body = await transaction_service.export_transactions(
+        current_user.user_id, format, type, category_id, date_from, date_to, supabase,
+    )
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"transacoes-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/", response_model=TransactionsListResponse)
-def list_transactions(
+async def list_transactions(
     type: Annotated[Optional[str], Query(description="entrada ou saida")] = None,
     category_id: Annotated[Optional[int], Query()] = None,
     date_from: Annotated[Optional[date], Query()] = None,
     date_to: Annotated[Optional[date], Query()] = None,
     limit: Annotated[int, Query(ge=1, le=100)] = 50,
     offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Annotated[Optional[str], Query(description="next_cursor da página anterior")] = None,
+    total: Annotated[
+        Optional[Literal["exact", "estimated", "none"]],
+        Query(description="Contagem do total; padrão exact sem cursor e none com cursor"),
+    ] = None,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionsListResponse:
-    return transaction_service.list_transactions(
-        current_user.user_id, type, category_id, date_from, date_to, limit, offset, supabase
+    return await transaction_service.list_transactions(
+        current_user.user_id, type, category_id, date_from, date_to, limit, offset, supabase,
+        cursor=cursor, total_mode=total,
     )
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(
+async def get_transaction(
     transaction_id: int,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionResponse:
-    return transaction_service.get_transaction(current_user.user_id, transaction_id, supabase)
+    return await transaction_service.get_transaction(current_user.user_id, transaction_id, supabase)
 
 
 @router.post("/", response_model=TransactionResponse, status_code=201)
-def create_transaction(
+async def create_transaction(
     data: TransactionCreateRequest,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionResponse:
-    return transaction_service.create_transaction(current_user.user_id, data, supabase)
+    return await transaction_service.create_transaction(current_user.user_id, data, supabase)
+
+
+@router.post("/import", response_model=TransactionImportResponse)
+async def import_transactions(
+    file: Annotated[UploadFile, File(description="Extrato em CSV (, ou ;) ou OFX")],
+    category_id: Annotated[
+        Optional[int],
+        Form(description="Categoria das linhas sem categoria; obrigatória no OFX"),
+    ] = None,
+    current_user: UserContext = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase_client),
+) -> TransactionImportResponse:
+    return await transaction_import_service.import_transactions(current_user.user_id, file, category_id, supabase)
+
+
+@router.post("/batch", response_model=TransactionBatchResponse)
+async def batch_transactions(
+    data: TransactionBatchRequest,
+    current_user: UserContext = Depends(get_current_user),
+    supabase: SupabaseClient = Depends(get_supabase_client),
+) -> TransactionBatchResponse:
+    return await transaction_service.batch_transactions(current_user.user_id, data, supabase)
 
 
 @router.put("/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     data: TransactionUpdateRequest,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionResponse:
-    return transaction_service.update_transaction(current_user.user_id, transaction_id, data, supabase)
+    return await transaction_service.update_transaction(current_user.user_id, transaction_id, data, supabase)
 
 
 @router.delete("/{transaction_id}", response_model=TransactionDeleteResponse)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
     current_user: UserContext = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client),
+    supabase: SupabaseClient = Depends(get_supabase_client),
 ) -> TransactionDeleteResponse:
-    return transaction_service.delete_transaction(current_user.user_id, transaction_id, supabase)
+    return await transaction_service.delete_transaction(current_user.user_id, transaction_id, supabase)
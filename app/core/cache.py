@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+class CacheBackend(Protocol):
+    """Cache chave -> valor serializável em JSON, com TTL por entrada."""
+
+    async def get(self, key: str) -> Any | None: ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Grava só se a chave não existe; True se gravou."""
+        ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryCache:
+    """LRU em processo. Cada worker tem o seu: invalidações não se propagam.
+
+    Só é acessado do event loop, sem awaits no meio.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    """Cache compartilhado entre workers. Valores gravados como JSON.
+
+    `client` permite injetar outro cliente compatível (ex.: fakeredis.aioredis).
+    Falhas do Redis viram cache miss: o chamador segue para o banco.
+    """
+
+    def __init__(self, url: str = "", client: Any | None = None, prefix: str = "clarix:") -> None:
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._redis = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any | None:
+        try:
+            raw = await self._redis.get(self.prefix + key)
+        except Exception as exc:
+            logger.warning("cache_get_failed", key=key, error=str(exc))
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._redis.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+        except Exception as exc:
+            logger.warning("cache_set_failed", key=key, error=str(exc))
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        # Sem Redis não há como coordenar: quem chamou segue como se tivesse gravado
+        try:
+            return bool(await self._redis.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000), nx=True))
+        except Exception as exc:
+            logger.warning("cache_add_failed", key=key, error=str(exc))
+            return True
+
+    async def delete(self, key: str) -> None:
+        # Falha aqui deixa dado velho até o TTL; vai para o log como erro
+        try:
+            await self._redis.delete(self.prefix + key)
+        except Exception as exc:
+            logger.error("cache_delete_failed", key=key, error=str(exc))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _build() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCache(settings.REDIS_URL)
+        except ImportError:
+            logger.error("redis_not_installed_using_memory_cache")
+    return MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+
+cache: CacheBackend = _build()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable
+
+from app.core.config import settings
+
+
+async def gather(*aws: Awaitable[Any]) -> list[Any]:
+    """Executa chamadas independentes em paralelo e devolve os resultados em ordem.
+
+    No máximo SUPABASE_FANOUT_LIMIT chamadas ficam em voo por vez, para que uma
+    única requisição não monopolize o pool de conexões do Supabase.
+    """
+    semaphore = asyncio.Semaphore(settings.SUPABASE_FANOUT_LIMIT)
+
+    async def _run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_run(aw) for aw in aws))
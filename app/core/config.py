@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -26,15 +28,69 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str
     SUPABASE_JWT_SECRET: str
 
+    # Supabase Auth — cache do JWKS
+    SUPABASE_JWKS_TTL: int = 600  # segundos até recarregar em background
+    SUPABASE_JWKS_MIN_REFRESH_INTERVAL: float = 30.0  # entre recargas por kid desconhecido
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # tokens verificados em memória; 0 desativa
+
+    # Supabase — pool HTTP compartilhado pelo processo
+    SUPABASE_ASYNC: bool = True  # false = cliente sync no threadpool (A/B)
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 100
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_HTTP_TIMEOUT: float = 10.0
+    SUPABASE_HTTP2: bool = True  # exige o extra httpx[http2] (pacote h2)
+    SUPABASE_FANOUT_LIMIT: int = 4  # consultas paralelas por requisição
+    SLOW_QUERY_MS: float = 200.0  # acima disso a consulta vai para o log como slow_query
+    RPC_MISSING_RECHECK_SECONDS: int = 300  # RPC ausente volta a ser tentada depois disso
+
+    # Cache de leitura (categorias do usuário)
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"  # redis para vários workers
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 10000  # só no backend memory
+    CATEGORY_CACHE_TTL: int = 300  # segundos
+
+    # Importação de extratos (POST /transactions/import)
+    TRANSACTION_IMPORT_BATCH_SIZE: int = 500  # linhas por INSERT
+    TRANSACTION_IMPORT_MAX_ROWS: int = 100000
+    TRANSACTION_IMPORT_MAX_ERRORS: int = 100  # erros detalhados na resposta
+    TRANSACTION_EXPORT_CHUNK_SIZE: int = 1000  # linhas por busca; acima do max-rows do PostgREST só encolhe o bloco
+
     # AbacatePay
     ABACATEPAY_API_KEY: str = ""
     ABACATEPAY_BASE_URL: str = "https://api.abacatepay.com"
+    ABACATEPAY_HTTP_TIMEOUT: float = 10.0
+
+    # Outbox (chamadas externas fora do caminho da requisição)
+    OUTBOX_BACKEND: Literal["supabase", "sqlite"] = "supabase"  # sqlite para rodar sem a migration
+    OUTBOX_SQLITE_PATH: str = "outbox.sqlite3"
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 20  # eventos por busca, processados em paralelo
+    OUTBOX_POLL_INTERVAL: float = 2.0  # segundos entre buscas com a fila vazia
+    OUTBOX_LEASE_SECONDS: int = 60  # evento reservado volta à fila se o worker morrer
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 5.0  # dobra a cada tentativa, até 1 h
 
     # Trial
     TRIAL_DAYS: int = 14
 
+    # Jobs agendados (app/tasks/scheduler.py)
+    SCHEDULER_ENABLED: bool = True
+    TRIAL_EXPIRY_INTERVAL_MINUTES: int = 15
+    TRIAL_EXPIRY_CHUNK_SIZE: int = 1000  # usuários por UPDATE
+    MONTHLY_SUMMARY_HOUR: int = 3  # hora UTC da rodada diária; mês já calculado só confere o checkpoint
+    MONTHLY_SUMMARY_CHUNK_SIZE: int = 500  # usuários por ida ao banco
+    MONTHLY_SUMMARY_WORKERS: int = 4  # pedaços processados em paralelo
+    MONTHLY_SUMMARY_LEASE_SECONDS: int = 300  # renovado a cada pedaço; expira se o processo morrer
+    GOAL_ALERT_HOUR: int = 11  # hora UTC da varredura diária (8h em Brasília)
+    GOAL_ALERT_CHUNK_SIZE: int = 2000  # metas por chamada
+    GOAL_ALERT_NEAR_RATIO: float = 0.9  # fração do alvo que conta como perto de concluir
+    GOAL_ALERT_PAUSE_SECONDS: float = 0.05  # intervalo entre pedaços, para não sobrecarregar o PostgREST
+
     # Anthropic
     ANTHROPIC_API_KEY: str = ""
+    AI_TIMEOUT_SECONDS: float = 3.0  # prazo total da sugestão; estourou, usa o texto padrão
+    AI_SUGGESTION_CACHE_TTL: int = 86400  # segundos
 
 
 settings = Settings()
@@ -4,10 +4,9 @@ from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from supabase import Client, create_client
 
-from app.core.config import settings
 from app.core.security import verify_supabase_token
+from app.core.supabase_client import SupabaseClient, supabase_registry
 
 bearer_scheme = HTTPBearer()
 
@@ -18,8 +17,13 @@ class UserContext:
     email: str
 
 
-def get_supabase_client() -> Client:
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+def get_supabase_client() -> SupabaseClient:
+    return supabase_registry.client
+
+
+def get_supabase_auth_client() -> SupabaseClient:
+    """Cliente com sessão isolada para rotas que chamam sign_in/refresh/set_session."""
+    return supabase_registry.new_session_client()
 
 
 async def get_current_user(
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from anyio import to_thread
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from app.core.security import token_cache
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Buckets em segundos: do cache quente (~1ms) até o timeout do Supabase (10s)
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota (template, não o path bruto)",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requisições HTTP em andamento")
+
+# ── Supabase ──────────────────────────────────────────────────────────────────
+
+SUPABASE_QUERY_SECONDS = Histogram(
+    "supabase_query_duration_seconds",
+    "Latência das chamadas ao Supabase por método de repositório",
+    ["caller", "operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+# ── Serviços externos (Anthropic, AbacatePay) ─────────────────────────────────
+
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds",
+    "Latência das chamadas a serviços externos",
+    ["service", "operation"],
+    buckets=_EXTERNAL_BUCKETS,
+)
+EXTERNAL_CALL_ERRORS = Counter(
+    "external_call_errors_total",
+    "Chamadas a serviços externos que falharam",
+    ["service", "operation"],
+)
+
+# ── Runtime (atualizado a cada scrape) ────────────────────────────────────────
+
+THREADPOOL_BUSY = Gauge("threadpool_busy_threads", "Threads do threadpool do anyio em uso")
+THREADPOOL_SIZE = Gauge("threadpool_max_threads", "Limite de threads do threadpool do anyio")
+TOKEN_CACHE_ENTRIES = Gauge("auth_token_cache_entries", "Tokens verificados em cache")
+TOKEN_CACHE_HIT_RATE = Gauge("auth_token_cache_hit_rate", "Taxa de acerto do cache de tokens")
+
+
+@contextmanager
+def track_external(service: str, operation: str) -> Iterator[None]:
+    """Mede uma chamada externa; exceções contam como erro e seguem adiante."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_CALL_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation).observe(time.perf_counter() - start)
+
+
+def render() -> bytes:
+    """Atualiza os gauges de runtime e serializa o registry. Chamar no event loop."""
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+    stats = token_cache.stats()
+    TOKEN_CACHE_ENTRIES.set(stats["size"])
+    TOKEN_CACHE_HIT_RATE.set(stats["hit_rate"])
+    return generate_latest()
@@ -5,11 +5,22 @@ import structlog
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import metrics, query_stats
 from app.core.config import settings
 
 logger = structlog.get_logger()
 
 
+def _route_template(request: Request) -> str:
+    """Template da rota atendida (ex.: /api/v1/goals/{goal_id}).
+
+    Vem de scope["route"].path, por isso cada APIRouter declara o prefixo completo.
+    Mantém a cardinalidade das métricas baixa; requisições sem rota viram "unmatched".
+    """
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
 def register_middlewares(app: FastAPI) -> None:
     app.add_middleware(
         CORSMiddleware,
@@ -24,9 +35,20 @@ def register_middlewares(app: FastAPI) -> None:
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
 
+        # Criado antes de call_next: a task do endpoint herda o contexto
+        db = query_stats.begin_request()
         start = time.perf_counter()
-        response = await call_next(request)
-        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        metrics.HTTP_IN_FLIGHT.inc()
+        try:
+            response = await call_next(request)
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - start
+        duration_ms = round(elapsed * 1000, 2)
+
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            request.method, _route_template(request), str(response.status_code),
+        ).observe(elapsed)
 
         logger.info(
             "http_request",
@@ -35,7 +57,14 @@ def register_middlewares(app: FastAPI) -> None:
             path=request.url.path,
             status_code=response.status_code,
             duration_ms=duration_ms,
+            db_queries=db.count,
+            db_ms=db.total_ms,
         )
+        duplicates = db.duplicates()
+        if duplicates:
+            logger.warning("repeated_queries", request_id=request_id, path=request.url.path, queries=duplicates)
 
         response.headers["X-Request-ID"] = request_id
+        if settings.DEBUG:
+            response.headers["Server-Timing"] = query_stats.server_timing(db, duration_ms)
         return response
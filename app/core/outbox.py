@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Protocol
+
+import structlog
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.supabase_client import supabase_registry
+from app.repositories.outbox_repository import OutboxRepository
+
+logger = structlog.get_logger()
+
+_MAX_RETRY_DELAY = 3600.0
+
+
+@dataclass
+class OutboxEvent:
+    id: int
+    kind: str
+    payload: dict
+    idempotency_key: str
+    attempts: int  # já contando a tentativa atual
+
+
+class PermanentError(Exception):
+    """Falha que não adianta repetir (ex.: 4xx do serviço externo): o evento vira dead."""
+
+
+Handler = Callable[[OutboxEvent], Awaitable[None]]
+
+
+class OutboxStore(Protocol):
+    """Fila durável de eventos com reserva por lease."""
+
+    async def enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None: ...
+
+    async def claim(self, limit: int, lease_seconds: int) -> list[OutboxEvent]: ...
+
+    async def complete(self, event_ids: list[int]) -> None: ...
+
+    async def retry(self, event_id: int, error: str, delay: float | None) -> None: ...
+
+
+class SupabaseOutbox:
+    """Tabela public.outbox, compartilhada por todos os workers."""
+
+    def _repo(self) -> OutboxRepository:
+        return OutboxRepository(supabase_registry.client)
+
+    async def enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None:
+        await self._repo().enqueue(kind, payload, idempotency_key)
+
+    async def claim(self, limit: int, lease_seconds: int) -> list[OutboxEvent]:
+        rows = await self._repo().claim(limit, lease_seconds)
+        return [
+            OutboxEvent(r["id"], r["kind"], r["payload"], r["idempotency_key"], r["attempts"])
+            for r in rows
+        ]
+
+    async def complete(self, event_ids: list[int]) -> None:
+        await self._repo().complete(event_ids)
+
+    async def retry(self, event_id: int, error: str, delay: float | None) -> None:
+        next_attempt_at = None if delay is None else datetime.now(timezone.utc) + timedelta(seconds=delay)
+        await self._repo().retry(event_id, error, next_attempt_at)
+
+
+class SQLiteOutbox:
+    """Fila local em SQLite, para rodar sem a migration (dev, testes, instância única).
+
+    Sobrevive a reinícios do processo, mas não é compartilhada entre máquinas.
+    As operações rodam no threadpool; BEGIN IMMEDIATE serializa as reservas
+    entre workers que usam o mesmo arquivo.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute(
+                """
+                create table if not exists outbox (
+                    id              integer primary key autoincrement,
+                    kind            text    not null,
+                    payload         text    not null,
+                    idempotency_key text    not null unique,
+                    status          text    not null default 'pending',
+                    attempts        integer not null default 0,
+                    next_attempt_at real    not null,
+                    last_error      text,
+                    created_at      real    not null,
+                    processed_at    real
+                )
+                """
+            )
+            conn.execute("create index if not exists outbox_pending_idx on outbox (status, next_attempt_at)")
+            self._conn = conn
+        return self._conn
+
+    def _enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "insert or ignore into outbox (kind, payload, idempotency_key, next_attempt_at, created_at) "
+                "values (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), idempotency_key, now, now),
+            )
+
+    def _claim(self, limit: int, lease_seconds: int) -> list[OutboxEvent]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("begin immediate")
+            try:
+                rows = conn.execute(
+                    "select id, kind, payload, idempotency_key, attempts from outbox "
+                    "where status = 'pending' and next_attempt_at <= ? order by next_attempt_at limit ?",
+                    (now, limit),
+                ).fetchall()
+                conn.executemany(
+                    "update outbox set attempts = attempts + 1, next_attempt_at = ? where id = ?",
+                    [(now + lease_seconds, r[0]) for r in rows],
+                )
+                conn.execute("commit")
+            except Exception:
+                conn.execute("rollback")
+                raise
+        return [OutboxEvent(r[0], r[1], json.loads(r[2]), r[3], r[4] + 1) for r in rows]
+
+    def _complete(self, event_ids: list[int]) -> None:
+        with self._lock:
+            self._connection().executemany(
+                "update outbox set status = 'done', processed_at = ?, last_error = null where id = ?",
+                [(time.time(), event_id) for event_id in event_ids],
+            )
+
+    def _retry(self, event_id: int, error: str, delay: float | None) -> None:
+        with self._lock:
+            if delay is None:
+                self._connection().execute(
+                    "update outbox set status = 'dead', last_error = ? where id = ?", (error[:1000], event_id),
+                )
+            else:
+                self._connection().execute(
+                    "update outbox set next_attempt_at = ?, last_error = ? where id = ?",
+                    (time.time() + delay, error[:1000], event_id),
+                )
+
+    async def enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None:
+        await run_in_threadpool(self._enqueue, kind, payload, idempotency_key)
+
+    async def claim(self, limit: int, lease_seconds: int) -> list[OutboxEvent]:
+        return await run_in_threadpool(self._claim, limit, lease_seconds)
+
+    async def complete(self, event_ids: list[int]) -> None:
+        await run_in_threadpool(self._complete, event_ids)
+
+    async def retry(self, event_id: int, error: str, delay: float | None) -> None:
+        await run_in_threadpool(self._retry, event_id, error, delay)
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+class OutboxWorker:
+    """Consome a outbox em lotes e despacha cada evento para o handler do seu `kind`.
+
+    Cada busca reserva até OUTBOX_BATCH_SIZE eventos, processados em paralelo;
+    os concluídos são marcados de uma vez. Falhas voltam à fila com backoff
+    exponencial (OUTBOX_RETRY_BASE_SECONDS * 2^(tentativa-1), até 1 h, com
+    jitter) e viram dead após OUTBOX_MAX_ATTEMPTS ou PermanentError.
+    """
+
+    def __init__(self, store: OutboxStore) -> None:
+        self.store = store
+        self._handlers: dict[str, Handler] = {}
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._inline: set[asyncio.Task] = set()
+
+    def handler(self, kind: str) -> Callable[[Handler], Handler]:
+        """Decorator que registra o handler de um tipo de evento."""
+        def register(fn: Handler) -> Handler:
+            self._handlers[kind] = fn
+            return fn
+        return register
+
+    async def enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None:
+        """Grava o evento e acorda o worker deste processo.
+
+        Se a gravação falhar (ex.: tabela ausente), processa o evento em
+        background neste processo, sem retry, para não perdê-lo de imediato.
+        """
+        try:
+            await self.store.enqueue(kind, payload, idempotency_key)
+        except Exception as exc:
+            logger.error("outbox_enqueue_failed", kind=kind, error=str(exc))
+            event = OutboxEvent(0, kind, payload, idempotency_key, 1)
+            task = asyncio.create_task(self._dispatch(event))
+            self._inline.add(task)
+            task.add_done_callback(self._inline.discard)
+            return
+        if self._wake is not None:
+            self._wake.set()
+
+    # ── Ciclo de vida ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("outbox_worker_started", backend=type(self.store).__name__)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as exc:
+                logger.error("outbox_poll_failed", error=str(exc))
+                processed = 0
+            if processed < settings.OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    # ── Processamento ─────────────────────────────────────────────────────────
+
+    async def run_once(self) -> int:
+        """Processa um lote; retorna quantos eventos foram reservados."""
+        events = await self.store.claim(settings.OUTBOX_BATCH_SIZE, settings.OUTBOX_LEASE_SECONDS)
+        if not events:
+            return 0
+        errors = await asyncio.gather(*(self._dispatch(event) for event in events))
+
+        done = [event.id for event, error in zip(events, errors) if error is None]
+        if done:
+            await self.store.complete(done)
+        for event, error in zip(events, errors):
+            if error is None:
+                continue
+            dead = isinstance(error, PermanentError) or event.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+            delay = None if dead else self._backoff(event.attempts)
+            await self.store.retry(event.id, str(error) or type(error).__name__, delay)
+            logger.warning(
+                "outbox_event_dead" if dead else "outbox_event_retry",
+                kind=event.kind, event_id=event.id, attempts=event.attempts, delay=delay, error=str(error),
+            )
+        logger.info("outbox_batch_processed", events=len(events), done=len(done), failed=len(events) - len(done))
+        return len(events)
+
+    async def _dispatch(self, event: OutboxEvent) -> Exception | None:
+        handler = self._handlers.get(event.kind)
+        if handler is None:
+            return PermanentError(f"Sem handler para {event.kind}")
+        try:
+            await handler(event)
+        except Exception as exc:
+            if event.id == 0:
+                logger.error("outbox_inline_event_failed", kind=event.kind, error=str(exc))
+            return exc
+        return None
+
+    @staticmethod
+    def _backoff(attempts: int) -> float:
+        delay = min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), _MAX_RETRY_DELAY)
+        return round(delay * random.uniform(0.8, 1.2), 1)
+
+
+def _build() -> OutboxStore:
+    if settings.OUTBOX_BACKEND == "sqlite":
+        return SQLiteOutbox(settings.OUTBOX_SQLITE_PATH)
+    return SupabaseOutbox()
+
+
+outbox = OutboxWorker(_build())
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import SUPABASE_QUERY_SECONDS
+
+logger = structlog.get_logger()
+
+# Parâmetros do PostgREST que não são filtros
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+_WRITE_OPERATIONS = {"insert", "upsert", "update", "delete", "rpc_write"}
+
+_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+@dataclass
+class QueryRecord:
+    table: str
+    operation: str
+    filters: str  # só colunas e operadores, nunca valores
+    rows: int
+    bytes: int  # corpo da resposta decodificado
+    duration_ms: float
+    caller: str
+
+
+@dataclass
+class RequestQueryStats:
+    """Consultas ao Supabase feitas durante uma requisição da API."""
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(q.duration_ms for q in self.queries), 2)
+
+    def duplicates(self) -> dict[str, int]:
+        """Mesma leitura (tabela, operação, filtros) repetida na requisição: sinal de N+1.
+
+        Escritas ficam de fora: lotes repetidos (ex.: importação) são intencionais.
+        """
+        seen: dict[str, int] = {}
+        for q in self.queries:
+            if q.operation in _WRITE_OPERATIONS:
+                continue
+            key = f"{q.operation} {q.table} [{q.filters}]"
+            seen[key] = seen.get(key, 0) + 1
+        return {key: n for key, n in seen.items() if n > 1}
+
+
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+# Bytes recebidos pela consulta em andamento, preenchido pelo hook do httpx
+_query_bytes: ContextVar[list[int] | None] = ContextVar("query_bytes", default=None)
+
+
+def begin_request() -> RequestQueryStats:
+    stats = RequestQueryStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def begin_query() -> list[int]:
+    counter = [0]
+    _query_bytes.set(counter)
+    return counter
+
+
+def describe(query: Any) -> tuple[str, str, str]:
+    """(tabela, operação, formato dos filtros) a partir do request builder."""
+    request = getattr(query, "request", None)
+    if request is None:
+        return "?", "?", ""
+    path = str(request.path)
+    table = path.rsplit("/", 1)[-1]
+    operation = _OPERATIONS.get(request.http_method, request.http_method.lower())
+    if "/rpc/" in path:
+        # RPCs de leitura vão por GET (read_only=True em BaseRepository._rpc)
+        table, operation = f"rpc/{table}", "rpc" if request.http_method == "GET" else "rpc_write"
+    elif operation == "insert" and "resolution=" in request.headers.get("prefer", ""):
+        operation = "upsert"
+    elif operation == "select" and "count=" in request.headers.get("prefer", ""):
+        operation = "select_count"
+    if table.startswith("rpc/"):
+        return table, operation, ""
+
+    filters = []
+    for key, value in request.params.multi_items():
+        if key in _NON_FILTER_PARAMS:
+            continue
+        if key in ("or", "and"):
+            filters.append(key)
+            continue
+        negated = value.startswith("not.")
+        op = value.removeprefix("not.").split(".", 1)[0]
+        filters.append(f"{key}.not.{op}" if negated else f"{key}.{op}")
+    return table, operation, ",".join(filters)
+
+
+def record(
+    query: Any,
+    response: Any,
+    duration_ms: float,
+    repository: str,
+    name: str | None,
+    bytes_received: int,
+) -> None:
+    table, operation, filters = describe(query)
+    caller = f"{repository}.{name or table}"
+    data = getattr(response, "data", None)
+    rows = len(data) if isinstance(data, list) else int(bool(data))
+    entry = QueryRecord(table, operation, filters, rows, bytes_received, round(duration_ms, 2), caller)
+
+    SUPABASE_QUERY_SECONDS.labels(caller, operation).observe(duration_ms / 1000)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries.append(entry)
+    if duration_ms >= settings.SLOW_QUERY_MS:
+        logger.warning("slow_query", **entry.__dict__)
+
+
+# ── Hooks do httpx ────────────────────────────────────────────────────────────
+
+# Conta o corpo já lido e decodificado: Content-Length falta nas respostas
+# chunked e traz o tamanho comprimido no gzip, justo nas respostas grandes.
+# O PostgREST lê o corpo inteiro de qualquer forma; ler aqui não custa nada a mais
+
+def _count_bytes(response: httpx.Response) -> None:
+    counter = _query_bytes.get()
+    if counter is not None:
+        response.read()
+        counter[0] += len(response.content)
+
+
+async def _count_bytes_async(response: httpx.Response) -> None:
+    counter = _query_bytes.get()
+    if counter is not None:
+        await response.aread()
+        counter[0] += len(response.content)
+
+
+def event_hooks(is_async: bool) -> dict[str, list]:
+    return {"response": [_count_bytes_async if is_async else _count_bytes]}
+
+
+def server_timing(stats: RequestQueryStats, total_ms: float) -> str:
+    return f'db;dur={stats.total_ms};desc="{stats.count} queries", app;dur={total_ms}'
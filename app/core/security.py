@@ -1,35 +1,202 @@
-import json
-from functools import lru_cache
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 
 import httpx
 import jwt
+import structlog
 from fastapi import HTTPException, status
-from jwt.algorithms import ECAlgorithm
 
 from app.core.config import settings
 
+logger = structlog.get_logger()
+
+# Falhas ao buscar ou ler o JWKS: rede/HTTP, corpo que não é JSON, formato inesperado
+_JWKS_FETCH_ERRORS = (httpx.HTTPError, ValueError, KeyError)
+
+
+class JWKSCache:
+    """Chaves públicas do Supabase Auth indexadas por `kid`.
+
+    - Busca o JWKS com cliente async, sem bloquear o event loop.
+    - Após SUPABASE_JWKS_TTL segundos devolve a chave atual e recarrega em
+      background (stale-while-revalidate).
+    - `kid` desconhecido (rotação) força uma recarga única compartilhada entre
+      as requisições concorrentes, limitada a uma a cada
+      SUPABASE_JWKS_MIN_REFRESH_INTERVAL segundos.
+    - Um único cliente HTTP, criado na primeira busca e fechado no shutdown.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.transport = transport  # substitui a rede (ex.: bench/)
+        self._client: httpx.AsyncClient | None = None
+        self._keys: dict[str, object] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def _url(self) -> str:
+        return f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+
+    async def prewarm(self) -> None:
+        """Carrega as chaves no startup; falhas ficam para a primeira requisição."""
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logger.warning("jwks_prewarm_failed", error=str(exc))
+
+    async def close(self) -> None:
+        """Fecha o cliente HTTP (shutdown da aplicação)."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.SUPABASE_HTTP_TIMEOUT, transport=self.transport)
+        response = await self._client.get(self._url)
+        response.raise_for_status()
+        jwks = response.json()
+        if not isinstance(jwks, dict) or not isinstance(jwks.get("keys"), list):
+            raise ValueError("JWKS sem a lista 'keys'")
+
+        keys: dict[str, object] = {}
+        for key_data in jwks["keys"]:
+            try:
+                jwk = jwt.PyJWK(key_data)
+            except jwt.PyJWKError:
+                continue
+            keys[key_data.get("kid", "")] = jwk.key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info("jwks_refreshed", kids=list(keys))
+
+    async def get_key(self, kid: str | None) -> object:
+        key = self._lookup(kid)
+        if key is not None:
+            if time.monotonic() - self._fetched_at > settings.SUPABASE_JWKS_TTL:
+                self._refresh_in_background()
+            return key
+
+        async with self._lock:
+            key = self._lookup(kid)
+            since_fetch = time.monotonic() - self._fetched_at
+            if key is None and (not self._keys or since_fetch > settings.SUPABASE_JWKS_MIN_REFRESH_INTERVAL):
+                try:
+                    await self.refresh()
+                except _JWKS_FETCH_ERRORS as exc:
+                    logger.error("jwks_fetch_failed", error=str(exc))
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Serviço de autenticação indisponível",
+                    ) from exc
+                key = self._lookup(kid)
+
+        if key is None:
+            raise jwt.InvalidTokenError(f"Chave de assinatura desconhecida: {kid}")
+        return key
+
+    def _lookup(self, kid: str | None) -> object | None:
+        if kid is None:
+            # Token sem kid: só é aceito quando há uma única chave publicada
+            return next(iter(self._keys.values())) if len(self._keys) == 1 else None
+        return self._keys.get(kid)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def _run() -> None:
+            async with self._lock:
+                if time.monotonic() - self._fetched_at <= settings.SUPABASE_JWKS_TTL:
+                    return
+                try:
+                    await self.refresh()
+                except _JWKS_FETCH_ERRORS as exc:
+                    # Mantém as chaves atuais; tenta de novo no próximo acesso
+                    logger.warning("jwks_background_refresh_failed", error=str(exc))
+
+        self._refresh_task = asyncio.create_task(_run())
+
+
+jwks_cache = JWKSCache()
+
+
+class VerifiedTokenCache:
+    """LRU de tokens já verificados: sha256(token) -> claims até o `exp`.
+
+    Evita repetir a verificação ECDSA para o mesmo access token. Entradas
+    expiradas são descartadas na leitura; acima de AUTH_TOKEN_CACHE_SIZE sai
+    a menos usada. Só é acessado do event loop, sem awaits no meio.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> dict | None:
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        exp, payload = entry
+        if exp <= time.time():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        maxsize = settings.AUTH_TOKEN_CACHE_SIZE
+        exp = payload.get("exp")
+        if maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        self._entries[hashlib.sha256(token.encode()).digest()] = (float(exp), payload)
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
 
-@lru_cache(maxsize=1)
-def _get_supabase_public_key() -> object:
-    """Busca e cacheia a chave pública EC do Supabase via JWKS."""
-    url = f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
-    response = httpx.get(url, timeout=10)
-    response.raise_for_status()
-    jwks = response.json()
-    key_data = jwks["keys"][0]
-    return ECAlgorithm.from_jwk(json.dumps(key_data))
+token_cache = VerifiedTokenCache()
 
 
 async def verify_supabase_token(token: str) -> dict:
     """Decodifica e valida um JWT emitido pelo Supabase (ES256)."""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        public_key = _get_supabase_public_key()
+        header = jwt.get_unverified_header(token)
+        public_key = await jwks_cache.get_key(header.get("kid"))
         payload = jwt.decode(
             token,
             public_key,
             algorithms=["ES256"],
             audience="authenticated",
         )
+        token_cache.put(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import inspect
+import threading
+from typing import Any, Callable, Union
+
+import httpx
+import structlog
+from fastapi.concurrency import run_in_threadpool
+from supabase import AsyncClient, AsyncClientOptions, Client, ClientOptions, create_client
+
+from app.core import query_stats
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Cliente sync (PostgREST bloqueante) ou async, conforme SUPABASE_ASYNC
+SupabaseClient = Union[Client, AsyncClient]
+
+
+async def call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Chama um método do Supabase sem bloquear o event loop.
+
+    Métodos do cliente async são aguardados diretamente; os do cliente sync
+    rodam no threadpool do AnyIO.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
+
+
+class SupabaseClientRegistry:
+    """Mantém um pool HTTP keep-alive e um cliente Supabase por processo.
+
+    O cliente de dados usa a service role e nunca executa fluxos de sessão do
+    Supabase Auth, então seus headers não mudam e os query builders do
+    PostgREST podem ser criados concorrentemente pelas threads do worker.
+    Fluxos que alteram sessão (login, refresh, reset de senha) usam
+    `new_session_client`, que compartilha o mesmo pool de conexões.
+
+    Com SUPABASE_ASYNC=true o pool e o cliente são async (httpx.AsyncClient);
+    caso contrário mantém-se o caminho sync, útil para comparar os dois sob carga.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._http: httpx.Client | httpx.AsyncClient | None = None
+        self._client: SupabaseClient | None = None
+
+    @property
+    def is_async(self) -> bool:
+        return settings.SUPABASE_ASYNC
+
+    # ── Ciclo de vida ─────────────────────────────────────────────────────────
+
+    def startup(self, transport: httpx.BaseTransport | httpx.AsyncBaseTransport | None = None) -> None:
+        """Cria o pool e o cliente; `transport` substitui a rede (ex.: bench/)."""
+        with self._lock:
+            if self._client is not None:
+                return
+            http_cls = httpx.AsyncClient if self.is_async else httpx.Client
+            self._http = http_cls(
+                transport=transport,
+                timeout=settings.SUPABASE_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=settings.SUPABASE_HTTP2,
+                follow_redirects=True,
+                event_hooks=query_stats.event_hooks(self.is_async),
+            )
+            client = self._create(self._http)
+            # Inicializa o PostgREST agora: a propriedade é lazy e não é thread-safe
+            client.postgrest
+            self._client = client
+        logger.info(
+            "supabase_pool_started",
+            async_client=self.is_async,
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+        )
+
+    async def shutdown(self) -> None:
+        with self._lock:
+            http, self._http, self._client = self._http, None, None
+        if http is None:
+            return
+        if isinstance(http, httpx.AsyncClient):
+            await http.aclose()
+        else:
+            http.close()
+        logger.info("supabase_pool_closed")
+
+    # ── Acesso ────────────────────────────────────────────────────────────────
+
+    @property
+    def client(self) -> SupabaseClient:
+        """Cliente de dados compartilhado (service role)."""
+        if self._client is None:
+            self.startup()
+        return self._client  # type: ignore[return-value]
+
+    def new_session_client(self) -> SupabaseClient:
+        """Cliente isolado para fluxos de sessão do Auth, reaproveitando o pool."""
+        if self._http is None:
+            self.startup()
+        return self._create(self._http)  # type: ignore[arg-type]
+
+    def _create(self, http: httpx.Client | httpx.AsyncClient) -> SupabaseClient:
+        if isinstance(http, httpx.AsyncClient):
+            options = AsyncClientOptions(httpx_client=http, auto_refresh_token=False)
+            return AsyncClient(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY, options=options)
+        options = ClientOptions(httpx_client=http, auto_refresh_token=False)
+        return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY, options=options)
+
+
+supabase_registry = SupabaseClientRegistry()
@@ -1,37 +1,72 @@
+from contextlib import asynccontextmanager
+
 import structlog
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
+from app.core import metrics
+from app.core.cache import cache
 from app.core.config import settings
 from app.core.exceptions import register_exception_handlers
 from app.core.middleware import register_middlewares
+from app.core.outbox import outbox
+from app.core.security import jwks_cache
+from app.core.supabase_client import supabase_registry
+from app.services import ai_service, auth_service
+from app.tasks import scheduler
 
 logger = structlog.get_logger()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    supabase_registry.startup()
+    await jwks_cache.prewarm()
+    if settings.OUTBOX_WORKER_ENABLED:
+        outbox.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    scheduler.shutdown()
+    await outbox.stop()
+    await auth_service.close()
+    await jwks_cache.close()
+    await ai_service.close()
+    await cache.close()
+    await supabase_registry.shutdown()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
+        lifespan=lifespan,
     )
 
     register_middlewares(app)
     register_exception_handlers(app)
 
-    from app.api.v1 import auth, categories, goals, limits, onboarding, profile, transactions
-    app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
-    app.include_router(onboarding.router, prefix=f"{settings.API_V1_PREFIX}/onboarding", tags=["onboarding"])
-    app.include_router(profile.router, prefix=f"{settings.API_V1_PREFIX}/profile", tags=["profile"])
-    app.include_router(categories.router, prefix=f"{settings.API_V1_PREFIX}/categories", tags=["categories"])
-    app.include_router(transactions.router, prefix=f"{settings.API_V1_PREFIX}/transactions", tags=["transactions"])
-    app.include_router(limits.router, prefix=f"{settings.API_V1_PREFIX}/limits", tags=["limits"])
-    app.include_router(goals.router, prefix=f"{settings.API_V1_PREFIX}/goals", tags=["goals"])
+    from app.api.v1 import ai, auth, categories, goals, limits, onboarding, profile, summaries, transactions
+    # Prefixo definido em cada APIRouter: scope["route"].path traz o path completo (métricas)
+    app.include_router(auth.router, tags=["auth"])
+    app.include_router(onboarding.router, tags=["onboarding"])
+    app.include_router(profile.router, tags=["profile"])
+    app.include_router(categories.router, tags=["categories"])
+    app.include_router(transactions.router, tags=["transactions"])
+    app.include_router(limits.router, tags=["limits"])
+    app.include_router(goals.router, tags=["goals"])
+    app.include_router(ai.router, tags=["ai"])
+    app.include_router(summaries.router, tags=["summaries"])
 
     @app.get("/health")
     async def health_check():
         return {"status": "ok", "version": settings.APP_VERSION}
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
     logger.info("app_started", name=settings.APP_NAME, version=settings.APP_VERSION)
     return app
 
@@ -1,6 +1,94 @@
-from supabase import Client
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, ClassVar
+
+import structlog
+from postgrest import APIError, APIResponse
+
+from app.core import query_stats
+from app.core.config import settings
+from app.core.supabase_client import SupabaseClient, call
+
+logger = structlog.get_logger()
+
+# PGRST202: função fora do schema cache do PostgREST; 42883: undefined_function
+_MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
+# Método público do repositório em execução: rótulo das consultas que ele faz
+_current_method: ContextVar[str | None] = ContextVar("repository_method", default=None)
+
+
+def _labelled(name: str, method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _current_method.set(name)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _current_method.reset(token)
+
+    return wrapper
 
 
 class BaseRepository:
-    def __init__(self, supabase: Client) -> None:
+    # RPC ausente no banco -> quando foi vista ausente. Evita repetir a chamada a
+    # cada requisição; depois de RPC_MISSING_RECHECK_SECONDS tenta de novo, então
+    # uma migration aplicada com o app no ar passa a valer sem reiniciar
+    _missing_rpcs: ClassVar[dict[str, float]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Marca cada método público async da subclasse como rótulo das suas consultas.
+
+        Helpers privados (`_algo`) contam no método público que os chamou.
+        """
+        super().__init_subclass__(**kwargs)
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.iscoroutinefunction(value):
+                setattr(cls, attr, _labelled(attr, value))
+
+    def __init__(self, supabase: SupabaseClient) -> None:
         self.supabase = supabase
+
+    async def _execute(self, query: Any, *, name: str | None = None) -> Any:
+        """Executa a query: aguarda no cliente async ou usa o threadpool no sync.
+
+        Cada execução entra nas estatísticas da requisição (ver query_stats)
+        como `Repositório.name`; sem `name`, vale o método público em execução
+        (ex.: TransactionRepository.list_by_user) ou, fora dele, a tabela/RPC.
+        """
+        name = name or _current_method.get()
+        received = query_stats.begin_query()
+        response = None
+        start = time.perf_counter()
+        try:
+            response = await call(query.execute)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            query_stats.record(query, response, duration_ms, type(self).__name__, name, received[0])
+        # maybe_single() devolve None quando não há linhas
+        if response is None:
+            return APIResponse.model_construct(data=None, count=None)
+        return response
+
+    async def _rpc(self, fn: str, params: dict, *, read_only: bool = True) -> Any | None:
+        """Chama uma função SQL via PostgREST.
+
+        Retorna None quando a função ainda não existe no banco (migration não
+        aplicada), para que o chamador use o caminho antigo.
+        """
+        missing_since = self._missing_rpcs.get(fn)
+        if missing_since is not None:
+            if time.monotonic() - missing_since < settings.RPC_MISSING_RECHECK_SECONDS:
+                return None
+            self._missing_rpcs.pop(fn, None)
+        try:
+            response = await self._execute(self.supabase.rpc(fn, params, get=read_only))
+        except APIError as exc:
+            if exc.code not in _MISSING_FUNCTION_CODES:
+                raise
+            self._missing_rpcs[fn] = time.monotonic()
+            logger.warning("rpc_missing_using_fallback", function=fn)
+            return None
+        return response.data
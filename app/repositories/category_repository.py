@@ -1,24 +1,63 @@
 from __future__ import annotations
 
+from app.core.cache import cache
+from app.core.config import settings
 from app.repositories.base import BaseRepository
 
 _TABLE = "categories"
 _TRANSACTIONS_TABLE = "transactions"
 
 
+def _cache_key(user_uuid: str) -> str:
+    return f"categories:{user_uuid}"
+
+
 class CategoryRepository(BaseRepository):
 
     # ── Onboarding helper ─────────────────────────────────────────────────────
 
-    def bulk_create(self, user_uuid: str, categories: list[dict]) -> list[dict]:
+    async def bulk_create(self, user_uuid: str, categories: list[dict]) -> list[dict]:
         """Insere múltiplas categorias. Cada item: {name, type, icon?, color?}."""
         rows = [{"user_uuid": user_uuid, **cat} for cat in categories]
-        response = self.supabase.table(_TABLE).insert(rows).execute()
+        response = await self._execute(self.supabase.table(_TABLE).insert(rows))
+        await self.invalidate_cache(user_uuid)
         return response.data or []
 
+    # ── Metadados em cache (transações e limites) ─────────────────────────────
+
+    async def get_categories_map(self, user_uuid: str, *, refresh: bool = False) -> dict[int, dict]:
+        """{id: {id, name, icon, color}} das categorias do usuário, via cache.
+
+        Escritas neste repositório invalidam a entrada; o TTL cobre o resto.
+        """
+        key = _cache_key(user_uuid)
+        rows = None if refresh else await cache.get(key)
+        if rows is None:
+            response = await self._execute(
+                self.supabase.table(_TABLE)
+                .select("id, name, icon, color")
+                .eq("user_uuid", user_uuid)
+            )
+            rows = response.data or []
+            await cache.set(key, rows, settings.CATEGORY_CACHE_TTL)
+        return {r["id"]: r for r in rows}
+
+    async def find_cached(self, user_uuid: str, category_id: int) -> dict | None:
+        """Categoria do usuário pelo mapa em cache; relê do banco se não estiver lá.
+
+        A releitura cobre categorias criadas por outro worker ainda fora do cache local.
+        """
+        cat = (await self.get_categories_map(user_uuid)).get(category_id)
+        if cat is None:
+            cat = (await self.get_categories_map(user_uuid, refresh=True)).get(category_id)
+        return cat
+
+    async def invalidate_cache(self, user_uuid: str) -> None:
+        await cache.delete(_cache_key(user_uuid))
+
     # ── CRUD ──────────────────────────────────────────────────────────────────
 
-    def list_by_user(
+    async def list_by_user(
         self,
         user_uuid: str,
         type_filter: str | None = None,
@@ -30,21 +69,20 @@ class CategoryRepository(BaseRepository):
         )
         if type_filter:
             query = query.eq("type", type_filter)
-        response = query.order("name").execute()
+        response = await self._execute(query.order("name"))
         return response.data or []
 
-    def get_by_id(self, user_uuid: str, category_id: int) -> dict | None:
-        response = (
+    async def get_by_id(self, user_uuid: str, category_id: int) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select("id, name, icon, color, type")
             .eq("id", category_id)
             .eq("user_uuid", user_uuid)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
-    def name_exists(self, user_uuid: str, name: str, exclude_id: int | None = None) -> bool:
+    async def name_exists(self, user_uuid: str, name: str, exclude_id: int | None = None) -> bool:
         query = (
             self.supabase.table(_TABLE)
             .select("id")
@@ -53,10 +91,10 @@ class CategoryRepository(BaseRepository):
         )
         if exclude_id is not None:
             query = query.neq("id", exclude_id)
-        response = query.execute()
+        response = await self._execute(query)
         return bool(response.data)
 
-    def create(
+    async def create(
         self,
         user_uuid: str,
         name: str,
@@ -64,7 +102,7 @@ class CategoryRepository(BaseRepository):
         color: str,
         type: str,
     ) -> dict:
-        response = (
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .insert({
                 "user_uuid": user_uuid,
@@ -73,48 +111,72 @@ class CategoryRepository(BaseRepository):
                 "color": color,
                 "type": type,
             })
-            .execute()
         )
+        await self.invalidate_cache(user_uuid)
         return response.data[0] if response.data else {}
 
-    def update(self, user_uuid: str, category_id: int, fields: dict) -> dict | None:
-        response = (
+    async def update(self, user_uuid: str, category_id: int, fields: dict) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .update(fields)
             .eq("id", category_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
+        await self.invalidate_cache(user_uuid)
         return response.data[0] if response.data else None
 
-    def delete(self, user_uuid: str, category_id: int) -> bool:
-        response = (
+    async def delete(self, user_uuid: str, category_id: int) -> bool:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .delete()
             .eq("id", category_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
+        await self.invalidate_cache(user_uuid)
         return bool(response.data)
 
     # ── Stats ─────────────────────────────────────────────────────────────────
 
-    def get_transaction_stats(self, user_uuid: str) -> dict[int, dict]:
+    async def get_transaction_stats(
+        self,
+        user_uuid: str,
+        category_id: int | None = None,
+    ) -> dict[int, dict]:
         """
-        Retorna {category_id: {count, total}} para todas as categorias do usuário.
-        Usa uma query na tabela transactions agrupada por category_id.
+        Retorna {category_id: {count, total}} para as categorias do usuário.
+        Agrupa no banco via RPC category_transaction_stats; category_id
+        restringe o resultado a uma única categoria.
         """
+        params: dict = {"p_user_uuid": user_uuid}
+        if category_id is not None:
+            params["p_category_id"] = category_id
         try:
-            response = (
-                self.supabase.table(_TRANSACTIONS_TABLE)
-                .select("category_id, amount")
-                .eq("user_uuid", user_uuid)
-                .not_.is_("category_id", "null")
-                .execute()
-            )
+            rows = await self._rpc("category_transaction_stats", params)
+            if rows is None:
+                return await self._transaction_stats_rows(user_uuid, category_id)
         except Exception:
             return {}
 
+        return {
+            row["category_id"]: {"count": int(row["count"]), "total": float(row["total"] or 0)}
+            for row in rows
+        }
+
+    async def _transaction_stats_rows(
+        self,
+        user_uuid: str,
+        category_id: int | None = None,
+    ) -> dict[int, dict]:
+        """Fallback sem a função SQL: baixa category_id/amount e agrupa em Python."""
+        query = (
+            self.supabase.table(_TRANSACTIONS_TABLE)
+            .select("category_id, amount")
+            .eq("user_uuid", user_uuid)
+        )
+        if category_id is not None:
+            query = query.eq("category_id", category_id)
+        response = await self._execute(query.not_.is_("category_id", "null"))
+
         stats: dict[int, dict] = {}
         for row in response.data or []:
             cid = row.get("category_id")
@@ -129,5 +191,5 @@ class CategoryRepository(BaseRepository):
 
     # ── get_by_user (retro-compat onboarding) ─────────────────────────────────
 
-    def get_by_user(self, user_uuid: str) -> list[dict]:
-        return self.list_by_user(user_uuid)
+    async def get_by_user(self, user_uuid: str) -> list[dict]:
+        return await self.list_by_user(user_uuid)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime, timezone
 
 from app.repositories.base import BaseRepository
 
@@ -12,7 +12,7 @@ class GoalRepository(BaseRepository):
 
     # ── List ──────────────────────────────────────────────────────────────────
 
-    def list_by_user(self, user_uuid: str, completed: bool | None = None) -> list[dict]:
+    async def list_by_user(self, user_uuid: str, completed: bool | None = None) -> list[dict]:
         query = (
             self.supabase.table(_TABLE)
             .select(_SELECT)
@@ -20,23 +20,22 @@ class GoalRepository(BaseRepository):
         )
         if completed is not None:
             query = query.eq("is_completed", completed)
-        response = query.order("created_at", desc=True).execute()
+        response = await self._execute(query.order("created_at", desc=True))
         return response.data or []
 
-    def get_by_id(self, user_uuid: str, goal_id: int) -> dict | None:
-        response = (
+    async def get_by_id(self, user_uuid: str, goal_id: int) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select(_SELECT)
             .eq("id", goal_id)
             .eq("user_uuid", user_uuid)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
     # ── Create ────────────────────────────────────────────────────────────────
 
-    def create(
+    async def create(
         self,
         user_uuid: str,
         title: str,
@@ -61,29 +60,42 @@ class GoalRepository(BaseRepository):
         if monthly_contribution is not None:
             row["monthly_contribution"] = monthly_contribution
 
-        response = self.supabase.table(_TABLE).insert(row).execute()
+        response = await self._execute(self.supabase.table(_TABLE).insert(row))
         return response.data[0] if response.data else row
 
     # ── Update ────────────────────────────────────────────────────────────────
 
-    def update(self, user_uuid: str, goal_id: int, fields: dict) -> dict | None:
-        response = (
+    async def update(self, user_uuid: str, goal_id: int, fields: dict) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .update(fields)
             .eq("id", goal_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
         return response.data[0] if response.data else None
 
     # ── Progress ──────────────────────────────────────────────────────────────
 
-    def add_progress(self, user_uuid: str, goal_id: int, amount: float) -> dict | None:
+    async def add_progress(self, user_uuid: str, goal_id: int, amount: float) -> dict | None:
         """
-        Incrementa current_amount atomicamente via RPC do Supabase.
-        Fallback: lê o valor atual e faz update.
+        Incrementa current_amount atomicamente via RPC add_goal_progress, que
+        também conclui a meta ao atingir o alvo. Retorna None se a meta não existe.
         """
-        existing = self.get_by_id(user_uuid, goal_id)
+        rows = await self._rpc(
+            "add_goal_progress",
+            {"p_user_uuid": user_uuid, "p_goal_id": goal_id, "p_amount": amount},
+            read_only=False,
+        )
+        if rows is None:
+            return await self._add_progress_read_write(user_uuid, goal_id, amount)
+        return rows[0] if rows else None
+
+    async def _add_progress_read_write(self, user_uuid: str, goal_id: int, amount: float) -> dict | None:
+        """Fallback sem a função SQL: lê, soma em Python e grava.
+
+        Não é atômico: contribuições simultâneas podem se perder.
+        """
+        existing = await self.get_by_id(user_uuid, goal_id)
         if not existing:
             return None
 
@@ -92,20 +104,32 @@ class GoalRepository(BaseRepository):
         fields: dict = {"current_amount": new_amount}
 
         if new_amount >= target and not existing["is_completed"]:
-            from datetime import datetime, timezone
             fields["is_completed"] = True
             fields["completed_at"] = datetime.now(timezone.utc).isoformat()
 
-        return self.update(user_uuid, goal_id, fields)
+        return await self.update(user_uuid, goal_id, fields)
+
+    # ── Alertas (app/tasks/goal_alerts.py) ────────────────────────────────────
+
+    async def scan_alerts(self, job: str, limit: int, near_ratio: float) -> dict | None:
+        """Analisa o próximo pedaço de metas abertas de todos os usuários e grava os alertas.
+
+        Retorna {"scanned", "alerted", "done", ...}; None se a migration não
+        foi aplicada.
+        """
+        return await self._rpc(
+            "scan_goal_alerts",
+            {"p_job": job, "p_limit": limit, "p_near_ratio": near_ratio},
+            read_only=False,
+        )
 
     # ── Delete ────────────────────────────────────────────────────────────────
 
-    def delete(self, user_uuid: str, goal_id: int) -> bool:
-        response = (
+    async def delete(self, user_uuid: str, goal_id: int) -> bool:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .delete()
             .eq("id", goal_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
         return bool(response.data)
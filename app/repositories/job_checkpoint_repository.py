@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.repositories.base import BaseRepository
+
+_TABLE = "job_checkpoints"
+
+
+class JobCheckpointRepository(BaseRepository):
+    """Watermark e lease dos jobs de app/tasks (migrations 20261017000900 e 20261017001200)."""
+
+    async def get(self, name: str) -> dict | None:
+        response = await self._execute(
+            self.supabase.table(_TABLE)
+            .select("watermark")
+            .eq("name", name)
+            .maybe_single()
+        )
+        return response.data["watermark"] if response.data else None
+
+    async def claim(self, name: str, owner: str, lease_seconds: int) -> bool | None:
+        """Reserva o job para `owner`; False se outro dono tem lease válido.
+
+        None se a migration não foi aplicada.
+        """
+        return await self._rpc(
+            "claim_job",
+            {"p_name": name, "p_owner": owner, "p_lease_seconds": lease_seconds},
+            read_only=False,
+        )
+
+    async def save(self, name: str, owner: str, watermark: dict, lease_seconds: int) -> bool:
+        """Grava o watermark e renova o lease; False se o lease já não é de `owner`."""
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        response = await self._execute(
+            self.supabase.table(_TABLE)
+            .update({
+                "watermark": watermark,
+                "lease_until": lease_until.isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+            .eq("name", name)
+            .eq("lease_owner", owner)
+        )
+        return bool(response.data)
+
+    async def release(self, name: str, owner: str) -> None:
+        await self._execute(
+            self.supabase.table(_TABLE)
+            .update({"lease_owner": None, "lease_until": None})
+            .eq("name", name)
+            .eq("lease_owner", owner)
+        )
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import date
+
+from postgrest.types import ReturnMethod
+
+from app.repositories.base import BaseRepository
+
+_TABLE = "monthly_summaries"
+_SELECT = "month, income, expenses, balance, transaction_count, categories, limits, goals, computed_at"
+
+
+class MonthlySummaryRepository(BaseRepository):
+    """Tabela monthly_summaries (ver supabase/migrations/20261017001000_monthly_summaries.sql)."""
+
+    async def get(self, user_uuid: str, month: date) -> dict | None:
+        response = await self._execute(
+            self.supabase.table(_TABLE)
+            .select(_SELECT)
+            .eq("user_uuid", user_uuid)
+            .eq("month", month.isoformat())
+            .maybe_single()
+        )
+        return response.data or None
+
+    async def inputs(self, user_uuids: list[str], month: date) -> list[dict] | None:
+        """Dados agregados do mês para cada usuário; None se a migration não foi aplicada.
+
+        Vai por POST (read_only=False): a lista de ids não cabe na URL de um GET.
+        """
+        return await self._rpc(
+            "monthly_summary_inputs",
+            {"p_user_uuids": user_uuids, "p_month": month.isoformat()},
+            read_only=False,
+        )
+
+    async def upsert_many(self, rows: list[dict]) -> None:
+        """Grava os resumos de uma vez; recalcular um mês sobrescreve o anterior."""
+        await self._execute(
+            self.supabase.table(_TABLE)
+            .upsert(rows, on_conflict="user_uuid,month", returning=ReturnMethod.minimal)
+        )
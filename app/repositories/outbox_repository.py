@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from postgrest.types import ReturnMethod
+
+from app.repositories.base import BaseRepository
+
+_TABLE = "outbox"
+
+
+class OutboxRepository(BaseRepository):
+    """Tabela outbox (ver supabase/migrations/20261017000800_outbox.sql)."""
+
+    async def enqueue(self, kind: str, payload: dict, idempotency_key: str) -> None:
+        """Grava o evento; uma chave repetida é ignorada."""
+        await self._execute(
+            self.supabase.table(_TABLE)
+            .upsert(
+                {"kind": kind, "payload": payload, "idempotency_key": idempotency_key},
+                on_conflict="idempotency_key",
+                ignore_duplicates=True,
+                returning=ReturnMethod.minimal,
+            )
+        )
+
+    async def claim(self, limit: int, lease_seconds: int) -> list[dict]:
+        """Reserva eventos vencidos; lista vazia se a migration não foi aplicada."""
+        rows = await self._rpc(
+            "claim_outbox_events",
+            {"p_limit": limit, "p_lease_seconds": lease_seconds},
+            read_only=False,
+        )
+        return rows or []
+
+    async def complete(self, event_ids: list[int]) -> None:
+        await self._execute(
+            self.supabase.table(_TABLE)
+            .update({"status": "done", "processed_at": datetime.now(timezone.utc).isoformat(), "last_error": None})
+            .in_("id", event_ids)
+        )
+
+    async def retry(self, event_id: int, error: str, next_attempt_at: datetime | None) -> None:
+        """Agenda nova tentativa; sem next_attempt_at o evento vira dead."""
+        fields: dict = {"last_error": error[:1000]}
+        if next_attempt_at is None:
+            fields["status"] = "dead"
+        else:
+            fields["next_attempt_at"] = next_attempt_at.isoformat()
+        await self._execute(self.supabase.table(_TABLE).update(fields).eq("id", event_id))
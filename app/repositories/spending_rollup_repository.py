@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.repositories.base import BaseRepository
+
+
+class SpendingRollupRepository(BaseRepository):
+    """Gasto mensal por categoria (tabela spending_rollups).
+
+    Os métodos retornam None quando a migration ainda não foi aplicada, para
+    que o chamador volte a somar as transações do mês.
+    """
+
+    async def month_spending(self, user_uuid: str, month: date) -> dict[int, float] | None:
+        rows = await self._rpc("month_spending", {"p_user_uuid": user_uuid, "p_month": month.isoformat()})
+        if rows is None:
+            return None
+        return {r["category_id"]: float(r["spent"]) for r in rows}
+
+    async def apply_deltas(self, user_uuid: str, deltas: list[dict]) -> bool | None:
+        """Aplica [{category_id, month, spent, count}] de forma atômica no banco."""
+        if not deltas:
+            return True
+        result = await self._rpc(
+            "apply_spending_deltas",
+            {"p_user_uuid": user_uuid, "p_deltas": deltas},
+            read_only=False,
+        )
+        return None if result is None else True
+
+    async def rebuild(self, user_uuid: str | None = None) -> int | None:
+        """Recalcula o rollup a partir de transactions; retorna as linhas gravadas."""
+        params = {"p_user_uuid": user_uuid} if user_uuid else {}
+        return await self._rpc("rebuild_spending_rollups", params, read_only=False)
@@ -2,17 +2,18 @@ from __future__ import annotations
 
 from datetime import date
 
+from postgrest.types import ReturnMethod
+
 from app.repositories.base import BaseRepository
 
 _TABLE = "transactions"
-_CATEGORIES_TABLE = "categories"
 
 
 class TransactionRepository(BaseRepository):
 
     # ── List ──────────────────────────────────────────────────────────────────
 
-    def list_by_user(
+    async def list_by_user(
         self,
         user_uuid: str,
         type_filter: str | None = None,
@@ -21,10 +22,16 @@ class TransactionRepository(BaseRepository):
         date_to: date | None = None,
         limit: int = 50,
         offset: int = 0,
+        after: tuple[str, int] | None = None,
     ) -> list[dict]:
+        """Página ordenada por (date desc, id desc).
+
+        Com `after` = (date, id) da última linha vista, busca por seek no índice
+        em vez de pular `offset` linhas.
+        """
         query = (
             self.supabase.table(_TABLE)
-            .select("id, category_id, description, amount, date, type, notes")
+            .select("id, category_id, description, amount, date, type, notes, payment_method")
             .eq("user_uuid", user_uuid)
         )
         if type_filter:
@@ -35,26 +42,31 @@ class TransactionRepository(BaseRepository):
             query = query.gte("date", date_from.isoformat())
         if date_to:
             query = query.lte("date", date_to.isoformat())
-        response = (
+        if after is not None:
+            after_date, after_id = after
+            query = query.or_(f"date.lt.{after_date},and(date.eq.{after_date},id.lt.{after_id})")
+            offset = 0
+        response = await self._execute(
             query
             .order("date", desc=True)
             .order("id", desc=True)
             .range(offset, offset + limit - 1)
-            .execute()
         )
         return response.data or []
 
-    def count_by_user(
+    async def count_by_user(
         self,
         user_uuid: str,
         type_filter: str | None = None,
         category_id: int | None = None,
         date_from: date | None = None,
         date_to: date | None = None,
+        method: str = "exact",
     ) -> int:
+        """Total de linhas do filtro; method="estimated" usa a estimativa do planner."""
         query = (
             self.supabase.table(_TABLE)
-            .select("id", count="exact")
+            .select("id", count=method, head=True)
             .eq("user_uuid", user_uuid)
         )
         if type_filter:
@@ -65,17 +77,42 @@ class TransactionRepository(BaseRepository):
             query = query.gte("date", date_from.isoformat())
         if date_to:
             query = query.lte("date", date_to.isoformat())
-        response = query.execute()
+        response = await self._execute(query)
         return response.count or 0
 
     # ── Summary ───────────────────────────────────────────────────────────────
 
-    def summary_by_user(
+    async def summary_by_user(
+        self,
+        user_uuid: str,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> dict:
+        params: dict = {"p_user_uuid": user_uuid}
+        if date_from:
+            params["p_date_from"] = date_from.isoformat()
+        if date_to:
+            params["p_date_to"] = date_to.isoformat()
+        totals = await self._rpc("transaction_summary", params)
+        if totals is None:
+            return await self._summary_by_user_rows(user_uuid, date_from, date_to)
+
+        total_entrada = float(totals["total_entrada"] or 0)
+        total_saida = float(totals["total_saida"] or 0)
+        return {
+            "total_entrada": round(total_entrada, 2),
+            "total_saida": round(total_saida, 2),
+            "balance": round(total_entrada - total_saida, 2),
+            "count": int(totals["count"] or 0),
+        }
+
+    async def _summary_by_user_rows(
         self,
         user_uuid: str,
         date_from: date | None = None,
         date_to: date | None = None,
     ) -> dict:
+        """Fallback sem a função SQL: baixa type/amount e soma em Python."""
         query = (
             self.supabase.table(_TABLE)
             .select("type, amount")
@@ -85,7 +122,7 @@ class TransactionRepository(BaseRepository):
             query = query.gte("date", date_from.isoformat())
         if date_to:
             query = query.lte("date", date_to.isoformat())
-        response = query.execute()
+        response = await self._execute(query)
         rows = response.data or []
 
         total_entrada = sum(float(r["amount"]) for r in rows if r["type"] == "entrada")
@@ -99,70 +136,116 @@ class TransactionRepository(BaseRepository):
 
     # ── Single ────────────────────────────────────────────────────────────────
 
-    def get_by_id(self, user_uuid: str, transaction_id: int) -> dict | None:
-        response = (
+    async def get_by_id(self, user_uuid: str, transaction_id: int) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
-            .select("id, category_id, description, amount, date, type, notes")
+            .select("id, category_id, description, amount, date, type, notes, payment_method")
             .eq("id", transaction_id)
             .eq("user_uuid", user_uuid)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
     # ── Create ────────────────────────────────────────────────────────────────
 
-    def create(self, user_uuid: str, fields: dict) -> dict:
+    async def create(self, user_uuid: str, fields: dict) -> dict:
         payload = {"user_uuid": user_uuid, **fields}
-        response = self.supabase.table(_TABLE).insert(payload).execute()
+        response = await self._execute(self.supabase.table(_TABLE).insert(payload))
         return response.data[0] if response.data else {}
 
+    async def bulk_create(self, user_uuid: str, rows: list[dict], *, returning: bool = False) -> list[dict]:
+        """Insere várias transações num único INSERT.
+
+        Sem `returning` o banco não devolve as linhas e a lista volta vazia;
+        com ele, as linhas criadas vêm na ordem de `rows`.
+        """
+        payload = [{"user_uuid": user_uuid, **fields} for fields in rows]
+        method = ReturnMethod.representation if returning else ReturnMethod.minimal
+        response = await self._execute(self.supabase.table(_TABLE).insert(payload, returning=method))
+        return (response.data or []) if returning else []
+
     # ── Update ────────────────────────────────────────────────────────────────
 
-    def update(self, user_uuid: str, transaction_id: int, fields: dict) -> dict | None:
-        response = (
+    async def update(self, user_uuid: str, transaction_id: int, fields: dict) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .update(fields)
             .eq("id", transaction_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
         return response.data[0] if response.data else None
 
+    async def update_with_previous(
+        self,
+        user_uuid: str,
+        transaction_id: int,
+        fields: dict,
+    ) -> tuple[dict | None, dict | None] | None:
+        """Atualiza e devolve (antes, depois) via RPC update_user_transaction.
+
+        (None, None) quando a transação não existe ou é de outro usuário;
+        None quando a função ainda não existe no banco.
+        """
+        result = await self._rpc(
+            "update_user_transaction",
+            {"p_user_uuid": user_uuid, "p_id": transaction_id, "p_fields": fields},
+            read_only=False,
+        )
+        if result is None:
+            return None
+        return result.get("old"), result.get("new")
+
+    async def update_many_with_previous(
+        self,
+        user_uuid: str,
+        items: list[tuple[int, dict]],
+    ) -> list[tuple[dict | None, dict | None]] | None:
+        """Aplica [(id, fields)] em ordem via RPC update_user_transactions.
+
+        Um (antes, depois) por item, (None, None) para ids inexistentes;
+        None quando a função ainda não existe no banco.
+        """
+        results = await self._rpc(
+            "update_user_transactions",
+            {"p_user_uuid": user_uuid, "p_items": [{"id": tid, "fields": fields} for tid, fields in items]},
+            read_only=False,
+        )
+        if results is None:
+            return None
+        return [(r.get("old"), r.get("new")) for r in results]
+
     # ── Delete ────────────────────────────────────────────────────────────────
 
-    def delete(self, user_uuid: str, transaction_id: int) -> bool:
-        response = (
+    async def delete(self, user_uuid: str, transaction_id: int) -> dict | None:
+        """Remove e devolve a linha apagada; None se nada casou com (id, user_uuid)."""
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .delete()
             .eq("id", transaction_id)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
-        return bool(response.data)
-
-    # ── Category info helper ──────────────────────────────────────────────────
+        return response.data[0] if response.data else None
 
-    def get_categories_map(self, user_uuid: str) -> dict[int, dict]:
-        response = (
-            self.supabase.table(_CATEGORIES_TABLE)
-            .select("id, name, icon, color")
+    async def delete_many(self, user_uuid: str, transaction_ids: list[int]) -> list[dict]:
+        """Remove as transações do usuário num único DELETE e devolve as apagadas."""
+        response = await self._execute(
+            self.supabase.table(_TABLE)
+            .delete()
+            .in_("id", transaction_ids)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
-        return {r["id"]: r for r in (response.data or [])}
+        return response.data or []
 
     # ── Current month spending per category (for limits) ──────────────────────
 
-    def spending_this_month(self, user_uuid: str, month_start: date, month_end: date) -> dict[int, float]:
-        response = (
+    async def spending_this_month(self, user_uuid: str, month_start: date, month_end: date) -> dict[int, float]:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select("category_id, amount")
             .eq("user_uuid", user_uuid)
             .eq("type", "saida")
             .gte("date", month_start.isoformat())
             .lte("date", month_end.isoformat())
-            .execute()
         )
         spent: dict[int, float] = {}
         for row in response.data or []:
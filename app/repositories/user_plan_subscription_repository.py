@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from app.core.concurrency import gather
 from app.repositories.base import BaseRepository
 
 _TABLE = "user_plan_subscriptions"
@@ -9,9 +10,9 @@ _TABLE = "user_plan_subscriptions"
 
 class UserPlanSubscriptionRepository(BaseRepository):
 
-    def get_active(self, user_uuid: str) -> dict | None:
+    async def get_active(self, user_uuid: str) -> dict | None:
         """Retorna a assinatura de plano ativa mais recente do usuário."""
-        response = (
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select("id, plan_id, recurrence, status, amount_paid, payment_method, abacatepay_charge_id, starts_at, ends_at")
             .eq("user_uuid", user_uuid)
@@ -19,11 +20,10 @@ class UserPlanSubscriptionRepository(BaseRepository):
             .order("starts_at", desc=True)
             .limit(1)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
-    def create(
+    async def create(
         self,
         user_uuid: str,
         plan_id: int,
@@ -52,12 +52,12 @@ class UserPlanSubscriptionRepository(BaseRepository):
         if abacatepay_billing_id is not None:
             row["abacatepay_billing_id"] = abacatepay_billing_id
 
-        response = self.supabase.table(_TABLE).insert(row).execute()
+        response = await self._execute(self.supabase.table(_TABLE).insert(row))
         if response.data:
             return response.data[0]
         return row
 
-    def list_by_user(
+    async def list_by_user(
         self,
         user_uuid: str,
         page: int = 1,
@@ -66,23 +66,21 @@ class UserPlanSubscriptionRepository(BaseRepository):
         """Retorna pagina de pagamentos e total de registros."""
         offset = (page - 1) * limit
 
-        # total
-        count_response = (
-            self.supabase.table(_TABLE)
-            .select("id", count="exact")
-            .eq("user_uuid", user_uuid)
-            .execute()
+        # total e dados em paralelo
+        count_response, data_response = await gather(
+            self._execute(
+                self.supabase.table(_TABLE)
+                .select("id", count="exact")
+                .eq("user_uuid", user_uuid)
+            ),
+            self._execute(
+                self.supabase.table(_TABLE)
+                .select("id, starts_at, amount_paid, status, payment_method, abacatepay_charge_id")
+                .eq("user_uuid", user_uuid)
+                .order("starts_at", desc=True)
+                .range(offset, offset + limit - 1)
+            ),
         )
         total = count_response.count or 0
 
-        # dados
-        data_response = (
-            self.supabase.table(_TABLE)
-            .select("id, starts_at, amount_paid, status, payment_method, abacatepay_charge_id")
-            .eq("user_uuid", user_uuid)
-            .order("starts_at", desc=True)
-            .range(offset, offset + limit - 1)
-            .execute()
-        )
-
         return data_response.data or [], total
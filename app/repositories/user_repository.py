@@ -7,27 +7,34 @@ from app.repositories.base import BaseRepository
 _TABLE = "users"
 
 
+def _quote(value: str) -> str:
+    """Valor entre aspas para filtros or=(...) do PostgREST (vírgulas, parênteses)."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
 class UserRepository(BaseRepository):
 
-    def email_exists(self, email: str) -> bool:
-        response = (
-            self.supabase.table(_TABLE)
-            .select("id")
-            .eq("email", email)
-            .execute()
-        )
-        return bool(response.data)
+    async def find_conflict(self, email: str, phone: str | None) -> str | None:
+        """Campo já cadastrado por outro usuário: "email", "phone" ou None.
 
-    def phone_exists(self, phone: str) -> bool:
-        response = (
+        Uma única consulta or=(email.eq.X,phone.eq.Y); limit 2 basta, já que
+        no máximo um usuário tem o email e um o telefone. Email tem precedência.
+        """
+        filters = f"email.eq.{_quote(email)}"
+        if phone:
+            filters += f",phone.eq.{_quote(phone)}"
+        response = await self._execute(
             self.supabase.table(_TABLE)
-            .select("id")
-            .eq("phone", phone)
-            .execute()
+            .select("email, phone")
+            .or_(filters)
+            .limit(2)
         )
-        return bool(response.data)
+        rows = response.data or []
+        if any(r["email"] == email for r in rows):
+            return "email"
+        return "phone" if rows else None
 
-    def create(
+    async def create(
         self,
         user_uuid: str,
         name: str,
@@ -37,7 +44,7 @@ class UserRepository(BaseRepository):
         trial_starts_at: datetime,
         trial_ends_at: datetime,
     ) -> dict:
-        response = (
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .insert({
                 "user_uuid": user_uuid,
@@ -49,63 +56,101 @@ class UserRepository(BaseRepository):
                 "trial_starts_at": trial_starts_at.isoformat(),
                 "trial_ends_at": trial_ends_at.isoformat(),
             })
-            .execute()
         )
         return response.data[0] if response.data else {}
 
-    def get_by_uuid(self, user_uuid: str) -> dict | None:
-        response = (
+    async def get_by_uuid(self, user_uuid: str) -> dict | None:
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select("user_uuid, name, email, plan_status, trial_starts_at, trial_ends_at")
             .eq("user_uuid", user_uuid)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
-    def update_plan_status(self, user_uuid: str, plan_status: str) -> None:
-        (
-            self.supabase.table(_TABLE)
-            .update({"plan_status": plan_status})
-            .eq("user_uuid", user_uuid)
-            .execute()
-        )
-
-    def update_customer_id(self, user_uuid: str, customer_id: str) -> None:
-        (
+    async def update_customer_id(self, user_uuid: str, customer_id: str) -> None:
+        await self._execute(
             self.supabase.table(_TABLE)
             .update({"customer_id": customer_id})
             .eq("user_uuid", user_uuid)
-            .execute()
         )
 
-    def get_profile(self, user_uuid: str) -> dict | None:
+    async def get_profile(self, user_uuid: str) -> dict | None:
         """Retorna perfil completo com JOIN em plans."""
-        response = (
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .select("user_uuid, name, email, phone, tax_id, plan_id, plan_status, created_at, plans(name)")
             .eq("user_uuid", user_uuid)
             .maybe_single()
-            .execute()
         )
         return response.data or None
 
-    def update_profile(self, user_uuid: str, fields: dict) -> dict | None:
+    async def update_profile(self, user_uuid: str, fields: dict) -> dict | None:
         """Atualiza campos de perfil. Retorna o registro atualizado."""
-        response = (
+        response = await self._execute(
             self.supabase.table(_TABLE)
             .update(fields)
             .eq("user_uuid", user_uuid)
-            .execute()
         )
         if response.data:
             return response.data[0]
-        return self.get_profile(user_uuid)
+        return await self.get_profile(user_uuid)
 
-    def update_plan_id(self, user_uuid: str, plan_id: int) -> None:
-        (
+    async def update_plan_id(self, user_uuid: str, plan_id: int) -> None:
+        await self._execute(
             self.supabase.table(_TABLE)
             .update({"plan_id": plan_id, "plan_status": "active"})
             .eq("user_uuid", user_uuid)
-            .execute()
         )
+
+    async def list_uuids(self, after: str | None, limit: int) -> list[str]:
+        """Próxima página de user_uuid em ordem crescente, por seek a partir de `after`."""
+        query = self.supabase.table(_TABLE).select("user_uuid")
+        if after is not None:
+            query = query.gt("user_uuid", after)
+        response = await self._execute(query.order("user_uuid").limit(limit))
+        return [r["user_uuid"] for r in response.data or []]
+
+    # ── Expiração de trials (app/tasks/expire_trials.py) ─────────────────────
+
+    async def expire_trials_chunk(self, job: str, limit: int) -> dict | None:
+        """Expira o próximo pedaço de trials vencidos e avança o watermark do job.
+
+        Retorna {"scanned", "expired", "done", ...}; None se a migration não
+        foi aplicada.
+        """
+        return await self._rpc("expire_trials", {"p_job": job, "p_limit": limit}, read_only=False)
+
+    async def list_lapsed_trials(
+        self,
+        cutoff: datetime,
+        after: tuple[str, str] | None,
+        limit: int,
+    ) -> list[dict]:
+        """Trials vencidos até `cutoff`, em ordem de (trial_ends_at, user_uuid).
+
+        `after` = (trial_ends_at, user_uuid) do último visto, para seguir por seek.
+        """
+        query = (
+            self.supabase.table(_TABLE)
+            .select("user_uuid, trial_ends_at")
+            .eq("plan_status", "trial")
+            .lte("trial_ends_at", cutoff.isoformat())
+        )
+        if after is not None:
+            ends_at, user_uuid = _quote(after[0]), _quote(after[1])
+            query = query.or_(f"trial_ends_at.gt.{ends_at},and(trial_ends_at.eq.{ends_at},user_uuid.gt.{user_uuid})")
+        response = await self._execute(
+            query.order("trial_ends_at").order("user_uuid").limit(limit)
+        )
+        return response.data or []
+
+    async def expire_trials(self, user_uuids: list[str]) -> int:
+        """UPDATE único; quem saiu do trial nesse meio tempo fica como está."""
+        response = await self._execute(
+            self.supabase.table(_TABLE)
+            .update({"plan_status": "expired"})
+            .in_("user_uuid", user_uuids)
+            .eq("plan_status", "trial")
+        )
+        return len(response.data or [])
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+# ── SSE de /ai/suggestions/{id}/stream ────────────────────────────────────────
+
+class SuggestionDelta(BaseModel):
+    """Evento `delta`: trecho do texto, na ordem em que o modelo gera."""
+    text: str
+
+
+class SuggestionDone(BaseModel):
+    """Evento `done`: texto final, que substitui os deltas recebidos.
+
+    fallback=True quando o modelo falhou ou estourou o prazo e o texto é o
+    padrão calculado localmente.
+    """
+    text: str
+    fallback: bool = False
@@ -35,7 +35,8 @@ class EmergencyFundResponse(BaseModel):
     priority: str
     target_date: date | None = None
     monthly_contribution: float | None = None
-    ai_suggestion: str
+    ai_suggestion: str  # texto padrão até o stream de ai_suggestion_id terminar
+    ai_suggestion_id: str | None = None  # None quando o texto já é o final
 
 
 # ── Next goal request/response ────────────────────────────────────────────────
@@ -62,7 +63,8 @@ class NextGoalResponse(BaseModel):
     priority: str
     target_date: date | None = None
     monthly_contribution: float | None = None
-    ai_suggestion: str
+    ai_suggestion: str  # texto padrão até o stream de ai_suggestion_id terminar
+    ai_suggestion_id: str | None = None  # None quando o texto já é o final
 
 
 # ── Suggested limits ──────────────────────────────────────────────────────────
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+from app.schemas.limit import LimitResponse
+
+
+class SummaryCategory(BaseModel):
+    category_id: int | None = None
+    category_name: str = ""
+    type: str
+    total: float
+    count: int
+
+
+class SummaryGoal(BaseModel):
+    goal_id: int
+    title: str
+    target_amount: float
+    current_amount: float
+    # current_amount é o valor na hora em que o job rodou (não há histórico
+    # de saldo das metas), em geral o dia 1 do mês seguinte; contribuições
+    # feitas entre a virada e o job entram neste mês.
+    # Variação frente ao resumo do mês anterior; None sem resumo anterior
+    delta: float | None = None
+    is_completed: bool
+
+
+class MonthlySummaryResponse(BaseModel):
+    month: date
+    income: float
+    expenses: float
+    balance: float
+    transaction_count: int
+    categories: list[SummaryCategory]
+    limits: list[LimitResponse]
+    goals: list[SummaryGoal]
+    computed_at: datetime
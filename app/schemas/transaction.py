@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Literal
+import datetime as dt
+from typing import Annotated, Literal, Union
 
 from pydantic import BaseModel, Field
 
@@ -10,7 +10,7 @@ class TransactionCreateRequest(BaseModel):
     category_id: int
     description: str = Field(min_length=1, max_length=255)
     amount: float = Field(gt=0)
-    date: date
+    date: dt.date
     type: Literal["entrada", "saida"]
     notes: str | None = None
     payment_method: Literal["dinheiro", "pix", "debito", "credito"] | None = None
@@ -20,7 +20,7 @@ class TransactionUpdateRequest(BaseModel):
     category_id: int | None = None
     description: str | None = Field(default=None, min_length=1, max_length=255)
     amount: float | None = Field(default=None, gt=0)
-    date: date | None = None
+    date: dt.date | None = None
     type: Literal["entrada", "saida"] | None = None
     notes: str | None = None
     payment_method: Literal["dinheiro", "pix", "debito", "credito"] | None = None
@@ -34,7 +34,7 @@ class TransactionResponse(BaseModel):
     category_color: str = ""
     description: str
     amount: float
-    date: date
+    date: dt.date
     type: str
     notes: str | None = None
     payment_method: str | None = None
@@ -49,8 +49,62 @@ class TransactionSummary(BaseModel):
 
 class TransactionsListResponse(BaseModel):
     data: list[TransactionResponse]
-    total: int
+    total: int | None = None  # None quando a contagem não foi pedida
+    next_cursor: str | None = None  # None na última página
 
 
 class TransactionDeleteResponse(BaseModel):
     message: str = "Transação removida com sucesso"
+
+
+class TransactionImportError(BaseModel):
+    row: int  # linha do CSV ou posição da transação no OFX
+    error: str
+
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TransactionImportError]  # limitado a TRANSACTION_IMPORT_MAX_ERRORS
+
+
+# ── Batch ─────────────────────────────────────────────────────────────────────
+
+class TransactionBatchCreate(BaseModel):
+    op: Literal["create"]
+    data: TransactionCreateRequest
+
+
+class TransactionBatchUpdate(BaseModel):
+    op: Literal["update"]
+    id: int
+    data: TransactionUpdateRequest
+
+
+class TransactionBatchDelete(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+TransactionBatchOperation = Annotated[
+    Union[TransactionBatchCreate, TransactionBatchUpdate, TransactionBatchDelete],
+    Field(discriminator="op"),
+]
+
+
+class TransactionBatchRequest(BaseModel):
+    operations: list[TransactionBatchOperation] = Field(min_length=1, max_length=500)
+
+
+class TransactionBatchResult(BaseModel):
+    index: int  # posição da operação em `operations`
+    op: str
+    status: int  # 200/201 em caso de sucesso; 404/422/500 como nos endpoints unitários
+    data: TransactionResponse | None = None  # None em remoções e falhas
+    error: str | None = None
+
+
+class TransactionBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TransactionBatchResult]
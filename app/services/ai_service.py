@@ -1,31 +1,252 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import uuid
+from typing import AsyncIterator
+
 import structlog
+from fastapi import HTTPException, status
 
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.metrics import track_external
+from app.schemas.ai import SuggestionDelta, SuggestionDone
 
 logger = structlog.get_logger()
 
+_MODEL = "claude-haiku-4-5-20251001"
+# Tempo que o cliente tem para abrir o stream depois de receber o id
+_SUGGESTION_TTL = 600
+# Folga do claim de geração além de AI_TIMEOUT_SECONDS (worker que morreu no meio)
+_CLAIM_MARGIN = 5.0
+# Intervalo de leitura do cache enquanto outro worker gera o texto
+_POLL_INTERVAL = 0.2
+
+# Cliente compartilhado (pool de conexões reaproveitado entre requisições)
+_client = None
+# Gerações em andamento por chave de cache: pedidos iguais acompanham a mesma
+_inflight: dict[str, _Generation] = {}
+
 
 def _get_client():
-    """Retorna cliente Anthropic ou None se API key não configurada."""
+    """Retorna o cliente Anthropic async ou None se API key não configurada."""
+    global _client
     if not settings.ANTHROPIC_API_KEY:
         return None
-    try:
-        import anthropic
-        return anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-    except ImportError:
-        logger.warning("anthropic_not_installed")
+    if _client is None:
+        try:
+            import anthropic
+        except ImportError:
+            logger.warning("anthropic_not_installed")
+            return None
+        # Timeout do cliente limita cada leitura; o prazo total fica em _generate.
+        # Sem retries, para uma tentativa não consumir o prazo das outras
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            timeout=settings.AI_TIMEOUT_SECONDS,
+            max_retries=0,
+        )
+    return _client
+
+
+async def close() -> None:
+    """Fecha o cliente compartilhado (shutdown da aplicação)."""
+    global _client
+    for generation in list(_inflight.values()):
+        generation.task.cancel()
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _cache_key(prompt: str) -> str:
+    return f"ai:{_MODEL}:{hashlib.sha256(prompt.encode()).hexdigest()}"
+
+
+# ── Geração compartilhada ─────────────────────────────────────────────────────
+
+class _Generation:
+    """Uma chamada ao modelo em andamento, acompanhada por vários streams.
+
+    Os trechos ficam guardados: quem chega depois recebe tudo desde o início.
+    `text` é o texto final, ou None se a chamada falhou.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.finished = False
+        self.text: str | None = None
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    def push(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, text: str | None) -> None:
+        self.text = text
+        self.finished = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+
+async def _generate(operation: str, prompt: str) -> _Generation | None:
+    """Geração em andamento para o prompt, iniciando uma se preciso.
+
+    Entre workers, o claim `<chave>:generating` no cache decide quem chama o
+    modelo; os demais acompanham o texto final pelo cache, sem trechos.
+    None quando não há cliente configurado.
+    """
+    key = _cache_key(prompt)
+    generation = _inflight.get(key)
+    if generation is not None:
+        return generation
+    client = _get_client()
+    if client is None:
         return None
 
+    generation = _Generation()
+    _inflight[key] = generation
+    claim = f"{key}:generating"
+    claimed = await cache.add(claim, 1, settings.AI_TIMEOUT_SECONDS + _CLAIM_MARGIN)
+
+    async def _wait_elsewhere() -> None:
+        text = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.AI_TIMEOUT_SECONDS + _CLAIM_MARGIN
+        try:
+            while loop.time() < deadline:
+                # Quem gera grava o texto antes de soltar o claim
+                generating = await cache.get(claim)
+                text = await cache.get(key)
+                if text is not None or generating is None:
+                    break
+                await asyncio.sleep(_POLL_INTERVAL)
+        finally:
+            if text:
+                generation.push(text)
+            generation.finish(text)
+            _inflight.pop(key, None)
+
+    async def _run() -> None:
+        text = None
+        try:
+            # Prazo da geração inteira: um stream que pinga devagar não passa dele.
+            # Por dentro de track_external, o estouro conta como erro da chamada
+            with track_external("anthropic", operation):
+                async with asyncio.timeout(settings.AI_TIMEOUT_SECONDS):
+                    async with client.messages.stream(
+                        model=_MODEL,
+                        max_tokens=150,
+                        messages=[{"role": "user", "content": prompt}],
+                    ) as stream:
+                        async for chunk in stream.text_stream:
+                            generation.push(chunk)
+            text = "".join(generation.chunks).strip() or None
+            if text:
+                await cache.set(key, text, settings.AI_SUGGESTION_CACHE_TTL)
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            logger.warning(f"ai_{operation}_timeout", timeout_seconds=settings.AI_TIMEOUT_SECONDS)
+        except Exception as exc:
+            logger.error(f"ai_{operation}_failed", error=str(exc) or type(exc).__name__)
+        finally:
+            await cache.delete(claim)
+            generation.finish(text)
+            _inflight.pop(key, None)
 
-def get_emergency_fund_suggestion(
+    generation.task = asyncio.create_task(_run() if claimed else _wait_elsewhere())
+    return generation
+
+
+# ── Sugestões ─────────────────────────────────────────────────────────────────
+
+async def start_suggestion(
+    user_uuid: str,
+    operation: str,
+    prompt: str,
+    fallback: str,
+) -> tuple[str, str | None]:
+    """(texto, id) para a resposta do onboarding, sem esperar o modelo.
+
+    Com o texto já em cache, devolve-o sem id. Senão devolve o texto padrão
+    com o id para GET /ai/suggestions/{id}/stream; o modelo só é chamado
+    quando o stream é aberto. Sem API key, só o texto padrão.
+    """
+    cached = await cache.get(_cache_key(prompt))
+    if cached is not None:
+        return cached, None
+    if _get_client() is None:
+        return fallback, None
+
+    suggestion_id = uuid.uuid4().hex
+    await cache.set(
+        f"ai:suggestion:{suggestion_id}",
+        {"user_uuid": user_uuid, "operation": operation, "prompt": prompt, "fallback": fallback},
+        _SUGGESTION_TTL,
+    )
+    return fallback, suggestion_id
+
+
+def _sse(event: str, payload: SuggestionDelta | SuggestionDone) -> bytes:
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n".encode()
+
+
+async def stream_suggestion(user_uuid: str, suggestion_id: str) -> AsyncIterator[bytes]:
+    """Eventos SSE da sugestão: `delta` a cada trecho e um `done` com o texto final.
+
+    O registro da sugestão fica no cache: com mais de um worker, só o backend
+    redis permite abrir o stream num worker diferente do que atendeu o POST.
+    """
+    record = await cache.get(f"ai:suggestion:{suggestion_id}")
+    if not record or record["user_uuid"] != user_uuid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sugestão não encontrada ou expirada")
+
+    async def events() -> AsyncIterator[bytes]:
+        cached = await cache.get(_cache_key(record["prompt"]))
+        if cached is not None:
+            yield _sse("done", SuggestionDone(text=cached))
+            return
+        generation = await _generate(record["operation"], record["prompt"])
+        if generation is None:
+            yield _sse("done", SuggestionDone(text=record["fallback"], fallback=True))
+            return
+        async for chunk in generation.follow():
+            yield _sse("delta", SuggestionDelta(text=chunk))
+        if generation.text:
+            yield _sse("done", SuggestionDone(text=generation.text))
+        else:
+            yield _sse("done", SuggestionDone(text=record["fallback"], fallback=True))
+
+    return events()
+
+
+# ── Prompts ───────────────────────────────────────────────────────────────────
+
+async def start_emergency_fund_suggestion(
+    user_uuid: str,
     target_amount: float,
     monthly_contribution: float,
     months: int,
     has_fund: bool,
-) -> str:
-    """Gera sugestão textual para meta de reserva de emergência."""
+) -> tuple[str, str | None]:
+    """Sugestão textual para meta de reserva de emergência (ver start_suggestion)."""
     fallback = (
         f"Parabéns! Sua reserva de emergência de R$ {target_amount:,.0f} já está em andamento."
         if has_fund
@@ -33,63 +254,34 @@ def get_emergency_fund_suggestion(
              f"a reserva de emergência de R$ {target_amount:,.0f} em aproximadamente {months} meses."
     )
 
-    client = _get_client()
-    if not client:
-        return fallback
-
-    try:
-        message = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=150,
-            messages=[{
-                "role": "user",
-                "content": (
-                    f"Você é um consultor financeiro brasileiro. Gere uma mensagem motivacional "
-                    f"curta (máx 2 frases) para um usuário que {'já tem' if has_fund else 'quer criar'} "
-                    f"uma reserva de emergência de R$ {target_amount:,.0f}. "
-                    f"{'Contribuição mensal sugerida: R$ ' + f'{monthly_contribution:,.0f}' + f', prazo: {months} meses.' if not has_fund else ''} "
-                    f"Seja direto, positivo e prático. Responda somente a mensagem, sem prefixo."
-                ),
-            }],
-        )
-        return message.content[0].text.strip()
-    except Exception as exc:
-        logger.error("ai_emergency_fund_suggestion_failed", error=str(exc))
-        return fallback
+    prompt = (
+        f"Você é um consultor financeiro brasileiro. Gere uma mensagem motivacional "
+        f"curta (máx 2 frases) para um usuário que {'já tem' if has_fund else 'quer criar'} "
+        f"uma reserva de emergência de R$ {target_amount:,.0f}. "
+        f"{'Contribuição mensal sugerida: R$ ' + f'{monthly_contribution:,.0f}' + f', prazo: {months} meses.' if not has_fund else ''} "
+        f"Seja direto, positivo e prático. Responda somente a mensagem, sem prefixo."
+    )
+    return await start_suggestion(user_uuid, "emergency_fund_suggestion", prompt, fallback)
 
 
-def get_goal_suggestion(
+async def start_goal_suggestion(
+    user_uuid: str,
     title: str,
     target_amount: float,
     monthly_contribution: float,
     months: int,
-) -> str:
-    """Gera sugestão textual para uma meta financeira."""
+) -> tuple[str, str | None]:
+    """Sugestão textual para uma meta financeira (ver start_suggestion)."""
     fallback = (
         f"Com contribuições de R$ {monthly_contribution:,.0f}/mês, "
         f"você atingirá a meta \"{title}\" de R$ {target_amount:,.0f} "
         f"em aproximadamente {months} meses."
     )
 
-    client = _get_client()
-    if not client:
-        return fallback
-
-    try:
-        message = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=150,
-            messages=[{
-                "role": "user",
-                "content": (
-                    f"Você é um consultor financeiro brasileiro. Gere uma mensagem motivacional "
-                    f"curta (máx 2 frases) para um usuário com meta \"{title}\" de R$ {target_amount:,.0f}, "
-                    f"contribuição mensal de R$ {monthly_contribution:,.0f} e prazo de {months} meses. "
-                    f"Seja direto, positivo e prático. Responda somente a mensagem, sem prefixo."
-                ),
-            }],
-        )
-        return message.content[0].text.strip()
-    except Exception as exc:
-        logger.error("ai_goal_suggestion_failed", error=str(exc))
-        return fallback
+    prompt = (
+        f"Você é um consultor financeiro brasileiro. Gere uma mensagem motivacional "
+        f"curta (máx 2 frases) para um usuário com meta \"{title.strip()}\" de R$ {target_amount:,.0f}, "
+        f"contribuição mensal de R$ {monthly_contribution:,.0f} e prazo de {months} meses. "
+        f"Seja direto, positivo e prático. Responda somente a mensagem, sem prefixo."
+    )
+    return await start_suggestion(user_uuid, "goal_suggestion", prompt, fallback)
@@ -6,9 +6,11 @@ from datetime import datetime, timedelta, timezone
 import httpx
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
 from app.core.config import settings
+from app.core.metrics import track_external
+from app.core.outbox import OutboxEvent, PermanentError, outbox
+from app.core.supabase_client import SupabaseClient, call, supabase_registry
 from app.repositories.onboarding_repository import OnboardingRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas.auth import (
@@ -47,60 +49,90 @@ def _format_phone(phone: str) -> str:
     return phone
 
 
-def _create_abacatepay_customer(
-    name: str,
-    email: str,
-    phone: str | None,
-    tax_id: str | None,
-) -> str | None:
-    """Cria cliente na AbacatePay. Retorna customer_id ou None em caso de falha.
-    Falha silenciosa: nunca bloqueia o registro do usuário.
-    """
-    if not settings.ABACATEPAY_API_KEY:
-        return None
+# ── AbacatePay (via outbox) ────────────────────────────────────────────────────
+
+_CUSTOMER_CREATE = "abacatepay.customer_create"
+
+# Cliente HTTP compartilhado pelo worker da outbox (pool keep-alive)
+_abacatepay_http: httpx.AsyncClient | None = None
+
+
+def _abacatepay() -> httpx.AsyncClient:
+    global _abacatepay_http
+    if _abacatepay_http is None:
+        _abacatepay_http = httpx.AsyncClient(
+            base_url=settings.ABACATEPAY_BASE_URL,
+            headers={"Authorization": f"Bearer {settings.ABACATEPAY_API_KEY}"},
+            timeout=settings.ABACATEPAY_HTTP_TIMEOUT,
+        )
+    return _abacatepay_http
+
+
+async def close() -> None:
+    """Fecha o cliente da AbacatePay (shutdown da aplicação)."""
+    global _abacatepay_http
+    if _abacatepay_http is not None:
+        await _abacatepay_http.aclose()
+        _abacatepay_http = None
 
+
+@outbox.handler(_CUSTOMER_CREATE)
+async def _create_abacatepay_customer(event: OutboxEvent) -> None:
+    """Cria o cliente na AbacatePay e grava o customer_id no perfil.
+
+    Erros sobem para a outbox, que repete com backoff; 4xx (exceto 408/429)
+    não mudam na próxima tentativa e encerram o evento.
+    """
+    payload = event.payload
     try:
-        with httpx.Client(timeout=10.0) as client:
-            response = client.post(
-                f"{settings.ABACATEPAY_BASE_URL}/v1/customer/create",
-                headers={"Authorization": f"Bearer {settings.ABACATEPAY_API_KEY}"},
+        with track_external("abacatepay", "customer_create"):
+            response = await _abacatepay().post(
+                "/v1/customer/create",
+                headers={"Idempotency-Key": event.idempotency_key},
                 json={
-                    "name": name,
-                    "cellphone": _format_phone(phone) if phone else "",
-                    "email": email,
-                    "taxId": tax_id or "",
+                    "name": payload["name"],
+                    "cellphone": _format_phone(payload["phone"]) if payload.get("phone") else "",
+                    "email": payload["email"],
+                    "taxId": payload.get("tax_id") or "",
                 },
             )
             response.raise_for_status()
-            data = response.json()
-            return data.get("data", {}).get("id") or data.get("id")
-    except Exception as exc:
-        logger.error("abacatepay_customer_create_failed", error=str(exc))
-        return None
+    except httpx.HTTPStatusError as exc:
+        code = exc.response.status_code
+        if 400 <= code < 500 and code not in (408, 429):
+            raise PermanentError(f"AbacatePay respondeu {code}: {exc.response.text[:200]}") from exc
+        raise
 
+    data = response.json()
+    customer_id = data.get("data", {}).get("id") or data.get("id")
+    if not customer_id:
+        raise PermanentError("AbacatePay não devolveu o id do cliente")
+    await UserRepository(supabase_registry.client).update_customer_id(payload["user_uuid"], customer_id)
+    logger.info("abacatepay_customer_created", user_uuid=payload["user_uuid"])
 
-def _rollback_auth_user(supabase: Client, user_uuid: str) -> None:
+
+async def _rollback_auth_user(supabase: SupabaseClient, user_uuid: str) -> None:
     """Remove o usuário do Supabase Auth em caso de falha no registro."""
     try:
-        supabase.auth.admin.delete_user(user_uuid)
+        await call(supabase.auth.admin.delete_user, user_uuid)
     except Exception as exc:
         logger.error("auth_rollback_failed", user_uuid=user_uuid, error=str(exc))
 
 
 # ── Register ───────────────────────────────────────────────────────────────────
 
-def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
+async def register(data: RegisterRequest, supabase: SupabaseClient) -> RegisterResponse:
     user_repo = UserRepository(supabase)
     onboarding_repo = OnboardingRepository(supabase)
 
-    # 1. Verifica duplicidade de email e WhatsApp antes de chamar o Supabase Auth
-    if user_repo.email_exists(data.email):
+    # 1. Verifica duplicidade de email e WhatsApp (uma consulta) antes de chamar o Supabase Auth
+    conflict = await user_repo.find_conflict(data.email, data.whatsapp)
+    if conflict == "email":
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email já cadastrado",
         )
-
-    if data.whatsapp and user_repo.phone_exists(data.whatsapp):
+    if conflict == "phone":
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="WhatsApp já cadastrado",
@@ -112,7 +144,7 @@ def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
 
     # 3. Cria usuário no Supabase Auth
     try:
-        auth_response = supabase.auth.sign_up({
+        auth_response = await call(supabase.auth.sign_up, {
             "email": data.email,
             "password": data.password,
         })
@@ -144,7 +176,7 @@ def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
 
     # 4. Cria perfil em public.users
     try:
-        user_repo.create(
+        await user_repo.create(
             user_uuid=user_uuid,
             name=data.name,
             email=data.email,
@@ -155,7 +187,7 @@ def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
         )
     except Exception as exc:
         logger.error("user_profile_create_failed", user_uuid=user_uuid, error=str(exc))
-        _rollback_auth_user(supabase, user_uuid)
+        await _rollback_auth_user(supabase, user_uuid)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao criar perfil do usuário",
@@ -163,27 +195,28 @@ def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
 
     # 5. Cria registro inicial de onboarding
     try:
-        onboarding_repo.create(user_uuid)
+        await onboarding_repo.create(user_uuid)
     except Exception as exc:
         logger.error("onboarding_create_failed", user_uuid=user_uuid, error=str(exc))
-        _rollback_auth_user(supabase, user_uuid)
+        await _rollback_auth_user(supabase, user_uuid)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao inicializar onboarding",
         )
 
-    # 6. Cria cliente na AbacatePay (falha silenciosa)
-    customer_id = _create_abacatepay_customer(
-        name=data.name,
-        email=data.email,
-        phone=data.whatsapp,
-        tax_id=data.cpf,
-    )
-    if customer_id:
-        try:
-            user_repo.update_customer_id(user_uuid, customer_id)
-        except Exception as exc:
-            logger.error("customer_id_update_failed", user_uuid=user_uuid, error=str(exc))
+    # 6. Agenda a criação do cliente na AbacatePay (worker da outbox)
+    if settings.ABACATEPAY_API_KEY:
+        await outbox.enqueue(
+            _CUSTOMER_CREATE,
+            {
+                "user_uuid": user_uuid,
+                "name": data.name,
+                "email": data.email,
+                "phone": data.whatsapp,
+                "tax_id": data.cpf,
+            },
+            idempotency_key=f"{_CUSTOMER_CREATE}:{user_uuid}",
+        )
 
     logger.info("user_registered", user_uuid=user_uuid, email=data.email)
 
@@ -199,13 +232,13 @@ def register(data: RegisterRequest, supabase: Client) -> RegisterResponse:
 
 # ── Login ──────────────────────────────────────────────────────────────────────
 
-def login(data: LoginRequest, supabase: Client) -> LoginResponse:
+async def login(data: LoginRequest, supabase: SupabaseClient) -> LoginResponse:
     user_repo = UserRepository(supabase)
     onboarding_repo = OnboardingRepository(supabase)
 
     # 1. Autentica via Supabase Auth
     try:
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await call(supabase.auth.sign_in_with_password, {
             "email": data.email,
             "password": data.password,
         })
@@ -236,7 +269,7 @@ def login(data: LoginRequest, supabase: Client) -> LoginResponse:
     user_uuid = str(auth_response.user.id)
 
     # 2. Busca perfil no DB
-    profile = user_repo.get_by_uuid(user_uuid)
+    profile = await user_repo.get_by_uuid(user_uuid)
     if not profile:
         logger.error("user_profile_not_found", user_uuid=user_uuid)
         raise HTTPException(
@@ -244,7 +277,8 @@ def login(data: LoginRequest, supabase: Client) -> LoginResponse:
             detail="Perfil do usuário não encontrado",
         )
 
-    # 3. Verifica se o trial expirou e atualiza o status
+    # 3. Trial vencido conta como expirado mesmo antes do job gravar no banco
+    #    (ver app/tasks/expire_trials.py): o login não escreve em users
     plan_status = profile["plan_status"]
     now = datetime.now(timezone.utc)
 
@@ -256,10 +290,6 @@ def login(data: LoginRequest, supabase: Client) -> LoginResponse:
 
         if now > trial_ends_at:
             plan_status = "expired"
-            try:
-                user_repo.update_plan_status(user_uuid, "expired")
-            except Exception as exc:
-                logger.error("plan_status_update_failed", user_uuid=user_uuid, error=str(exc))
 
     # 4. Monta trial info (apenas quando relevante)
     trial_info: TrialInfo | None = None
@@ -279,7 +309,7 @@ def login(data: LoginRequest, supabase: Client) -> LoginResponse:
         )
 
     # 5. Verifica onboarding
-    onboarding_completed = onboarding_repo.is_completed(user_uuid)
+    onboarding_completed = await onboarding_repo.is_completed(user_uuid)
 
     logger.info("user_logged_in", user_uuid=user_uuid, plan_status=plan_status)
 
@@ -299,9 +329,9 @@ def login(data: LoginRequest, supabase: Client) -> LoginResponse:
 
 # ── Refresh ────────────────────────────────────────────────────────────────────
 
-def refresh(data: RefreshRequest, supabase: Client) -> RefreshResponse:
+async def refresh(data: RefreshRequest, supabase: SupabaseClient) -> RefreshResponse:
     try:
-        auth_response = supabase.auth.refresh_session(data.refresh_token)
+        auth_response = await call(supabase.auth.refresh_session, data.refresh_token)
     except Exception as exc:
         msg = str(exc).lower()
         if "invalid" in msg or "expired" in msg or "not found" in msg:
@@ -331,12 +361,12 @@ def refresh(data: RefreshRequest, supabase: Client) -> RefreshResponse:
 
 # ── Forgot password ────────────────────────────────────────────────────────────
 
-def forgot_password(data: ForgotPasswordRequest, supabase: Client) -> ForgotPasswordResponse:
+async def forgot_password(data: ForgotPasswordRequest, supabase: SupabaseClient) -> ForgotPasswordResponse:
     """Dispara o email de redefinição via Supabase.
     Sempre retorna sucesso — nunca revela se o email existe ou não.
     """
     try:
-        supabase.auth.reset_password_email(data.email)
+        await call(supabase.auth.reset_password_email, data.email)
     except Exception as exc:
         # Loga mas não expõe o erro ao cliente (evita user enumeration)
         logger.error("reset_password_email_failed", email=data.email, error=str(exc))
@@ -347,11 +377,11 @@ def forgot_password(data: ForgotPasswordRequest, supabase: Client) -> ForgotPass
 
 # ── Reset password ─────────────────────────────────────────────────────────────
 
-def reset_password(data: ResetPasswordRequest, supabase: Client) -> ResetPasswordResponse:
+async def reset_password(data: ResetPasswordRequest, supabase: SupabaseClient) -> ResetPasswordResponse:
     """Troca a senha usando o token OTP do link de redefinição."""
     # 1. Troca o token por uma sessão válida
     try:
-        session_response = supabase.auth.exchange_code_for_session(data.token)
+        session_response = await call(supabase.auth.exchange_code_for_session, data.token)
     except Exception as exc:
         msg = str(exc).lower()
         logger.error("exchange_code_failed", error=str(exc))
@@ -374,11 +404,12 @@ def reset_password(data: ResetPasswordRequest, supabase: Client) -> ResetPasswor
     # 2. Atualiza a senha usando o access_token da sessão recém-criada
     try:
         session_client = supabase
-        session_client.auth.set_session(
+        await call(
+            session_client.auth.set_session,
             session_response.session.access_token,
             session_response.session.refresh_token,
         )
-        session_client.auth.update_user({"password": data.new_password})
+        await call(session_client.auth.update_user, {"password": data.new_password})
     except Exception as exc:
         logger.error("update_password_failed", error=str(exc))
         raise HTTPException(
@@ -392,9 +423,9 @@ def reset_password(data: ResetPasswordRequest, supabase: Client) -> ResetPasswor
 
 # ── Logout ─────────────────────────────────────────────────────────────────────
 
-def logout(access_token: str, supabase: Client) -> LogoutResponse:
+async def logout(access_token: str, supabase: SupabaseClient) -> LogoutResponse:
     try:
-        supabase.auth.admin.sign_out(access_token)
+        await call(supabase.auth.admin.sign_out, access_token)
     except Exception as exc:
         logger.error("supabase_signout_failed", error=str(exc))
         raise HTTPException(
@@ -406,12 +437,12 @@ def logout(access_token: str, supabase: Client) -> LogoutResponse:
 
 # ── Resend confirmation ─────────────────────────────────────────────────────────
 
-def resend_confirmation(data: ResendConfirmationRequest, supabase: Client) -> ResendConfirmationResponse:
+async def resend_confirmation(data: ResendConfirmationRequest, supabase: SupabaseClient) -> ResendConfirmationResponse:
     """Reenvio do email de confirmação de cadastro via Supabase.
     Retorna 429 se o rate limit for atingido; demais erros são silenciosos.
     """
     try:
-        supabase.auth.resend({"type": "signup", "email": data.email})
+        await call(supabase.auth.resend, {"type": "signup", "email": data.email})
     except Exception as exc:
         msg = str(exc).lower()
         if "429" in msg or "rate limit" in msg:
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.concurrency import gather
+from app.core.supabase_client import SupabaseClient
 from app.repositories.category_repository import CategoryRepository
 from app.schemas.category import (
     CategoriesListResponse,
@@ -32,33 +33,35 @@ def _to_response(row: dict, stats: dict[int, dict] | None = None) -> CategoryRes
 
 # ── GET /categories/ ──────────────────────────────────────────────────────────
 
-def list_categories(
+async def list_categories(
     user_uuid: str,
     type_filter: str | None,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> CategoriesListResponse:
     repo = CategoryRepository(supabase)
-    rows = repo.list_by_user(user_uuid, type_filter)
-    stats = repo.get_transaction_stats(user_uuid)
+    rows, stats = await gather(
+        repo.list_by_user(user_uuid, type_filter),
+        repo.get_transaction_stats(user_uuid),
+    )
     return CategoriesListResponse(data=[_to_response(r, stats) for r in rows])
 
 
 # ── POST /categories/ ─────────────────────────────────────────────────────────
 
-def create_category(
+async def create_category(
     user_uuid: str,
     data: CategoryCreateRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> CategoryResponse:
     repo = CategoryRepository(supabase)
 
-    if repo.name_exists(user_uuid, data.name):
+    if await repo.name_exists(user_uuid, data.name):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Categoria com este nome já existe",
         )
 
-    row = repo.create(
+    row = await repo.create(
         user_uuid=user_uuid,
         name=data.name.strip(),
         icon=data.icon.strip(),
@@ -72,25 +75,18 @@ def create_category(
 
 # ── PUT /categories/{id} ──────────────────────────────────────────────────────
 
-def update_category(
+async def update_category(
     user_uuid: str,
     category_id: int,
     data: CategoryUpdateRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> CategoryResponse:
     repo = CategoryRepository(supabase)
 
-    existing = repo.get_by_id(user_uuid, category_id)
-    if not existing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Categoria não encontrada",
-        )
-
     fields: dict = {}
     if data.name is not None:
         name = data.name.strip()
-        if repo.name_exists(user_uuid, name, exclude_id=category_id):
+        if await repo.name_exists(user_uuid, name, exclude_id=category_id):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Categoria com este nome já existe",
@@ -104,38 +100,44 @@ def update_category(
         fields["type"] = data.type
 
     if not fields:
-        stats = repo.get_transaction_stats(user_uuid)
+        existing, stats = await gather(
+            repo.get_by_id(user_uuid, category_id),
+            repo.get_transaction_stats(user_uuid, category_id),
+        )
+        if not existing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Categoria não encontrada",
+            )
         return _to_response(existing, stats)
 
-    updated = repo.update(user_uuid, category_id, fields)
+    # O update só casa com (id, user_uuid): nenhuma linha devolvida = 404
+    updated = await repo.update(user_uuid, category_id, fields)
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoria não encontrada",
         )
 
-    stats = repo.get_transaction_stats(user_uuid)
+    stats = await repo.get_transaction_stats(user_uuid, category_id)
     logger.info("category_updated", user_uuid=user_uuid, category_id=category_id)
     return _to_response(updated, stats)
 
 
 # ── DELETE /categories/{id} ───────────────────────────────────────────────────
 
-def delete_category(
+async def delete_category(
     user_uuid: str,
     category_id: int,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> CategoryDeleteResponse:
     repo = CategoryRepository(supabase)
 
-    existing = repo.get_by_id(user_uuid, category_id)
-    if not existing:
+    if not await repo.delete(user_uuid, category_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Categoria não encontrada",
         )
 
-    repo.delete(user_uuid, category_id)
-
     logger.info("category_deleted", user_uuid=user_uuid, category_id=category_id)
     return CategoryDeleteResponse()
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.supabase_client import SupabaseClient
 from app.repositories.goal_repository import GoalRepository
 from app.schemas.goal import (
     GoalCreateRequest,
@@ -35,23 +35,23 @@ def _to_response(row: dict) -> GoalResponse:
     )
 
 
-def list_goals(user_uuid: str, completed, supabase: Client) -> GoalsListResponse:
+async def list_goals(user_uuid: str, completed, supabase: SupabaseClient) -> GoalsListResponse:
     repo = GoalRepository(supabase)
-    rows = repo.list_by_user(user_uuid, completed)
+    rows = await repo.list_by_user(user_uuid, completed)
     return GoalsListResponse(data=[_to_response(r) for r in rows])
 
 
-def get_goal(user_uuid: str, goal_id: int, supabase: Client) -> GoalResponse:
+async def get_goal(user_uuid: str, goal_id: int, supabase: SupabaseClient) -> GoalResponse:
     repo = GoalRepository(supabase)
-    row = repo.get_by_id(user_uuid, goal_id)
+    row = await repo.get_by_id(user_uuid, goal_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta nao encontrada")
     return _to_response(row)
 
 
-def create_goal(user_uuid: str, data: GoalCreateRequest, supabase: Client) -> GoalResponse:
+async def create_goal(user_uuid: str, data: GoalCreateRequest, supabase: SupabaseClient) -> GoalResponse:
     repo = GoalRepository(supabase)
-    row = repo.create(
+    row = await repo.create(
         user_uuid=user_uuid,
         title=data.title.strip(),
         target_amount=data.target_amount,
@@ -64,12 +64,8 @@ def create_goal(user_uuid: str, data: GoalCreateRequest, supabase: Client) -> Go
     return _to_response(row)
 
 
-def update_goal(user_uuid: str, goal_id: int, data: GoalUpdateRequest, supabase: Client) -> GoalResponse:
+async def update_goal(user_uuid: str, goal_id: int, data: GoalUpdateRequest, supabase: SupabaseClient) -> GoalResponse:
     repo = GoalRepository(supabase)
-    existing = repo.get_by_id(user_uuid, goal_id)
-    if not existing:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta nao encontrada")
-
     fields: dict = {}
     if data.title is not None:
         fields["title"] = data.title.strip()
@@ -85,9 +81,10 @@ def update_goal(user_uuid: str, goal_id: int, data: GoalUpdateRequest, supabase:
         fields["monthly_contribution"] = data.monthly_contribution
 
     if not fields:
-        return _to_response(existing)
+        return await get_goal(user_uuid, goal_id, supabase)
 
-    updated = repo.update(user_uuid, goal_id, fields)
+    # O update só casa com (id, user_uuid): nenhuma linha devolvida = 404
+    updated = await repo.update(user_uuid, goal_id, fields)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta nao encontrada")
 
@@ -95,20 +92,18 @@ def update_goal(user_uuid: str, goal_id: int, data: GoalUpdateRequest, supabase:
     return _to_response(updated)
 
 
-def add_goal_progress(user_uuid: str, goal_id: int, data: GoalProgressRequest, supabase: Client) -> GoalResponse:
+async def add_goal_progress(user_uuid: str, goal_id: int, data: GoalProgressRequest, supabase: SupabaseClient) -> GoalResponse:
     repo = GoalRepository(supabase)
-    updated = repo.add_progress(user_uuid, goal_id, data.amount)
+    updated = await repo.add_progress(user_uuid, goal_id, data.amount)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta nao encontrada")
     logger.info("goal_progress_added", user_uuid=user_uuid, goal_id=goal_id, amount=data.amount)
     return _to_response(updated)
 
 
-def delete_goal(user_uuid: str, goal_id: int, supabase: Client) -> GoalDeleteResponse:
+async def delete_goal(user_uuid: str, goal_id: int, supabase: SupabaseClient) -> GoalDeleteResponse:
     repo = GoalRepository(supabase)
-    existing = repo.get_by_id(user_uuid, goal_id)
-    if not existing:
+    if not await repo.delete(user_uuid, goal_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meta nao encontrada")
-    repo.delete(user_uuid, goal_id)
     logger.info("goal_deleted", user_uuid=user_uuid, goal_id=goal_id)
     return GoalDeleteResponse()
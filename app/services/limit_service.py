@@ -5,10 +5,12 @@ from datetime import date
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.concurrency import gather
+from app.core.supabase_client import SupabaseClient
 from app.repositories.category_repository import CategoryRepository
 from app.repositories.limit_repository import LimitRepository
+from app.repositories.spending_rollup_repository import SpendingRollupRepository
 from app.repositories.transaction_repository import TransactionRepository
 from app.schemas.limit import (
     LimitCreateRequest,
@@ -27,7 +29,17 @@ def _month_range() -> tuple[date, date]:
     return date(today.year, today.month, 1), date(today.year, today.month, last_day)
 
 
-def _to_response(row: dict, cat_map: dict[int, dict], spent_map: dict[int, float]) -> LimitResponse:
+async def _month_spending(user_uuid: str, supabase: SupabaseClient) -> dict[int, float]:
+    """Gasto do mês corrente por categoria: rollup, ou soma das transações sem ele."""
+    month_start, month_end = _month_range()
+    spent_map = await SpendingRollupRepository(supabase).month_spending(user_uuid, month_start)
+    if spent_map is None:
+        spent_map = await TransactionRepository(supabase).spending_this_month(user_uuid, month_start, month_end)
+    return spent_map
+
+
+def to_response(row: dict, cat_map: dict[int, dict], spent_map: dict[int, float]) -> LimitResponse:
+    """Limite com gasto, saldo e percentual usado; também entra no resumo mensal."""
     cid = row["category_id"]
     cat = cat_map.get(cid, {})
     limit_amount = float(row["amount"])
@@ -50,65 +62,61 @@ def _to_response(row: dict, cat_map: dict[int, dict], spent_map: dict[int, float
 
 # ── GET /limits/ ──────────────────────────────────────────────────────────────
 
-def list_limits(user_uuid: str, supabase: Client) -> LimitsListResponse:
+async def list_limits(user_uuid: str, supabase: SupabaseClient) -> LimitsListResponse:
     repo = LimitRepository(supabase)
-    rows = repo.list_by_user(user_uuid)
-    cat_map = repo.get_categories_map(user_uuid)
-    month_start, month_end = _month_range()
-    spent_map = TransactionRepository(supabase).spending_this_month(user_uuid, month_start, month_end)
-    return LimitsListResponse(data=[_to_response(r, cat_map, spent_map) for r in rows])
+    rows, cat_map, spent_map = await gather(
+        repo.list_by_user(user_uuid),
+        CategoryRepository(supabase).get_categories_map(user_uuid),
+        _month_spending(user_uuid, supabase),
+    )
+    return LimitsListResponse(data=[to_response(r, cat_map, spent_map) for r in rows])
 
 
 # ── POST /limits/ ─────────────────────────────────────────────────────────────
 
-def create_limit(user_uuid: str, data: LimitCreateRequest, supabase: Client) -> LimitResponse:
+async def create_limit(user_uuid: str, data: LimitCreateRequest, supabase: SupabaseClient) -> LimitResponse:
     repo = LimitRepository(supabase)
 
     # Validate category
     cat_repo = CategoryRepository(supabase)
-    cat = cat_repo.get_by_id(user_uuid, data.category_id)
+    cat = await cat_repo.find_cached(user_uuid, data.category_id)
     if not cat:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Categoria não encontrada")
 
     # Check uniqueness
-    existing = repo.get_by_category(user_uuid, data.category_id)
+    existing = await repo.get_by_category(user_uuid, data.category_id)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Já existe um limite para esta categoria")
 
-    row = repo.create(user_uuid, data.category_id, data.amount)
-    month_start, month_end = _month_range()
-    spent_map = TransactionRepository(supabase).spending_this_month(user_uuid, month_start, month_end)
+    row = await repo.create(user_uuid, data.category_id, data.amount)
+    spent_map = await _month_spending(user_uuid, supabase)
     cat_map = {data.category_id: cat}
     logger.info("limit_created", user_uuid=user_uuid, category_id=data.category_id)
-    return _to_response(row, cat_map, spent_map)
+    return to_response(row, cat_map, spent_map)
 
 
 # ── PUT /limits/{id} ──────────────────────────────────────────────────────────
 
-def update_limit(user_uuid: str, limit_id: int, data: LimitUpdateRequest, supabase: Client) -> LimitResponse:
+async def update_limit(user_uuid: str, limit_id: int, data: LimitUpdateRequest, supabase: SupabaseClient) -> LimitResponse:
     repo = LimitRepository(supabase)
-    existing = repo.get_by_id(user_uuid, limit_id)
-    if not existing:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Limite não encontrado")
-
-    updated = repo.update(user_uuid, limit_id, data.amount)
+    # O update só casa com (id, user_uuid): nenhuma linha devolvida = 404
+    updated = await repo.update(user_uuid, limit_id, data.amount)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Limite não encontrado")
 
-    cat_map = repo.get_categories_map(user_uuid)
-    month_start, month_end = _month_range()
-    spent_map = TransactionRepository(supabase).spending_this_month(user_uuid, month_start, month_end)
+    cat_map, spent_map = await gather(
+        CategoryRepository(supabase).get_categories_map(user_uuid),
+        _month_spending(user_uuid, supabase),
+    )
     logger.info("limit_updated", user_uuid=user_uuid, limit_id=limit_id)
-    return _to_response(updated, cat_map, spent_map)
+    return to_response(updated, cat_map, spent_map)
 
 
 # ── DELETE /limits/{id} ───────────────────────────────────────────────────────
 
-def delete_limit(user_uuid: str, limit_id: int, supabase: Client) -> LimitDeleteResponse:
+async def delete_limit(user_uuid: str, limit_id: int, supabase: SupabaseClient) -> LimitDeleteResponse:
     repo = LimitRepository(supabase)
-    existing = repo.get_by_id(user_uuid, limit_id)
-    if not existing:
+    if not await repo.delete(user_uuid, limit_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Limite não encontrado")
-    repo.delete(user_uuid, limit_id)
     logger.info("limit_deleted", user_uuid=user_uuid, limit_id=limit_id)
     return LimitDeleteResponse()
@@ -5,8 +5,8 @@ from datetime import date, datetime, timezone
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.supabase_client import SupabaseClient
 from app.repositories.category_repository import CategoryRepository
 from app.repositories.goal_repository import GoalRepository
 from app.repositories.limit_repository import LimitRepository
@@ -128,9 +128,9 @@ def _map_db_to_response(row: dict, include_ef_preview: bool = False) -> Onboardi
 
 # ── GET /onboarding/ ──────────────────────────────────────────────────────────
 
-def get_onboarding(user_uuid: str, supabase: Client) -> OnboardingResponse:
+async def get_onboarding(user_uuid: str, supabase: SupabaseClient) -> OnboardingResponse:
     repo = OnboardingRepository(supabase)
-    row = repo.get(user_uuid)
+    row = await repo.get(user_uuid)
     if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,15 +141,15 @@ def get_onboarding(user_uuid: str, supabase: Client) -> OnboardingResponse:
 
 # ── POST /onboarding/ ─────────────────────────────────────────────────────────
 
-def save_onboarding(
+async def save_onboarding(
     user_uuid: str,
     data: OnboardingSaveRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> OnboardingResponse:
     repo = OnboardingRepository(supabase)
 
     # Garante que o registro existe
-    existing = repo.get(user_uuid)
+    existing = await repo.get(user_uuid)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -186,7 +186,7 @@ def save_onboarding(
         suggested_limits = _calculate_suggested_limits(income, categories)
         fields["suggested_limits"] = suggested_limits
 
-    updated = repo.upsert(user_uuid, fields)
+    updated = await repo.upsert(user_uuid, fields)
 
     response = _map_db_to_response(updated)
 
@@ -214,10 +214,10 @@ def save_onboarding(
 
 # ── PATCH /onboarding/complete ────────────────────────────────────────────────
 
-def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteResponse:
+async def complete_onboarding(user_uuid: str, supabase: SupabaseClient) -> OnboardingCompleteResponse:
     onboarding_repo = OnboardingRepository(supabase)
 
-    row = onboarding_repo.get(user_uuid)
+    row = await onboarding_repo.get(user_uuid)
     if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -246,7 +246,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
         }
         for cat in selected_categories
     ]
-    created_cats = cat_repo.bulk_create(user_uuid, category_rows)
+    created_cats = await cat_repo.bulk_create(user_uuid, category_rows)
     categories_created = len(created_cats)
 
     # 2. Criar limites (proporcional à renda)
@@ -261,7 +261,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
         for cat in selected_categories
         if cat in cat_id_map
     ]
-    created_limits = limit_repo.bulk_create(user_uuid, limit_rows)
+    created_limits = await limit_repo.bulk_create(user_uuid, limit_rows)
     limits_created = len(created_limits)
 
     # 3. Criar metas
@@ -273,7 +273,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
     if has_ef:
         # Usuário já tem reserva → meta com current_amount = valor informado
         target = ef_amount or round(monthly_cost * 6, 2)
-        ef_goal = goal_repo.create(
+        ef_goal = await goal_repo.create(
             user_uuid=user_uuid,
             title="Reserva de Emergência",
             target_amount=target,
@@ -285,7 +285,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
         target = round(monthly_cost * 6, 2)
         months = _months_to_reach(target, contribution)
         target_date = _add_months(date.today(), months)
-        ef_goal = goal_repo.create(
+        ef_goal = await goal_repo.create(
             user_uuid=user_uuid,
             title="Reserva de Emergência",
             target_amount=target,
@@ -313,7 +313,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
             ng_months = _months_to_reach(ng.target_amount, contribution * 0.5)
             ng_target_date = ng.target_date or _add_months(date.today(), ng_months)
             ng_contribution = ng.monthly_contribution or round(contribution * 0.5, 2)
-            ng_goal = goal_repo.create(
+            ng_goal = await goal_repo.create(
                 user_uuid=user_uuid,
                 title=ng.title,
                 description=ng.description,
@@ -333,7 +333,7 @@ def complete_onboarding(user_uuid: str, supabase: Client) -> OnboardingCompleteR
             logger.error("next_goal_create_failed", user_uuid=user_uuid, error=str(exc))
 
     # 4. Marcar onboarding como concluído
-    onboarding_repo.mark_complete(user_uuid)
+    await onboarding_repo.mark_complete(user_uuid)
 
     logger.info("onboarding_completed", user_uuid=user_uuid)
 
@@ -357,15 +357,17 @@ def get_suggested_limits(income: float, categories: list[str]) -> dict[str, floa
 
 # ── POST /onboarding/emergency-fund ──────────────────────────────────────────
 
-def calculate_emergency_fund(
+async def calculate_emergency_fund(
+    user_uuid: str,
     data: EmergencyFundRequest,
-    supabase: Client,  # noqa: ARG001  (mantido para consistência na assinatura)
+    supabase: SupabaseClient,  # noqa: ARG001  (mantido para consistência na assinatura)
 ) -> EmergencyFundResponse:
     if data.has_emergency_fund:
         # Usuário já tem reserva
         target = data.emergency_fund_amount or round(data.monthly_cost * 6, 2)
         current = data.emergency_fund_amount or 0.0
-        suggestion = ai_service.get_emergency_fund_suggestion(
+        suggestion, suggestion_id = await ai_service.start_emergency_fund_suggestion(
+            user_uuid,
             target_amount=target,
             monthly_contribution=0,
             months=0,
@@ -377,6 +379,7 @@ def calculate_emergency_fund(
             current_amount=current,
             priority="baixa",
             ai_suggestion=suggestion,
+            ai_suggestion_id=suggestion_id,
         )
 
     # Usuário NÃO tem reserva
@@ -385,7 +388,8 @@ def calculate_emergency_fund(
     months = _months_to_reach(target, contribution)
     target_date = _add_months(date.today(), months)
 
-    suggestion = ai_service.get_emergency_fund_suggestion(
+    suggestion, suggestion_id = await ai_service.start_emergency_fund_suggestion(
+        user_uuid,
         target_amount=target,
         monthly_contribution=contribution,
         months=months,
@@ -400,19 +404,20 @@ def calculate_emergency_fund(
         target_date=target_date,
         monthly_contribution=contribution,
         ai_suggestion=suggestion,
+        ai_suggestion_id=suggestion_id,
     )
 
 
 # ── POST /onboarding/next-goal ────────────────────────────────────────────────
 
-def calculate_next_goal(
+async def calculate_next_goal(
     user_uuid: str,
     data: NextGoalRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> NextGoalResponse:
     # Valida que o usuário tem ou está criando uma reserva de emergência
     repo = OnboardingRepository(supabase)
-    row = repo.get(user_uuid)
+    row = await repo.get(user_uuid)
     if not row or not row.get("has_emergency_fund"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -443,7 +448,8 @@ def calculate_next_goal(
     months = _months_to_reach(target_amount, goal_contribution)
     target_date = _add_months(date.today(), months)
 
-    suggestion = ai_service.get_goal_suggestion(
+    suggestion, suggestion_id = await ai_service.start_goal_suggestion(
+        user_uuid,
         title=title,
         target_amount=target_amount,
         monthly_contribution=goal_contribution,
@@ -461,4 +467,5 @@ def calculate_next_goal(
         target_date=target_date,
         monthly_contribution=goal_contribution,
         ai_suggestion=suggestion,
+        ai_suggestion_id=suggestion_id,
     )
@@ -4,8 +4,9 @@ from datetime import datetime, timedelta, timezone
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.concurrency import gather
+from app.core.supabase_client import SupabaseClient
 from app.repositories.onboarding_repository import OnboardingRepository
 from app.repositories.user_plan_subscription_repository import UserPlanSubscriptionRepository
 from app.repositories.user_repository import UserRepository
@@ -70,12 +71,16 @@ def _build_profile_response(
 
 # ── GET /profile/ ─────────────────────────────────────────────────────────────
 
-def get_profile(user_uuid: str, supabase: Client) -> ProfileResponse:
+async def get_profile(user_uuid: str, supabase: SupabaseClient) -> ProfileResponse:
     user_repo = UserRepository(supabase)
     plan_sub_repo = UserPlanSubscriptionRepository(supabase)
     onboarding_repo = OnboardingRepository(supabase)
 
-    row = user_repo.get_profile(user_uuid)
+    row, active_sub, onboarding_completed = await gather(
+        user_repo.get_profile(user_uuid),
+        plan_sub_repo.get_active(user_uuid),
+        onboarding_repo.is_completed(user_uuid),
+    )
     if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -83,21 +88,18 @@ def get_profile(user_uuid: str, supabase: Client) -> ProfileResponse:
         )
 
     # billing_period da assinatura ativa (null se trial)
-    active_sub = plan_sub_repo.get_active(user_uuid)
     billing_period = active_sub["recurrence"] if active_sub else None
 
-    onboarding_completed = onboarding_repo.is_completed(user_uuid)
-
     logger.info("profile_fetched", user_uuid=user_uuid)
     return _build_profile_response(row, billing_period, onboarding_completed)
 
 
 # ── PUT /profile/ ─────────────────────────────────────────────────────────────
 
-def update_profile(
+async def update_profile(
     user_uuid: str,
     data: ProfileUpdateRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> ProfileResponse:
     user_repo = UserRepository(supabase)
     plan_sub_repo = UserPlanSubscriptionRepository(supabase)
@@ -111,18 +113,20 @@ def update_profile(
 
     if not fields:
         # Nada enviado — retorna perfil atual
-        return get_profile(user_uuid, supabase)
+        return await get_profile(user_uuid, supabase)
 
-    updated = user_repo.update_profile(user_uuid, fields)
+    updated, active_sub, onboarding_completed = await gather(
+        user_repo.update_profile(user_uuid, fields),
+        plan_sub_repo.get_active(user_uuid),
+        onboarding_repo.is_completed(user_uuid),
+    )
     if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Perfil não encontrado",
         )
 
-    active_sub = plan_sub_repo.get_active(user_uuid)
     billing_period = active_sub["recurrence"] if active_sub else None
-    onboarding_completed = onboarding_repo.is_completed(user_uuid)
 
     logger.info("profile_updated", user_uuid=user_uuid, fields=list(fields.keys()))
     return _build_profile_response(updated, billing_period, onboarding_completed)
@@ -130,10 +134,10 @@ def update_profile(
 
 # ── PUT /profile/plan ─────────────────────────────────────────────────────────
 
-def update_plan(
+async def update_plan(
     user_uuid: str,
     data: PlanUpdateRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> PlanUpdateResponse:
     plan_id = _VALID_PLANS.get(data.plan)
     if not plan_id:
@@ -154,7 +158,7 @@ def update_plan(
     user_repo = UserRepository(supabase)
 
     # Cria registro de assinatura (status=pending até confirmação de pagamento)
-    plan_sub_repo.create(
+    await plan_sub_repo.create(
         user_uuid=user_uuid,
         plan_id=plan_id,
         recurrence=data.billing_period,
@@ -165,7 +169,7 @@ def update_plan(
     )
 
     # Atualiza plan_id e plan_status no usuário (otimista)
-    user_repo.update_plan_id(user_uuid, plan_id)
+    await user_repo.update_plan_id(user_uuid, plan_id)
 
     logger.info("plan_updated", user_uuid=user_uuid, plan=data.plan, billing_period=data.billing_period)
 
@@ -179,14 +183,14 @@ def update_plan(
 
 # ── GET /profile/payments ─────────────────────────────────────────────────────
 
-def get_payments(
+async def get_payments(
     user_uuid: str,
     page: int,
     limit: int,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> PaymentsResponse:
     repo = UserPlanSubscriptionRepository(supabase)
-    rows, total = repo.list_by_user(user_uuid, page=page, limit=limit)
+    rows, total = await repo.list_by_user(user_uuid, page=page, limit=limit)
 
     records = [
         PaymentRecord(
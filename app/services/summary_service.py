@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+
+from app.core.supabase_client import SupabaseClient
+from app.repositories.monthly_summary_repository import MonthlySummaryRepository
+from app.schemas.summary import MonthlySummaryResponse, SummaryCategory, SummaryGoal
+from app.services import limit_service
+
+
+def previous_month(today: date | None = None) -> date:
+    """Primeiro dia do mês anterior a `today` (padrão: hoje)."""
+    first = (today or date.today()).replace(day=1)
+    return (first - timedelta(days=1)).replace(day=1)
+
+
+def parse_month(value: str) -> date:
+    """"AAAA-MM" → primeiro dia do mês."""
+    try:
+        return date.fromisoformat(f"{value}-01")
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Mês inválido")
+
+
+# ── Cálculo (app/tasks/monthly_summary.py) ────────────────────────────────────
+
+def build_summary(month: date, inputs: dict, computed_at: datetime | None = None) -> dict:
+    """Linha de monthly_summaries a partir das entradas agregadas de um usuário.
+
+    `inputs` é uma linha de monthly_summary_inputs: transações do mês já
+    somadas por (tipo, categoria), categorias, limites, metas e as metas do
+    resumo anterior. A aderência aos limites sai de limit_service.to_response,
+    a mesma conta de GET /limits/.
+
+    O saldo das metas é o do momento do cálculo, não o do fim do mês: o banco
+    não guarda histórico de current_amount. A variação compara esse saldo com
+    o gravado no resumo anterior, também tirado na hora do job.
+    """
+    cat_map = {c["id"]: c for c in inputs["categories"]}
+    income = expenses = 0.0
+    transaction_count = 0
+    spent_map: dict[int, float] = {}
+    categories: list[SummaryCategory] = []
+    for t in inputs["transactions"]:
+        cid, total = t["category_id"], float(t["total"])
+        if t["type"] == "entrada":
+            income += total
+        else:
+            expenses += total
+            if cid is not None:
+                spent_map[cid] = spent_map.get(cid, 0.0) + total
+        transaction_count += int(t["count"])
+        categories.append(SummaryCategory(
+            category_id=cid,
+            category_name=cat_map.get(cid, {}).get("name", ""),
+            type=t["type"],
+            total=round(total, 2),
+            count=int(t["count"]),
+        ))
+    categories.sort(key=lambda c: c.total, reverse=True)
+
+    previous = {g["goal_id"]: float(g["current_amount"]) for g in inputs.get("previous_goals") or []}
+    goals = [
+        SummaryGoal(
+            goal_id=g["id"],
+            title=g["title"],
+            target_amount=float(g["target_amount"]),
+            current_amount=float(g["current_amount"]),
+            delta=round(float(g["current_amount"]) - previous[g["id"]], 2) if g["id"] in previous else None,
+            is_completed=g["is_completed"],
+        )
+        for g in inputs["goals"]
+    ]
+
+    return {
+        "user_uuid": inputs["user_uuid"],
+        "month": month.isoformat(),
+        "income": round(income, 2),
+        "expenses": round(expenses, 2),
+        "balance": round(income - expenses, 2),
+        "transaction_count": transaction_count,
+        "categories": [c.model_dump() for c in categories],
+        "limits": [limit_service.to_response(r, cat_map, spent_map).model_dump() for r in inputs["limits"]],
+        "goals": [g.model_dump() for g in goals],
+        "computed_at": (computed_at or datetime.now(timezone.utc)).isoformat(),
+    }
+
+
+# ── GET /summaries/monthly ────────────────────────────────────────────────────
+
+async def get_monthly_summary(user_uuid: str, month: str | None, supabase: SupabaseClient) -> MonthlySummaryResponse:
+    """Resumo já calculado pelo job; a API não soma nada sob demanda."""
+    target = parse_month(month) if month else previous_month()
+    row = await MonthlySummaryRepository(supabase).get(user_uuid, target)
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resumo do mês ainda não disponível")
+    return MonthlySummaryResponse(**row)
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import itertools
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import IO, Iterator
+
+import structlog
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.supabase_client import SupabaseClient
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.schemas.transaction import TransactionImportError, TransactionImportResponse
+from app.services.transaction_service import apply_rollup_batch
+
+logger = structlog.get_logger()
+
+_PAYMENT_METHODS = {"dinheiro", "pix", "debito", "credito"}
+_DESCRIPTION_MAX = 255
+_OFX_CHUNK = 64 * 1024
+
+# Cabeçalhos aceitos no CSV (minúsculos, sem acento) -> campo
+_CSV_COLUMNS = {
+    "date": "date", "data": "date",
+    "description": "description", "descricao": "description", "historico": "description",
+    "amount": "amount", "valor": "amount",
+    "type": "type", "tipo": "type",
+    "category": "category", "categoria": "category", "category_id": "category",
+    "payment_method": "payment_method", "forma_pagamento": "payment_method", "pagamento": "payment_method",
+    "notes": "notes", "observacao": "notes", "observacoes": "notes",
+}
+
+
+class _RowError(ValueError):
+    pass
+
+
+@dataclass
+class _RawRow:
+    line: int
+    date: str = ""
+    description: str = ""
+    amount: str = ""
+    type: str = ""
+    category: str = ""
+    payment_method: str = ""
+    notes: str = ""
+
+
+# ── Conversões ────────────────────────────────────────────────────────────────
+
+def _parse_amount(raw: str) -> float:
+    """Aceita 1234.56, 1.234,56, -R$ 10,00 etc."""
+    value = raw.replace("R$", "").replace(" ", "").strip()
+    if "," in value and "." in value:
+        # O último separador é o decimal
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    elif "," in value:
+        value = value.replace(",", ".")
+    try:
+        return float(value)
+    except ValueError:
+        raise _RowError(f"Valor inválido: {raw!r}")
+
+
+def _parse_date(raw: str) -> date:
+    value = raw.strip()
+    for fmt, size in (("%Y-%m-%d", 10), ("%d/%m/%Y", 10), ("%Y%m%d", 8)):
+        try:
+            return datetime.strptime(value[:size], fmt).date()
+        except ValueError:
+            continue
+    raise _RowError(f"Data inválida: {raw!r}")
+
+
+def _normalize_header(name: str) -> str:
+    """'Descrição' -> 'descricao', 'Forma Pagamento' -> 'forma_pagamento'."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).replace(" ", "_")
+
+
+# ── Parsers (streaming) ───────────────────────────────────────────────────────
+
+def _iter_csv(fh: IO[bytes]) -> Iterator[_RawRow]:
+    """Lê o CSV linha a linha do arquivo temporário do upload; separador , ou ;."""
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        header_line = text.readline()
+        delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+        header = next(csv.reader([header_line], delimiter=delimiter), [])
+        columns = [_CSV_COLUMNS.get(_normalize_header(h)) for h in header]
+        missing = {"date", "description", "amount"} - set(columns)
+        if missing:
+            raise HTTPException(
+                status_code=422,
+                detail=f"CSV sem as colunas obrigatórias: {', '.join(sorted(missing))}",
+            )
+
+        reader = csv.reader(text, delimiter=delimiter)
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            row = _RawRow(line=reader.line_num + 1)
+            for column, value in zip(columns, values):
+                if column:
+                    setattr(row, column, value.strip())
+            yield row
+    finally:
+        # Devolve o arquivo ao UploadFile, que é quem o fecha
+        text.detach()
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _iter_ofx(fh: IO[bytes]) -> Iterator[_RawRow]:
+    """Tokeniza o OFX (SGML 1.x ou XML 2.x) em blocos, sem carregar o arquivo todo.
+
+    Só os <STMTTRN> interessam; OFX não traz categoria nem forma de pagamento.
+    """
+    first = fh.read(_OFX_CHUNK)
+    encoding = "cp1252" if re.search(rb"CHARSET:\s*1252|windows-1252", first[:1024], re.I) else "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    buffer = ""
+    current: dict[str, str] | None = None
+    count = 0
+    chunk = first
+    while True:
+        if chunk:
+            buffer += decoder.decode(chunk)
+            # Retém a partir do último "<": a tag ou o valor podem continuar no próximo bloco
+            cut = buffer.rfind("<")
+            complete, buffer = (buffer[:cut], buffer[cut:]) if cut >= 0 else ("", buffer)
+        else:
+            complete, buffer = buffer + decoder.decode(b"", final=True), ""
+        for closing, tag, value in _OFX_TAG.findall(complete):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    count += 1
+                    amount = current.get("TRNAMT", "")
+                    yield _RawRow(
+                        line=count,
+                        date=current.get("DTPOSTED", ""),
+                        description=current.get("MEMO") or current.get("NAME", ""),
+                        amount=amount,
+                        type="saida" if amount.startswith("-") else "entrada",
+                    )
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+        if not chunk:
+            break
+        chunk = fh.read(_OFX_CHUNK)
+
+
+def _is_ofx(fh: IO[bytes], filename: str | None) -> bool:
+    if filename and filename.lower().endswith((".ofx", ".qfx")):
+        return True
+    head = fh.read(512)
+    fh.seek(0)
+    return b"OFXHEADER" in head or b"<OFX>" in head.upper()
+
+
+# ── Validação ─────────────────────────────────────────────────────────────────
+
+def _to_fields(
+    raw: _RawRow,
+    categories: dict[int, dict],
+    names: dict[str, int],
+    default_category_id: int | None,
+) -> dict:
+    if not raw.date or not raw.amount or not raw.description:
+        raise _RowError("Data, descrição e valor são obrigatórios")
+
+    amount = _parse_amount(raw.amount)
+    if amount == 0:
+        raise _RowError("Valor deve ser diferente de zero")
+    tx_type = raw.type.strip().lower() or ("saida" if amount < 0 else "entrada")
+    if tx_type not in ("entrada", "saida"):
+        raise _RowError(f"Tipo inválido: {raw.type!r}")
+
+    description = raw.description.strip()
+    if len(description) > _DESCRIPTION_MAX:
+        raise _RowError(f"Descrição com mais de {_DESCRIPTION_MAX} caracteres")
+
+    category = raw.category.strip()
+    if not category:
+        category_id = default_category_id
+    elif category.isdigit():
+        category_id = int(category) if int(category) in categories else None
+    else:
+        category_id = names.get(category.lower())
+    if category_id is None:
+        raise _RowError(f"Categoria não encontrada: {category!r}" if category else "Categoria obrigatória")
+
+    payment_method = raw.payment_method.strip().lower() or None
+    if payment_method is not None and payment_method not in _PAYMENT_METHODS:
+        raise _RowError(f"Forma de pagamento inválida: {raw.payment_method!r}")
+
+    return {
+        "category_id": category_id,
+        "description": description,
+        "amount": round(abs(amount), 2),
+        "date": _parse_date(raw.date).isoformat(),
+        "type": tx_type,
+        "notes": raw.notes.strip() or None,
+        "payment_method": payment_method,
+    }
+
+
+def _next_rows(
+    rows: Iterator[_RawRow],
+    size: int,
+    categories: dict[int, dict],
+    names: dict[str, int],
+    default_category_id: int | None,
+) -> list[tuple[int, dict | _RowError]]:
+    """Próximas `size` linhas do arquivo já validadas (campos ou erro).
+
+    Roda no threadpool: leitura do arquivo, csv/regex e conversões bloqueiam.
+    """
+    out: list[tuple[int, dict | _RowError]] = []
+    for raw in itertools.islice(rows, size):
+        try:
+            out.append((raw.line, _to_fields(raw, categories, names, default_category_id)))
+        except _RowError as exc:
+            out.append((raw.line, exc))
+    return out
+
+
+# ── POST /transactions/import ─────────────────────────────────────────────────
+
+async def import_transactions(
+    user_uuid: str,
+    upload: UploadFile,
+    default_category_id: int | None,
+    supabase: SupabaseClient,
+) -> TransactionImportResponse:
+    """Importa um extrato CSV ou OFX em lotes de TRANSACTION_IMPORT_BATCH_SIZE.
+
+    O arquivo é lido em streaming; categorias são resolvidas uma vez pelo
+    mapa em cache e o rollup é ajustado uma vez por lote gravado.
+    """
+    categories = await CategoryRepository(supabase).get_categories_map(user_uuid)
+    if default_category_id is not None and default_category_id not in categories:
+        raise HTTPException(status_code=422, detail="Categoria não encontrada")
+    names = {c["name"].lower(): cid for cid, c in categories.items()}
+
+    is_ofx = await run_in_threadpool(_is_ofx, upload.file, upload.filename)
+    if is_ofx and default_category_id is None:
+        raise HTTPException(
+            status_code=422,
+            detail="Informe category_id para importar OFX",
+        )
+    rows = _iter_ofx(upload.file) if is_ofx else _iter_csv(upload.file)
+
+    repo = TransactionRepository(supabase)
+    batch_size = settings.TRANSACTION_IMPORT_BATCH_SIZE
+    imported = failed = seen = 0
+    errors: list[TransactionImportError] = []
+    batch: list[tuple[int, dict]] = []
+
+    def fail(line: int, message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.TRANSACTION_IMPORT_MAX_ERRORS:
+            errors.append(TransactionImportError(row=line, error=message))
+
+    async def flush() -> None:
+        nonlocal imported
+        fields = [f for _, f in batch]
+        try:
+            await repo.bulk_create(user_uuid, fields)
+        except Exception as exc:
+            logger.error("transaction_import_batch_failed", user_uuid=user_uuid, rows=len(batch), error=str(exc))
+            for line, _ in batch:
+                fail(line, "Falha ao gravar o lote")
+        else:
+            imported += len(batch)
+            await apply_rollup_batch(user_uuid, fields, supabase)
+        batch.clear()
+
+    # O parsing sai do event loop um lote por vez; a gravação fica aqui
+    try:
+        while chunk := await run_in_threadpool(_next_rows, rows, batch_size, categories, names, default_category_id):
+            for line, result in chunk:
+                seen += 1
+                if seen > settings.TRANSACTION_IMPORT_MAX_ROWS:
+                    fail(line, f"Limite de {settings.TRANSACTION_IMPORT_MAX_ROWS} linhas por importação atingido")
+                    break
+                if isinstance(result, _RowError):
+                    fail(line, str(result))
+                    continue
+                batch.append((line, result))
+                if len(batch) >= batch_size:
+                    await flush()
+            if seen > settings.TRANSACTION_IMPORT_MAX_ROWS:
+                break
+        if batch:
+            await flush()
+    finally:
+        await run_in_threadpool(rows.close)
+
+    logger.info(
+        "transactions_imported",
+        user_uuid=user_uuid,
+        format="ofx" if is_ofx else "csv",
+        imported=imported,
+        failed=failed,
+    )
+    return TransactionImportResponse(imported=imported, failed=failed, errors=errors)
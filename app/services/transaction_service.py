@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import csv
+import io
 from datetime import date
+from typing import AsyncIterator
 
 import structlog
 from fastapi import HTTPException, status
-from supabase import Client
 
+from app.core.concurrency import gather
+from app.core.config import settings
+from app.core.supabase_client import SupabaseClient
 from app.repositories.category_repository import CategoryRepository
+from app.repositories.spending_rollup_repository import SpendingRollupRepository
 from app.repositories.transaction_repository import TransactionRepository
 from app.schemas.transaction import (
+    TransactionBatchRequest,
+    TransactionBatchResponse,
+    TransactionBatchResult,
     TransactionCreateRequest,
     TransactionDeleteResponse,
     TransactionResponse,
@@ -38,9 +50,104 @@ def _to_response(row: dict, cat_map: dict[int, dict]) -> TransactionResponse:
     )
 
 
+
+# ── Rollup de gastos mensais ──────────────────────────────────────────────────
+
+# Colunas que mudam o gasto mensal de uma transação
+_ROLLUP_FIELDS = {"category_id", "amount", "date", "type"}
+
+
+def _rollup_key(row: dict | None) -> tuple[int, str] | None:
+    """(category_id, primeiro dia do mês) se a transação conta como gasto."""
+    if not row or row.get("type") != "saida" or not row.get("category_id"):
+        return None
+    return row["category_id"], f"{str(row['date'])[:7]}-01"
+
+
+def _rollup_deltas(old: dict | None, new: dict | None) -> list[dict]:
+    """Deltas de spent/count entre a versão antiga e a nova de uma transação."""
+    acc: dict[tuple[int, str], list[float]] = {}
+    for row, sign in ((old, -1), (new, 1)):
+        key = _rollup_key(row)
+        if key is None:
+            continue
+        entry = acc.setdefault(key, [0.0, 0])
+        entry[0] += sign * float(row["amount"])
+        entry[1] += sign
+    return [
+        {"category_id": cid, "month": month, "spent": round(spent, 2), "count": count}
+        for (cid, month), (spent, count) in acc.items()
+        if spent or count
+    ]
+
+
+async def _apply_rollup(user_uuid: str, old: dict | None, new: dict | None, supabase: SupabaseClient) -> None:
+    await _apply_rollup_changes(user_uuid, [(old, new)], supabase)
+
+
+async def apply_rollup_batch(user_uuid: str, rows: list[dict], supabase: SupabaseClient) -> None:
+    """Soma ao rollup um lote de transações novas numa única chamada."""
+    await _apply_rollup_changes(user_uuid, [(None, row) for row in rows], supabase)
+
+
+async def _apply_rollup_changes(
+    user_uuid: str,
+    changes: list[tuple[dict | None, dict | None]],
+    supabase: SupabaseClient,
+) -> None:
+    """Aplica ao rollup os deltas de vários pares (antes, depois) numa única chamada."""
+    acc: dict[tuple[int, str], list[float]] = {}
+    for old, new in changes:
+        for delta in _rollup_deltas(old, new):
+            entry = acc.setdefault((delta["category_id"], delta["month"]), [0.0, 0])
+            entry[0] += delta["spent"]
+            entry[1] += delta["count"]
+    deltas = [
+        {"category_id": cid, "month": month, "spent": round(spent, 2), "count": count}
+        for (cid, month), (spent, count) in acc.items()
+        if round(spent, 2) or count
+    ]
+    if not deltas:
+        return
+    try:
+        await SpendingRollupRepository(supabase).apply_deltas(user_uuid, deltas)
+    except Exception as exc:
+        # As transações já foram gravadas; o rollup é corrigido por rebuild_spending_rollups
+        logger.warning("spending_rollup_update_failed", user_uuid=user_uuid, error=str(exc))
+
+
 # ── GET /transactions/ ────────────────────────────────────────────────────────
 
-def list_transactions(
+def _encode_cursor(row: dict) -> str:
+    raw = f"{str(row['date'])[:10]}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """Cursor opaco -> (date, id) da última transação da página anterior."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, _, tx_id = raw.partition("|")
+        return date.fromisoformat(day).isoformat(), int(tx_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+async def _count_or_none(
+    repo: TransactionRepository,
+    method: str,
+    user_uuid: str,
+    type_filter: str | None,
+    category_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+) -> int | None:
+    if method == "none":
+        return None
+    return await repo.count_by_user(user_uuid, type_filter, category_id, date_from, date_to, method=method)
+
+
+async def list_transactions(
     user_uuid: str,
     type_filter: str | None,
     category_id: int | None,
@@ -48,72 +155,166 @@ def list_transactions(
     date_to: date | None,
     limit: int,
     offset: int,
-    supabase: Client,
+    supabase: SupabaseClient,
+    cursor: str | None = None,
+    total_mode: str | None = None,
 ) -> TransactionsListResponse:
+    """Lista paginada por offset ou, com `cursor`, por seek em (date, id).
+
+    O total exato só é calculado por padrão na primeira página; páginas
+    seguintes via cursor não recontam, a menos que total_mode seja pedido.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    if total_mode is None:
+        total_mode = "none" if after else "exact"
+
     repo = TransactionRepository(supabase)
-    rows = repo.list_by_user(
-        user_uuid, type_filter, category_id, date_from, date_to, limit, offset
+    # Uma linha extra indica se existe próxima página
+    rows, total, cat_map = await gather(
+        repo.list_by_user(user_uuid, type_filter, category_id, date_from, date_to, limit + 1, offset, after),
+        _count_or_none(repo, total_mode, user_uuid, type_filter, category_id, date_from, date_to),
+        CategoryRepository(supabase).get_categories_map(user_uuid),
     )
-    total = repo.count_by_user(user_uuid, type_filter, category_id, date_from, date_to)
-    cat_map = repo.get_categories_map(user_uuid)
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
     return TransactionsListResponse(
-        data=[_to_response(r, cat_map) for r in rows],
+        data=[_to_response(r, cat_map) for r in rows[:limit]],
         total=total,
+        next_cursor=next_cursor,
     )
 
 
+# ── GET /transactions/export ──────────────────────────────────────────────────
+
+# Mesmos nomes de coluna que POST /transactions/import aceita
+_EXPORT_CSV_HEADER = ["id", "data", "descricao", "valor", "tipo", "categoria", "forma_pagamento", "observacao"]
+
+
+def _export_csv(rows: list[list], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        # BOM para o Excel reconhecer UTF-8
+        buffer.write("\ufeff")
+        writer.writerow(_EXPORT_CSV_HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_export(fmt: str, rows: list[dict], cat_map: dict[int, dict]) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(_to_response(r, cat_map).model_dump_json().encode() + b"\n" for r in rows)
+    return _export_csv([
+        [
+            r["id"], str(r["date"])[:10], r["description"], r["amount"], r["type"],
+            cat_map.get(r.get("category_id"), {}).get("name", ""),
+            r.get("payment_method") or "", r.get("notes") or "",
+        ]
+        for r in rows
+    ])
+
+
+async def export_transactions(
+    user_uuid: str,
+    fmt: str,
+    type_filter: str | None,
+    category_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+    supabase: SupabaseClient,
+) -> AsyncIterator[bytes]:
+    """Corpo do export: percorre as transações por seek em (date, id), em blocos.
+
+    O mapa de categorias é lido antes do primeiro byte. Depois a memória fica
+    limitada a dois blocos: o que está sendo enviado e o próximo, já buscado.
+    """
+    repo = TransactionRepository(supabase)
+    cat_map = await CategoryRepository(supabase).get_categories_map(user_uuid)
+    chunk = settings.TRANSACTION_EXPORT_CHUNK_SIZE
+
+    def fetch(after: tuple[str, int] | None) -> asyncio.Future:
+        return asyncio.ensure_future(
+            repo.list_by_user(user_uuid, type_filter, category_id, date_from, date_to, chunk, 0, after)
+        )
+
+    async def body() -> AsyncIterator[bytes]:
+        exported = 0
+        if fmt == "csv":
+            yield _export_csv([], header=True)
+        pending = fetch(None)
+        try:
+            while True:
+                rows = await pending
+                # Só o bloco vazio encerra: um max-rows do PostgREST menor que o
+                # bloco devolve páginas curtas antes do fim
+                if not rows:
+                    break
+                last = rows[-1]
+                pending = fetch((str(last["date"])[:10], last["id"]))
+                exported += len(rows)
+                yield _encode_export(fmt, rows, cat_map)
+        finally:
+            pending.cancel()
+            logger.info("transactions_exported", user_uuid=user_uuid, format=fmt, rows=exported)
+
+    return body()
+
+
 # ── GET /transactions/summary ─────────────────────────────────────────────────
 
-def get_summary(
+async def get_summary(
     user_uuid: str,
     date_from: date | None,
     date_to: date | None,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> TransactionSummary:
     repo = TransactionRepository(supabase)
-    s = repo.summary_by_user(user_uuid, date_from, date_to)
+    s = await repo.summary_by_user(user_uuid, date_from, date_to)
     return TransactionSummary(**s)
 
 
 # ── GET /transactions/{id} ────────────────────────────────────────────────────
 
-def get_transaction(
+async def get_transaction(
     user_uuid: str,
     transaction_id: int,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> TransactionResponse:
     repo = TransactionRepository(supabase)
-    row = repo.get_by_id(user_uuid, transaction_id)
+    row = await repo.get_by_id(user_uuid, transaction_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
-    cat_map = repo.get_categories_map(user_uuid)
+    cat_map = await CategoryRepository(supabase).get_categories_map(user_uuid)
     return _to_response(row, cat_map)
 
 
 # ── POST /transactions/ ───────────────────────────────────────────────────────
 
-def create_transaction(
+def _create_fields(data: TransactionCreateRequest) -> dict:
+    return {
+        "category_id": data.category_id,
+        "description": data.description.strip(),
+        "amount": data.amount,
+        "date": data.date.isoformat(),
+        "type": data.type,
+        "notes": data.notes,
+        "payment_method": data.payment_method,
+    }
+
+
+async def create_transaction(
     user_uuid: str,
     data: TransactionCreateRequest,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> TransactionResponse:
     # Validate category belongs to user
     cat_repo = CategoryRepository(supabase)
-    cat = cat_repo.get_by_id(user_uuid, data.category_id)
+    cat = await cat_repo.find_cached(user_uuid, data.category_id)
     if not cat:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Categoria não encontrada")
 
     repo = TransactionRepository(supabase)
-    fields = {
-        "category_id": data.category_id,
-        "description": data.description.strip(),
-        "amount": data.amount,
-        "date": data.date.isoformat(),
-        "type": data.type,
-        "notes": data.notes,
-        "payment_method": data.payment_method,
-    }
-    row = repo.create(user_uuid, fields)
+    row = await repo.create(user_uuid, _create_fields(data))
+    await _apply_rollup(user_uuid, None, row, supabase)
     cat_map = {data.category_id: cat}
     logger.info("transaction_created", user_uuid=user_uuid, amount=data.amount, type=data.type)
     return _to_response(row, cat_map)
@@ -121,23 +322,9 @@ def create_transaction(
 
 # ── PUT /transactions/{id} ────────────────────────────────────────────────────
 
-def update_transaction(
-    user_uuid: str,
-    transaction_id: int,
-    data: TransactionUpdateRequest,
-    supabase: Client,
-) -> TransactionResponse:
-    repo = TransactionRepository(supabase)
-    existing = repo.get_by_id(user_uuid, transaction_id)
-    if not existing:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
-
+def _update_fields(data: TransactionUpdateRequest) -> dict:
     fields: dict = {}
     if data.category_id is not None:
-        cat_repo = CategoryRepository(supabase)
-        cat = cat_repo.get_by_id(user_uuid, data.category_id)
-        if not cat:
-            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Categoria não encontrada")
         fields["category_id"] = data.category_id
     if data.description is not None:
         fields["description"] = data.description.strip()
@@ -151,31 +338,208 @@ def update_transaction(
         fields["notes"] = data.notes
     if data.payment_method is not None:
         fields["payment_method"] = data.payment_method
+    return fields
+
+
+async def update_transaction(
+    user_uuid: str,
+    transaction_id: int,
+    data: TransactionUpdateRequest,
+    supabase: SupabaseClient,
+) -> TransactionResponse:
+    repo = TransactionRepository(supabase)
+    cat_repo = CategoryRepository(supabase)
+
+    if data.category_id is not None:
+        cat = await cat_repo.find_cached(user_uuid, data.category_id)
+        if not cat:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Categoria não encontrada")
+    fields = _update_fields(data)
 
     if not fields:
-        cat_map = repo.get_categories_map(user_uuid)
+        existing = await repo.get_by_id(user_uuid, transaction_id)
+        if not existing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
+        cat_map = await cat_repo.get_categories_map(user_uuid)
         return _to_response(existing, cat_map)
 
-    updated = repo.update(user_uuid, transaction_id, fields)
+    previous, updated = await _update_with_previous(repo, user_uuid, transaction_id, fields)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
 
-    cat_map = repo.get_categories_map(user_uuid)
+    if previous is not None:
+        await _apply_rollup(user_uuid, previous, updated, supabase)
+    cat_map = await cat_repo.get_categories_map(user_uuid)
     logger.info("transaction_updated", user_uuid=user_uuid, transaction_id=transaction_id)
     return _to_response(updated, cat_map)
 
 
+async def _update_with_previous(
+    repo: TransactionRepository,
+    user_uuid: str,
+    transaction_id: int,
+    fields: dict,
+) -> tuple[dict | None, dict | None]:
+    """(antes, depois) do update; o update devolve a linha e decide o 404.
+
+    Sem a RPC, só lê a versão anterior quando o update mexe no rollup; nos
+    demais casos `antes` volta None e o rollup não muda.
+    """
+    result = await repo.update_with_previous(user_uuid, transaction_id, fields)
+    if result is not None:
+        return result
+    previous = None
+    if _ROLLUP_FIELDS & fields.keys():
+        previous = await repo.get_by_id(user_uuid, transaction_id)
+        if not previous:
+            return None, None
+    return previous, await repo.update(user_uuid, transaction_id, fields)
+
+
 # ── DELETE /transactions/{id} ─────────────────────────────────────────────────
 
-def delete_transaction(
+async def delete_transaction(
     user_uuid: str,
     transaction_id: int,
-    supabase: Client,
+    supabase: SupabaseClient,
 ) -> TransactionDeleteResponse:
     repo = TransactionRepository(supabase)
-    existing = repo.get_by_id(user_uuid, transaction_id)
-    if not existing:
+    deleted = await repo.delete(user_uuid, transaction_id)
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada")
-    repo.delete(user_uuid, transaction_id)
+    await _apply_rollup(user_uuid, deleted, None, supabase)
     logger.info("transaction_deleted", user_uuid=user_uuid, transaction_id=transaction_id)
     return TransactionDeleteResponse()
+
+
+# ── POST /transactions/batch ──────────────────────────────────────────────────
+
+async def batch_transactions(
+    user_uuid: str,
+    data: TransactionBatchRequest,
+    supabase: SupabaseClient,
+) -> TransactionBatchResponse:
+    """Aplica criações, atualizações e remoções de uma vez, com resultado por item.
+
+    As categorias de todos os itens são validadas contra o mapa em cache, relido
+    no máximo uma vez. Cada tipo de operação vira uma única ida ao banco, nesta
+    ordem: criações, atualizações (na ordem do pedido) e remoções. Um item que
+    falha não impede os demais.
+    """
+    repo = TransactionRepository(supabase)
+    cat_repo = CategoryRepository(supabase)
+    results: dict[int, TransactionBatchResult] = {}
+    changes: list[tuple[dict | None, dict | None]] = []
+
+    def fail(index: int, op: str, code: int, message: str) -> None:
+        results[index] = TransactionBatchResult(index=index, op=op, status=code, error=message)
+
+    wanted = {op.data.category_id for op in data.operations if op.op != "delete"} - {None}
+    cat_map = await cat_repo.get_categories_map(user_uuid)
+    if not wanted <= cat_map.keys():
+        cat_map = await cat_repo.get_categories_map(user_uuid, refresh=True)
+
+    creates: list[tuple[int, dict]] = []
+    updates: list[tuple[int, int, dict]] = []
+    deletes: list[tuple[int, int]] = []
+    for index, op in enumerate(data.operations):
+        if op.op == "delete":
+            deletes.append((index, op.id))
+        elif op.data.category_id is not None and op.data.category_id not in cat_map:
+            fail(index, op.op, status.HTTP_422_UNPROCESSABLE_ENTITY, "Categoria não encontrada")
+        elif op.op == "create":
+            creates.append((index, _create_fields(op.data)))
+        else:
+            updates.append((index, op.id, _update_fields(op.data)))
+
+    if creates:
+        try:
+            rows = await repo.bulk_create(user_uuid, [fields for _, fields in creates], returning=True)
+        except Exception as exc:
+            logger.error("transaction_batch_failed", user_uuid=user_uuid, op="create", rows=len(creates), error=str(exc))
+            for index, _ in creates:
+                fail(index, "create", status.HTTP_500_INTERNAL_SERVER_ERROR, "Falha ao gravar o lote")
+        else:
+            for (index, _), row in zip(creates, rows):
+                results[index] = TransactionBatchResult(
+                    index=index, op="create", status=status.HTTP_201_CREATED, data=_to_response(row, cat_map),
+                )
+                changes.append((None, row))
+
+    if updates:
+        outcomes = await _update_many_with_previous(repo, user_uuid, [(tid, fields) for _, tid, fields in updates])
+        for (index, _, _), outcome in zip(updates, outcomes):
+            if isinstance(outcome, Exception):
+                fail(index, "update", status.HTTP_500_INTERNAL_SERVER_ERROR, "Falha ao gravar o lote")
+                continue
+            previous, updated = outcome
+            if not updated:
+                fail(index, "update", status.HTTP_404_NOT_FOUND, "Transação não encontrada")
+                continue
+            results[index] = TransactionBatchResult(
+                index=index, op="update", status=status.HTTP_200_OK, data=_to_response(updated, cat_map),
+            )
+            if previous is not None:
+                changes.append((previous, updated))
+
+    if deletes:
+        try:
+            deleted = await repo.delete_many(user_uuid, list({tid for _, tid in deletes}))
+        except Exception as exc:
+            logger.error("transaction_batch_failed", user_uuid=user_uuid, op="delete", rows=len(deletes), error=str(exc))
+            for index, _ in deletes:
+                fail(index, "delete", status.HTTP_500_INTERNAL_SERVER_ERROR, "Falha ao gravar o lote")
+        else:
+            by_id = {row["id"]: row for row in deleted}
+            for index, tid in deletes:
+                # Um id repetido só conta como removido na primeira ocorrência
+                row = by_id.pop(tid, None)
+                if row is None:
+                    fail(index, "delete", status.HTTP_404_NOT_FOUND, "Transação não encontrada")
+                    continue
+                results[index] = TransactionBatchResult(index=index, op="delete", status=status.HTTP_200_OK)
+                changes.append((row, None))
+
+    await _apply_rollup_changes(user_uuid, changes, supabase)
+
+    ordered = [results[i] for i in sorted(results)]
+    failed = sum(1 for r in ordered if r.status >= 400)
+    logger.info(
+        "transactions_batch",
+        user_uuid=user_uuid,
+        created=len(creates),
+        updated=len(updates),
+        deleted=len(deletes),
+        failed=failed,
+    )
+    return TransactionBatchResponse(succeeded=len(ordered) - failed, failed=failed, results=ordered)
+
+
+async def _update_many_with_previous(
+    repo: TransactionRepository,
+    user_uuid: str,
+    items: list[tuple[int, dict]],
+) -> list[tuple[dict | None, dict | None] | Exception]:
+    """(antes, depois) por item, ou a exceção que o fez falhar.
+
+    Sem a RPC update_user_transactions, aplica item a item como o PUT.
+    """
+    try:
+        pairs = await repo.update_many_with_previous(user_uuid, items)
+    except Exception as exc:
+        logger.error("transaction_batch_failed", user_uuid=user_uuid, op="update", rows=len(items), error=str(exc))
+        return [exc] * len(items)
+    if pairs is not None:
+        return pairs
+
+    outcomes: list[tuple[dict | None, dict | None] | Exception] = []
+    for transaction_id, fields in items:
+        try:
+            if fields:
+                outcomes.append(await _update_with_previous(repo, user_uuid, transaction_id, fields))
+            else:
+                outcomes.append((None, await repo.get_by_id(user_uuid, transaction_id)))
+        except Exception as exc:
+            logger.error("transaction_batch_failed", user_uuid=user_uuid, op="update", transaction_id=transaction_id, error=str(exc))
+            outcomes.append(exc)
+    return outcomes
@@ -0,0 +1,83 @@
+"""Expira os trials vencidos em lote (plan_status "trial" → "expired").
+
+Roda a cada TRIAL_EXPIRY_INTERVAL_MINUTES pelo agendador da aplicação
+(app/tasks/scheduler.py). Uso avulso:
+    python -m app.tasks.expire_trials
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+import structlog
+
+from app.core.config import settings
+from app.core.supabase_client import supabase_registry
+from app.repositories.user_repository import UserRepository
+
+logger = structlog.get_logger()
+
+# Nome do checkpoint em public.job_checkpoints
+_JOB = "expire_trials"
+
+
+async def expire_trials(chunk_size: int | None = None) -> int:
+    """Expira todos os trials vencidos, em pedaços de TRIAL_EXPIRY_CHUNK_SIZE.
+
+    Cada pedaço é um UPDATE só. Com a migration, o watermark fica no banco e
+    uma execução interrompida continua de onde parou. Retorna quantos
+    usuários foram expirados.
+    """
+    limit = chunk_size or settings.TRIAL_EXPIRY_CHUNK_SIZE
+    repo = UserRepository(supabase_registry.client)
+
+    expired = chunks = 0
+    while True:
+        result = await repo.expire_trials_chunk(_JOB, limit)
+        if result is None:
+            expired, chunks = await _expire_trials_fallback(repo, limit)
+            break
+        expired += result["expired"]
+        chunks += 1
+        if result["done"]:
+            break
+
+    logger.info("trials_expired", expired=expired, chunks=chunks)
+    return expired
+
+
+async def _expire_trials_fallback(repo: UserRepository, limit: int) -> tuple[int, int]:
+    """Sem a migration: mesmo percurso por seek, com o watermark só em memória."""
+    cutoff = datetime.now(timezone.utc)
+    after: tuple[str, str] | None = None
+    expired = chunks = 0
+    while True:
+        rows = await repo.list_lapsed_trials(cutoff, after, limit)
+        if not rows:
+            break
+        expired += await repo.expire_trials([r["user_uuid"] for r in rows])
+        chunks += 1
+        if len(rows) < limit:
+            break
+        after = (rows[-1]["trial_ends_at"], rows[-1]["user_uuid"])
+    return expired, chunks
+
+
+async def _main(chunk_size: int | None) -> int:
+    supabase_registry.startup()
+    try:
+        return await expire_trials(chunk_size)
+    finally:
+        await supabase_registry.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, help="Usuários por UPDATE (padrão: TRIAL_EXPIRY_CHUNK_SIZE)")
+    args = parser.parse_args()
+    asyncio.run(_main(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
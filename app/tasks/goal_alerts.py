@@ -0,0 +1,76 @@
+"""Gera alertas de metas atrasadas ou perto de concluir (public.goal_alerts).
+
+Roda todo dia às GOAL_ALERT_HOUR UTC pelo agendador da aplicação
+(app/tasks/scheduler.py). Uso avulso:
+    python -m app.tasks.goal_alerts
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import structlog
+
+from app.core.config import settings
+from app.core.supabase_client import supabase_registry
+from app.repositories.goal_repository import GoalRepository
+
+logger = structlog.get_logger()
+
+# Nome do checkpoint em public.job_checkpoints
+_JOB = "goal_alerts"
+
+
+async def scan_goal_alerts(chunk_size: int | None = None) -> int:
+    """Percorre as metas abertas de todos os usuários; retorna quantos alertas gerou.
+
+    Cada pedaço de GOAL_ALERT_CHUNK_SIZE metas é uma chamada a scan_goal_alerts,
+    que classifica e grava no Postgres. Os pedaços vão em sequência, com
+    GOAL_ALERT_PAUSE_SECONDS entre eles. Uma meta alerta no máximo uma vez por
+    mês, então rodar de novo não repete notificações.
+    """
+    limit = chunk_size or settings.GOAL_ALERT_CHUNK_SIZE
+    repo = GoalRepository(supabase_registry.client)
+
+    scanned = alerted = chunks = 0
+    started = time.perf_counter()
+    while True:
+        result = await repo.scan_alerts(_JOB, limit, settings.GOAL_ALERT_NEAR_RATIO)
+        if result is None:
+            raise RuntimeError("Função scan_goal_alerts não encontrada: aplique as migrations do Supabase")
+        scanned += result["scanned"]
+        alerted += result["alerted"]
+        chunks += 1
+        if result["done"]:
+            break
+        if settings.GOAL_ALERT_PAUSE_SECONDS:
+            await asyncio.sleep(settings.GOAL_ALERT_PAUSE_SECONDS)
+
+    logger.info(
+        "goal_alerts_scanned",
+        goals=scanned,
+        alerted=alerted,
+        chunks=chunks,
+        seconds=round(time.perf_counter() - started, 2),
+    )
+    return alerted
+
+
+async def _main(chunk_size: int | None) -> int:
+    supabase_registry.startup()
+    try:
+        return await scan_goal_alerts(chunk_size)
+    finally:
+        await supabase_registry.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, help="Metas por chamada (padrão: GOAL_ALERT_CHUNK_SIZE)")
+    args = parser.parse_args()
+    asyncio.run(_main(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
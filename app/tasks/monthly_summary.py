@@ -0,0 +1,207 @@
+"""Calcula o resumo mensal (public.monthly_summaries) de todos os usuários.
+
+Roda todo dia às MONTHLY_SUMMARY_HOUR UTC pelo agendador da aplicação
+(app/tasks/scheduler.py), sempre para o mês anterior: o dia 1 faz o trabalho
+e os demais só encontram o checkpoint concluído (ou retomam uma rodada que
+parou no meio). Uso avulso:
+    python -m app.tasks.monthly_summary                     # mês anterior
+    python -m app.tasks.monthly_summary 2026-09 --restart   # recalcula do zero
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+import structlog
+
+from app.core.config import settings
+from app.core.supabase_client import supabase_registry
+from app.repositories.job_checkpoint_repository import JobCheckpointRepository
+from app.repositories.monthly_summary_repository import MonthlySummaryRepository
+from app.repositories.user_repository import UserRepository
+from app.services import summary_service
+
+logger = structlog.get_logger()
+
+
+def _job_name(month: date) -> str:
+    """Um checkpoint por mês em public.job_checkpoints."""
+    return f"monthly_summary:{month:%Y-%m}"
+
+
+class _Watermark:
+    """Último usuário do maior prefixo contíguo de pedaços gravados.
+
+    Os pedaços terminam fora de ordem no pool; só o prefixo contíguo vai para
+    o checkpoint, então a retomada nunca pula usuários. Pedaços gravados além
+    dele são refeitos, o que o upsert torna inofensivo.
+    """
+
+    def __init__(self, after: str | None, users: int) -> None:
+        self.after = after
+        self.users = users
+        self._next = 0
+        self._pending: dict[int, tuple[str, int]] = {}
+
+    def complete(self, seq: int, last_user_uuid: str, users: int) -> bool:
+        """Registra o pedaço `seq`; True se o watermark avançou."""
+        self._pending[seq] = (last_user_uuid, users)
+        advanced = False
+        while self._next in self._pending:
+            self.after, n = self._pending.pop(self._next)
+            self.users += n
+            self._next += 1
+            advanced = True
+        return advanced
+
+
+def _owner() -> str:
+    """Identifica esta execução no lease do job."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def build_monthly_summaries(
+    month: date | None = None,
+    *,
+    restart: bool = False,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+) -> int:
+    """Grava o resumo de `month` (padrão: mês anterior) para todos os usuários.
+
+    Antes de tudo reserva o job no banco (claim_job): com o agendador em cada
+    worker do uvicorn, só um processo calcula o mês; os outros pulam a rodada.
+    Os user_uuid vêm em páginas por seek; cada página é um pedaço que um dos
+    `workers` processa com duas idas ao banco: monthly_summary_inputs (tudo
+    agregado no Postgres) e um upsert em lote. Retomada pelo checkpoint do
+    mês; `restart` ignora o checkpoint e recalcula tudo. Retorna quantos
+    usuários foram processados nesta execução.
+    """
+    month = month or summary_service.previous_month()
+    job = _job_name(month)
+    owner = _owner()
+    checkpoints = JobCheckpointRepository(supabase_registry.client)
+
+    claimed = await checkpoints.claim(job, owner, settings.MONTHLY_SUMMARY_LEASE_SECONDS)
+    if claimed is None:
+        raise RuntimeError("Função claim_job não encontrada: aplique as migrations do Supabase")
+    if not claimed:
+        logger.info("monthly_summaries_running_elsewhere", month=month.isoformat())
+        return 0
+    try:
+        return await _build(month, job, owner, checkpoints, restart, chunk_size, workers)
+    finally:
+        await checkpoints.release(job, owner)
+
+
+async def _build(
+    month: date,
+    job: str,
+    owner: str,
+    checkpoints: JobCheckpointRepository,
+    restart: bool,
+    chunk_size: int | None,
+    workers: int | None,
+) -> int:
+    limit = chunk_size or settings.MONTHLY_SUMMARY_CHUNK_SIZE
+    workers = workers or settings.MONTHLY_SUMMARY_WORKERS
+    users_repo = UserRepository(supabase_registry.client)
+    summaries = MonthlySummaryRepository(supabase_registry.client)
+
+    mark = None if restart else await checkpoints.get(job)
+    if mark and mark.get("done"):
+        logger.info("monthly_summaries_up_to_date", month=month.isoformat(), users=mark["users"])
+        return 0
+    watermark = _Watermark(mark["after_user_uuid"] if mark else None, mark["users"] if mark else 0)
+    resumed_from = watermark.users
+
+    async def save(done: bool) -> None:
+        saved = await checkpoints.save(
+            job,
+            owner,
+            {"after_user_uuid": watermark.after, "users": watermark.users, "done": done},
+            settings.MONTHLY_SUMMARY_LEASE_SECONDS,
+        )
+        if not saved:
+            raise RuntimeError(f"Lease de {job} perdido para outro processo")
+
+    queue: asyncio.Queue[tuple[int, list[str]] | None] = asyncio.Queue(maxsize=workers)
+    lock = asyncio.Lock()
+    computed_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    chunks = 0
+
+    async def produce() -> None:
+        nonlocal chunks
+        after = watermark.after
+        while True:
+            user_uuids = await users_repo.list_uuids(after, limit)
+            if user_uuids:
+                await queue.put((chunks, user_uuids))
+                chunks += 1
+                after = user_uuids[-1]
+            if len(user_uuids) < limit:
+                break
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def work() -> None:
+        while (item := await queue.get()) is not None:
+            seq, user_uuids = item
+            inputs = await summaries.inputs(user_uuids, month)
+            if inputs is None:
+                raise RuntimeError("Função monthly_summary_inputs não encontrada: aplique as migrations do Supabase")
+            await summaries.upsert_many([summary_service.build_summary(month, row, computed_at) for row in inputs])
+            # O lock também ordena as gravações: um watermark nunca sobrescreve outro mais novo
+            async with lock:
+                if watermark.complete(seq, user_uuids[-1], len(user_uuids)):
+                    await save(done=False)
+
+    tasks = [asyncio.create_task(produce()), *(asyncio.create_task(work()) for _ in range(workers))]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    await save(done=True)
+    built = watermark.users - resumed_from
+    seconds = time.perf_counter() - started
+    logger.info(
+        "monthly_summaries_built",
+        month=month.isoformat(),
+        users=built,
+        resumed_from=resumed_from,
+        chunks=chunks,
+        seconds=round(seconds, 2),
+        users_per_second=round(built / seconds) if seconds else None,
+    )
+    return built
+
+
+async def _main(month: date | None, restart: bool, chunk_size: int | None, workers: int | None) -> int:
+    supabase_registry.startup()
+    try:
+        return await build_monthly_summaries(month, restart=restart, chunk_size=chunk_size, workers=workers)
+    finally:
+        await supabase_registry.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("month", nargs="?", help="AAAA-MM (padrão: mês anterior)")
+    parser.add_argument("--restart", action="store_true", help="Ignora o checkpoint e recalcula o mês inteiro")
+    parser.add_argument("--chunk-size", type=int, help="Usuários por pedaço (padrão: MONTHLY_SUMMARY_CHUNK_SIZE)")
+    parser.add_argument("--workers", type=int, help="Pedaços em paralelo (padrão: MONTHLY_SUMMARY_WORKERS)")
+    args = parser.parse_args()
+    month = date.fromisoformat(f"{args.month}-01") if args.month else None
+    asyncio.run(_main(month, args.restart, args.chunk_size, args.workers))
+
+
+if __name__ == "__main__":
+    main()
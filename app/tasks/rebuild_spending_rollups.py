@@ -0,0 +1,40 @@
+"""Recalcula a tabela spending_rollups a partir de transactions.
+
+Uso:
+    python -m app.tasks.rebuild_spending_rollups            # todos os usuários
+    python -m app.tasks.rebuild_spending_rollups <user_uuid>
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+import structlog
+
+from app.core.supabase_client import supabase_registry
+from app.repositories.spending_rollup_repository import SpendingRollupRepository
+
+logger = structlog.get_logger()
+
+
+async def rebuild_spending_rollups(user_uuid: str | None = None) -> int:
+    supabase_registry.startup()
+    try:
+        rows = await SpendingRollupRepository(supabase_registry.client).rebuild(user_uuid)
+    finally:
+        await supabase_registry.shutdown()
+    if rows is None:
+        raise SystemExit("Função rebuild_spending_rollups não encontrada: aplique as migrations do Supabase")
+    logger.info("spending_rollups_rebuilt", user_uuid=user_uuid, rows=rows)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("user_uuid", nargs="?", help="Recalcula apenas este usuário")
+    args = parser.parse_args()
+    asyncio.run(rebuild_spending_rollups(args.user_uuid))
+
+
+if __name__ == "__main__":
+    main()
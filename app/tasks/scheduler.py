@@ -0,0 +1,75 @@
+"""Jobs periódicos (APScheduler), iniciados no lifespan da aplicação.
+
+Cada worker do uvicorn tem seu agendador; os jobs precisam aguentar rodar em
+paralelo (expire_trials e goal_alerts serializam pelo lock do checkpoint;
+monthly_summary reserva o mês com um lease e os demais workers pulam a rodada).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import structlog
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.core.config import settings
+from app.tasks.expire_trials import expire_trials
+from app.tasks.goal_alerts import scan_goal_alerts
+from app.tasks.monthly_summary import build_monthly_summaries
+
+logger = structlog.get_logger()
+
+scheduler = AsyncIOScheduler(timezone=timezone.utc)
+
+
+def _logged(name: str, job: Callable[[], Awaitable[object]]) -> Callable[[], Awaitable[None]]:
+    """Falha de um job vai para o log e não derruba o agendador."""
+    async def run() -> None:
+        try:
+            await job()
+        except Exception as exc:
+            logger.error("scheduled_job_failed", job=name, error=str(exc))
+    return run
+
+
+def start() -> None:
+    scheduler.add_job(
+        _logged("expire_trials", expire_trials),
+        "interval",
+        minutes=settings.TRIAL_EXPIRY_INTERVAL_MINUTES,
+        id="expire_trials",
+        next_run_time=datetime.now(timezone.utc),  # primeira rodada já no startup
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=None,  # rodada atrasada pelo loop ocupado ainda roda
+        replace_existing=True,
+    )
+    # Diário, não só no dia 1: cobre a aplicação fora do ar na virada e
+    # retoma rodadas interrompidas; mês concluído custa uma leitura
+    scheduler.add_job(
+        _logged("monthly_summary", build_monthly_summaries),
+        "cron",
+        hour=settings.MONTHLY_SUMMARY_HOUR,
+        id="monthly_summary",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=None,
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _logged("goal_alerts", scan_goal_alerts),
+        "cron",
+        hour=settings.GOAL_ALERT_HOUR,
+        id="goal_alerts",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=None,
+        replace_existing=True,
+    )
+    scheduler.start()
+    logger.info("scheduler_started", jobs=[job.id for job in scheduler.get_jobs()])
+
+
+def shutdown() -> None:
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,6 @@
+"""Benchmark de carga e latência da API contra um Supabase em memória.
+
+Sobe `app.main.create_app` em processo, troca a rede do Supabase por
+`bench.fake_supabase.FakeSupabase`, semeia dados sintéticos e dispara o mix de
+`bench.scenarios`. Uso: `python -m bench --help` e docs/bench.md.
+"""
@@ -0,0 +1,97 @@
+"""CLI do bench.
+
+    python -m bench --users 20 --transactions-per-user 2000 --requests 5000
+    python -m bench --mix hot --db-latency-ms 5 --json bench-main.json
+    python -m bench --baseline bench-main.json --threshold 0.2   # exit 1 se regredir
+    python -m bench --check goal-progress --calls 50              # exit 1 se perder atualizações
+    python -m bench --check register                              # idas ao Supabase por cadastro
+    python -m bench --check monthly-summary --job-users 100000    # vazão do resumo mensal
+    python -m bench --check goal-alerts --job-users 100000        # vazão dos alertas de metas
+    python -m bench --check summary --summary-sizes 10000,100000,1000000  # resumo x histórico
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+from bench.checks import CHECKS
+from bench.runner import RunConfig, compare, format_report, load_report, run, save_report
+from bench.scenarios import MIXES
+from bench.seed import SeedConfig
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark de latência da API ClariX")
+    scale = parser.add_argument_group("massa de dados")
+    scale.add_argument("--users", type=int, default=20)
+    scale.add_argument("--transactions-per-user", type=int, default=2000)
+    scale.add_argument("--categories-per-user", type=int, default=12)
+    scale.add_argument("--months", type=int, default=24, help="histórico de transações em meses")
+    scale.add_argument("--seed", type=int, default=42)
+
+    load = parser.add_argument_group("carga")
+    load.add_argument("--requests", type=int, default=5000)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--warmup", type=int, default=200)
+    load.add_argument("--mix", choices=sorted(MIXES), default="default")
+    load.add_argument("--sync", action="store_true", help="SUPABASE_ASYNC=false (cliente sync no threadpool)")
+    load.add_argument("--no-rpc", action="store_true", help="simula banco sem as migrations (fallbacks)")
+    load.add_argument("--db-latency-ms", type=float, default=0.0, help="latência simulada por chamada ao Supabase")
+
+    checks = parser.add_argument_group("concorrência")
+    checks.add_argument("--check", choices=sorted(CHECKS), help="roda um check de concorrência em vez do mix")
+    checks.add_argument("--calls", type=int, default=50, help="requisições simultâneas do check")
+    checks.add_argument("--job-users", type=int, default=100_000, help="usuários sintéticos dos checks de jobs")
+    checks.add_argument(
+        "--summary-sizes", default="10000,100000,1000000",
+        help="transações do usuário em cada rodada do check summary, separadas por vírgula",
+    )
+
+    out = parser.add_argument_group("saída")
+    out.add_argument("--json", metavar="PATH", help="grava o relatório em JSON")
+    out.add_argument("--baseline", metavar="PATH", help="relatório anterior para comparar")
+    out.add_argument("--threshold", type=float, default=0.2, help="piora tolerada frente ao baseline")
+    args = parser.parse_args()
+
+    config = RunConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        mix=args.mix,
+        async_client=not args.sync,
+        rpc=not args.no_rpc,
+        db_latency_ms=args.db_latency_ms,
+        seed=SeedConfig(
+            users=args.users,
+            transactions_per_user=args.transactions_per_user,
+            categories_per_user=args.categories_per_user,
+            months=args.months,
+            seed=args.seed,
+        ),
+    )
+    if args.check:
+        extra = {"users": args.job_users} if args.check in ("monthly-summary", "goal-alerts") else {}
+        if args.check == "summary":
+            extra = {"sizes": tuple(int(n) for n in args.summary_sizes.split(","))}
+        result = asyncio.run(CHECKS[args.check](config, calls=args.calls, **extra))
+        print(" ".join(f"{k}={v}" for k, v in result.items()))
+        sys.exit(1 if result.get("lost_updates") or result["errors"] else 0)
+
+    report = asyncio.run(run(config))
+    print(format_report(report))
+
+    if args.json:
+        save_report(report, args.json)
+    if args.baseline:
+        regressions = compare(report, load_report(args.baseline), args.threshold)
+        if regressions:
+            print("\nRegressões frente ao baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nSem regressões frente ao baseline.")
+
+
+if __name__ == "__main__":
+    main()
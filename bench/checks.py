@@ -0,0 +1,332 @@
+"""Verificações contra o app em processo.
+
+Cada check dispara requisições simultâneas e confere o estado final no
+FakeSupabase, que serializa cada chamada como o Postgres faria com um
+único statement. Com --no-rpc os fallbacks de leitura+escrita aparecem
+como atualizações perdidas, sobretudo com --db-latency-ms > 0.
+
+register mede as idas ao Supabase no caminho crítico do cadastro;
+monthly-summary e goal-alerts medem a vazão dos jobs de app/tasks;
+summary mede GET /transactions/summary conforme o histórico cresce.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import replace
+from datetime import date, timedelta
+
+from bench.fake_supabase import query_counter
+from bench.runner import RunConfig, harness
+
+
+async def goal_progress_race(config: RunConfig, calls: int = 50, amount: float = 1.0) -> dict:
+    """N PATCH /goals/{id}/progress em paralelo na mesma meta: o total tem que somar todos."""
+    async with harness(config) as (client, fake, sessions):
+        session = sessions[0]
+        goal_id = session.user.goal_ids[0]
+        goal = next(r for r in fake.user_rows("goals", session.user.user_uuid) if r["id"] == goal_id)
+        before = goal["current_amount"]
+
+        headers = {"Authorization": f"Bearer {session.access_token}"}
+        responses = await asyncio.gather(*(
+            client.patch(f"/api/v1/goals/{goal_id}/progress", json={"amount": amount}, headers=headers)
+            for _ in range(calls)
+        ))
+        actual = goal["current_amount"]
+
+    expected = round(before + calls * amount, 2)
+    return {
+        "check": "goal-progress",
+        "calls": calls,
+        "errors": sum(1 for r in responses if r.status_code >= 400),
+        "expected": expected,
+        "actual": actual,
+        "lost_updates": round((expected - actual) / amount),
+    }
+
+
+async def register_round_trips(config: RunConfig, calls: int = 50) -> dict:
+    """N POST /auth/register simultâneos (metade em conflito): idas ao Supabase por cadastro.
+
+    Os conflitos repetem o email ou o WhatsApp (formatado, como o cliente
+    envia) de um usuário do seed e têm de voltar 409 com o campo certo.
+    """
+    async with harness(config) as (client, fake, sessions):
+        existing = next(u for u in fake.tables["users"] if u["user_uuid"] == sessions[0].user.user_uuid)
+
+        async def register(i: int) -> tuple[bool, bool, int]:
+            """(conflito esperado, resposta certa, idas ao Supabase)"""
+            body = {
+                "name": f"Cadastro {i}",
+                "email": f"cadastro{i}@bench.dev",
+                "password": "Senha-forte-123",
+                "whatsapp": f"(11) 9{i:04d}-{i:04d}",
+            }
+            expected = ""
+            if i % 4 == 1:
+                body["email"], expected = existing["email"], "Email já cadastrado"
+            elif i % 4 == 3:
+                phone = existing["phone"][2:]
+                body["whatsapp"] = f"({phone[:2]}) {phone[2:7]}-{phone[7:]}"
+                expected = "WhatsApp já cadastrado"
+            counter = [0]
+            token = query_counter.set(counter)
+            try:
+                response = await client.post("/api/v1/auth/register", json=body)
+            finally:
+                query_counter.reset(token)
+            ok = response.json().get("detail") == expected if expected else response.status_code == 201
+            return bool(expected), ok, counter[0]
+
+        results = await asyncio.gather(*(register(i) for i in range(calls)))
+
+    def average_trips(conflict: bool) -> float:
+        trips = [n for c, _, n in results if c == conflict]
+        return round(sum(trips) / max(len(trips), 1), 2)
+
+    return {
+        "check": "register",
+        "calls": calls,
+        "errors": sum(1 for _, ok, _ in results if not ok),
+        "round_trips_created": average_trips(False),
+        "round_trips_conflict": average_trips(True),
+    }
+
+
+def _seed_summary_users(fake, users: int, month, rng: random.Random) -> None:
+    """Usuários enxutos para o job: 3 categorias, 2 limites, 2 metas e 4 transações no mês."""
+    for _ in range(users):
+        user_uuid = str(uuid.uuid4())  # o rng do seed já gerou os ids dos usuários do seed
+        fake.insert("users", {"user_uuid": user_uuid, "plan_status": "active"})
+        category_ids = [
+            fake.insert("categories", {"user_uuid": user_uuid, "name": name, "icon": "", "color": ""})["id"]
+            for name in ("Mercado", "Transporte", "Salário")
+        ]
+        for category_id in category_ids[:2]:
+            fake.insert("spending_limits", {
+                "user_uuid": user_uuid, "category_id": category_id, "amount": 500.0, "period": "mensal",
+            })
+        for g in range(2):
+            fake.insert("goals", {
+                "user_uuid": user_uuid, "title": f"Meta {g + 1}", "target_amount": 10000.0,
+                "current_amount": round(rng.uniform(0, 8000), 2), "is_completed": False,
+            })
+        for t in range(4):
+            entrada = t == 0
+            fake.insert("transactions", {
+                "user_uuid": user_uuid,
+                "category_id": category_ids[2] if entrada else rng.choice(category_ids[:2]),
+                "amount": round(rng.uniform(3000, 9000) if entrada else rng.uniform(5, 400), 2),
+                "date": (month + timedelta(days=rng.randrange(28))).isoformat(),
+                "type": "entrada" if entrada else "saida",
+            })
+
+
+async def monthly_summary_throughput(config: RunConfig, calls: int = 50, users: int = 100_000) -> dict:
+    """Job de resumo mensal sobre `users` usuários sintéticos (além do seed).
+
+    Mede a vazão da rodada completa e confere: um resumo por usuário, totais
+    batendo com as transações, rerun sem trabalho, retomada depois de uma
+    falha no meio sem pular nem duplicar usuários e, com duas execuções
+    simultâneas, só uma calculando.
+    """
+    from app.core.config import settings
+    from app.repositories.monthly_summary_repository import MonthlySummaryRepository
+    from app.services.summary_service import previous_month
+    from app.tasks.monthly_summary import build_monthly_summaries
+
+    month = previous_month()
+    rng = random.Random(config.seed.seed)
+    async with harness(config) as (client, fake, sessions):
+        _seed_summary_users(fake, users, month, rng)
+        total_users = len(fake.tables["users"])
+
+        before = fake.requests
+        started = time.perf_counter()
+        built = await build_monthly_summaries(month)
+        seconds = time.perf_counter() - started
+        requests = fake.requests - before
+
+        summaries = {(r["user_uuid"], r["month"]): r for r in fake.tables["monthly_summaries"]}
+        errors = abs(len(summaries) - total_users) + abs(built - total_users)
+        for user in rng.sample(fake.tables["users"], min(200, total_users)):
+            summary = summaries.get((user["user_uuid"], month.isoformat()))
+            in_month = [
+                t for t in fake.user_rows("transactions", user["user_uuid"])
+                if t["date"][:7] == month.isoformat()[:7]
+            ]
+            expenses = round(sum(t["amount"] for t in in_month if t["type"] == "saida"), 2)
+            if summary is None or abs(summary["expenses"] - expenses) > 0.01 or summary["transaction_count"] != len(in_month):
+                errors += 1
+
+        # Rerun: checkpoint concluído, nada a fazer
+        rerun = await build_monthly_summaries(month)
+
+        # Recalcula do zero falhando no meio, depois retoma pelo checkpoint
+        upsert_many = MonthlySummaryRepository.upsert_many
+        fail_at = -(-total_users // settings.MONTHLY_SUMMARY_CHUNK_SIZE) // 2 + 1
+        upserts = 0
+
+        async def failing_upsert(self, rows):
+            nonlocal upserts
+            upserts += 1
+            if upserts == fail_at:
+                raise RuntimeError("falha simulada")
+            await upsert_many(self, rows)
+
+        MonthlySummaryRepository.upsert_many = failing_upsert
+        try:
+            await build_monthly_summaries(month, restart=True)
+        except RuntimeError:
+            pass
+        finally:
+            MonthlySummaryRepository.upsert_many = upsert_many
+        resumed = await build_monthly_summaries(month)
+        errors += len(fake.tables["monthly_summaries"]) != total_users
+
+        # Dois workers na mesma hora: só um reserva o job, o outro pula
+        concurrent = await asyncio.gather(
+            build_monthly_summaries(month, restart=True),
+            build_monthly_summaries(month, restart=True),
+        )
+        errors += sorted(concurrent) != [0, total_users]
+
+    return {
+        "check": "monthly-summary",
+        "users": total_users,
+        "errors": errors,
+        "seconds": round(seconds, 2),
+        "users_per_second": round(built / seconds),
+        "requests_per_1k_users": round(requests * 1000 / max(built, 1), 1),
+        "rerun_users": rerun,
+        "resumed_users": resumed,
+        "concurrent_users": concurrent,
+    }
+
+
+# (current_amount, dias até target_date, monthly_contribution, alerta esperado), alvo 10 000
+_GOAL_CASES = [
+    (9500.0, 200, None, "near_completion"),
+    (1000.0, 100, 500.0, "off_track"),   # 1 000 + 500 x ~3,3 meses não chega
+    (5000.0, 300, 1000.0, None),         # ~9,9 meses x 1 000 cobrem os 5 000
+    (100.0, None, None, None),           # sem prazo, nunca atrasa
+    (3000.0, -5, None, "off_track"),     # prazo vencido
+    (2000.0, 400, None, None),           # caminho linear desde hoje: nada esperado ainda
+]
+
+
+async def goal_alert_scan(config: RunConfig, calls: int = 50, users: int = 100_000) -> dict:
+    """Job de alertas de metas sobre `users` usuários sintéticos com 2 metas cada.
+
+    Cada meta sintética segue um caso de _GOAL_CASES; o check confere um
+    alerta por meta que deveria alertar e nenhum repetido num rerun.
+    """
+    from app.tasks.goal_alerts import scan_goal_alerts
+
+    today = date.today()
+    expected = 0
+    async with harness(config) as (client, fake, sessions):
+        for i in range(users):
+            user_uuid = str(uuid.uuid4())
+            for g in range(2):
+                current, days, contribution, kind = _GOAL_CASES[(2 * i + g) % len(_GOAL_CASES)]
+                fake.insert("goals", {
+                    "user_uuid": user_uuid, "title": f"Meta {g + 1}", "target_amount": 10000.0,
+                    "current_amount": current, "is_completed": False, "monthly_contribution": contribution,
+                    "target_date": (today + timedelta(days=days)).isoformat() if days is not None else None,
+                })
+                expected += kind is not None
+        goals = len(fake.tables["goals"])
+
+        before = fake.requests
+        started = time.perf_counter()
+        alerted = await scan_goal_alerts()
+        seconds = time.perf_counter() - started
+        requests = fake.requests - before
+
+        rerun = await scan_goal_alerts()
+        alerts = fake.tables["goal_alerts"]
+        duplicates = len(alerts) - len({a["goal_id"] for a in alerts})
+
+    return {
+        "check": "goal-alerts",
+        "goals": goals,
+        "errors": abs(alerted - expected) + duplicates + rerun,
+        "alerts": alerted,
+        "expected": expected,
+        "seconds": round(seconds, 2),
+        "goals_per_second": round(goals / seconds),
+        "requests": requests,
+        "rerun_alerts": rerun,
+    }
+
+async def summary_scaling(
+    config: RunConfig,
+    calls: int = 50,
+    sizes: tuple[int, ...] = (10_000, 100_000, 1_000_000),
+) -> dict:
+    """GET /transactions/summary de um usuário com `sizes` transações, com e sem a RPC.
+
+    Com transaction_summary a resposta do Supabase tem tamanho fixo; no
+    fallback ela cresce com o histórico. Os dois caminhos têm de devolver os
+    mesmos totais. O fallback, que baixa tudo, faz só max(1, calls // 10)
+    requisições por tamanho.
+
+    Mede bytes e idas ao Supabase por requisição, não o custo da agregação no
+    Postgres: a RPC do FakeSupabase soma em Python (ver docs/bench.md).
+    """
+    rows: dict[str, dict] = {}
+    errors = 0
+    for size in sizes:
+        sized = replace(config, rpc=True, seed=replace(config.seed, users=1, transactions_per_user=size))
+        async with harness(sized) as (client, fake, sessions):
+            headers = {"Authorization": f"Bearer {sessions[0].access_token}"}
+            handle = fake.handle
+            received = [0]
+
+            def counting_handle(request):
+                response = handle(request)
+                received[0] += len(response.content)
+                return response
+
+            fake.handle = counting_handle
+            results = {}
+            for mode, requests in (("rpc", calls), ("fallback", max(1, calls // 10))):
+                fake.rpc_enabled = mode == "rpc"
+                received[0] = 0
+                round_trips = [0]  # só as da requisição, sem outbox e agendador
+                latencies = []
+                for _ in range(requests):
+                    token = query_counter.set(round_trips)
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get("/api/v1/transactions/summary", headers=headers)
+                    finally:
+                        query_counter.reset(token)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += response.status_code >= 400
+                results[mode] = response.json()
+                rows[f"{mode}_{size}"] = {
+                    "p50_ms": round(sorted(latencies)[len(latencies) // 2], 2),
+                    "kb": round(received[0] / requests / 1024, 1),
+                    "round_trips": round(round_trips[0] / requests, 2),
+                }
+            errors += results["rpc"] != results["fallback"] or results["rpc"].get("count") != size
+
+    return {
+        "check": "summary",
+        "errors": errors,
+        **{f"{key}_{metric}": value for key, stats in rows.items() for metric, value in stats.items()},
+    }
+
+
+CHECKS = {
+    "goal-alerts": goal_alert_scan,
+    "goal-progress": goal_progress_race,
+    "monthly-summary": monthly_summary_throughput,
+    "register": register_round_trips,
+    "summary": summary_scaling,
+}
@@ -0,0 +1,721 @@
+"""Supabase em memória: subconjunto da API HTTP do PostgREST e do GoTrue.
+
+Implementa o suficiente para os repositórios do app rodarem sem rede:
+select com embed simples, filtros (eq, neq, gt, gte, lt, lte, like, ilike,
+is, in, not.*, or/and), order, offset/limit, count via Prefer, single
+object, insert/upsert/update/delete com return=representation, as RPCs
+de supabase/migrations e login/refresh/logout/JWKS do Auth.
+
+Cada requisição HTTP recebida incrementa o contador da requisição da API em
+andamento (`query_counter`), o que permite medir consultas por requisição.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable
+from urllib.parse import parse_qsl
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt.algorithms import ECAlgorithm
+
+BENCH_PASSWORD = "bench-password"
+_KID = "bench-key"
+
+# Defaults de coluna que o Postgres aplicaria no insert
+_COLUMN_DEFAULTS: dict[str, dict[str, Any]] = {
+    "goals": {
+        "description": None, "current_amount": 0, "target_date": None,
+        "monthly_contribution": None, "is_completed": False, "completed_at": None,
+    },
+    "transactions": {"notes": None, "payment_method": None},
+    "spending_limits": {"period": "mensal"},
+    "job_checkpoints": {"watermark": {}, "lease_owner": None, "lease_until": None},
+    "outbox": {"status": "pending", "attempts": 0, "next_attempt_at": None, "last_error": None, "processed_at": None},
+    "user_plan_subscriptions": {"payment_method": None, "abacatepay_charge_id": None},
+}
+
+# Contador de chamadas ao Supabase da requisição da API em andamento
+query_counter: ContextVar[list[int] | None] = ContextVar("query_counter", default=None)
+
+
+class _PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str, details: str | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": None}
+
+
+# ── Parsing de filtros ────────────────────────────────────────────────────────
+
+def _split_top_level(expr: str) -> list[str]:
+    """Divide por vírgula fora de parênteses e aspas: "a.eq.1,and(b.eq.2,c.eq.\"x,y\")"."""
+    parts, depth, start, quoted, escaped = [], 0, 0, False, False
+    for i, ch in enumerate(expr):
+        if escaped:
+            escaped = False
+        elif ch == "\\" and quoted:
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p for p in parts if p]
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _like(pattern: str, value: Any, flags: int = 0) -> bool:
+    if value is None:
+        return False
+    regex = "^" + ".*".join(re.escape(p) for p in re.split(r"[*%]", pattern)) + "$"
+    return re.match(regex, str(value), flags) is not None
+
+
+def _compare(op: str, raw: str, value: Any) -> bool:
+    if op == "is":
+        target = {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+        return value is target if target is None else value == target
+    if op == "in":
+        items = [i.strip().strip('"') for i in raw.strip("()").split(",") if i.strip()]
+        return value in [_coerce(i, value) for i in items]
+    if op == "like":
+        return _like(raw, value)
+    if op == "ilike":
+        return _like(raw, value, re.IGNORECASE)
+    if value is None:
+        return False
+    target = _coerce(raw, value)
+    try:
+        return {
+            "eq": value == target,
+            "neq": value != target,
+            "gt": value > target,
+            "gte": value >= target,
+            "lt": value < target,
+            "lte": value <= target,
+        }[op]
+    except KeyError:
+        raise _PostgrestError(400, "PGRST100", f"operador não suportado: {op}")
+
+
+def _predicate(column: str, expr: str) -> Callable[[dict], bool]:
+    """Filtro no formato PostgREST: coluna=[not.]op.valor."""
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = re.sub(r"\\(.)", r"\1", raw[1:-1])
+
+    def check(row: dict) -> bool:
+        return _compare(op, raw, row.get(column)) != negate
+
+    return check
+
+
+def _logic_predicate(kind: str, expr: str) -> Callable[[dict], bool]:
+    """or=(...) / and=(...), com and(...)/or(...) aninhados."""
+    checks = []
+    for part in _split_top_level(expr.strip()[1:-1]):
+        m = re.match(r"^(not\.)?(and|or)(\(.*\))$", part)
+        if m:
+            inner = _logic_predicate(m.group(2), m.group(3))
+            checks.append((lambda row, f=inner: not f(row)) if m.group(1) else inner)
+            continue
+        column, _, rest = part.partition(".")
+        checks.append(_predicate(column, rest))
+    combine = any if kind == "or" else all
+    return lambda row: combine(c(row) for c in checks)
+
+
+# ── Fake ──────────────────────────────────────────────────────────────────────
+
+class FakeSupabase:
+    """Banco em memória atrás de transports httpx sync e async.
+
+    `rpc=False` responde PGRST202 para toda RPC (caminho de fallback);
+    `latency_ms` simula a ida e volta de rede por chamada.
+    """
+
+    def __init__(self, url: str, rpc: bool = True, latency_ms: float = 0.0) -> None:
+        self.url = url.rstrip("/")
+        self.rpc_enabled = rpc
+        self.latency = latency_ms / 1000
+        self.tables: dict[str, list[dict]] = defaultdict(list)
+        # Índice por user_uuid: evita que o custo do fake cresça com a base toda
+        self._by_user: dict[str, dict[str, list[dict]]] = defaultdict(lambda: defaultdict(list))
+        self._next_id: dict[str, int] = defaultdict(lambda: 1)
+        self._lock = threading.RLock()
+        self._signing_key = ec.generate_private_key(ec.SECP256R1())
+        self._refresh_tokens: dict[str, str] = {}
+        self.requests = 0
+        self._rpcs: dict[str, Callable[[dict], Any]] = {
+            "transaction_summary": self._rpc_transaction_summary,
+            "category_transaction_stats": self._rpc_category_transaction_stats,
+            "month_spending": self._rpc_month_spending,
+            "apply_spending_deltas": self._rpc_apply_spending_deltas,
+            "rebuild_spending_rollups": self._rpc_rebuild_spending_rollups,
+            "update_user_transaction": self._rpc_update_user_transaction,
+            "update_user_transactions": self._rpc_update_user_transactions,
+            "add_goal_progress": self._rpc_add_goal_progress,
+            "claim_outbox_events": self._rpc_claim_outbox_events,
+            "expire_trials": self._rpc_expire_trials,
+            "monthly_summary_inputs": self._rpc_monthly_summary_inputs,
+            "scan_goal_alerts": self._rpc_scan_goal_alerts,
+            "claim_job": self._rpc_claim_job,
+        }
+
+    # ── Transports ────────────────────────────────────────────────────────────
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        fake = self
+
+        class _Async(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+                await request.aread()
+                if fake.latency:
+                    await asyncio.sleep(fake.latency)
+                return fake.handle(request)
+
+        return _Async()
+
+    def sync_transport(self) -> httpx.BaseTransport:
+        fake = self
+
+        class _Sync(httpx.BaseTransport):
+            def handle_request(self, request: httpx.Request) -> httpx.Response:
+                request.read()
+                if fake.latency:
+                    time.sleep(fake.latency)
+                return fake.handle(request)
+
+        return _Sync()
+
+    # ── Dados ─────────────────────────────────────────────────────────────────
+
+    def insert(self, table: str, row: dict) -> dict:
+        with self._lock:
+            row = {**_COLUMN_DEFAULTS.get(table, {}), **row}
+            if "id" not in row:
+                row["id"] = self._next_id[table]
+                self._next_id[table] += 1
+            row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+            self.tables[table].append(row)
+            if "user_uuid" in row:
+                self._by_user[table][row["user_uuid"]].append(row)
+            return row
+
+    def user_rows(self, table: str, user_uuid: str) -> list[dict]:
+        return self._by_user[table][user_uuid]
+
+    def rebuild_rollups(self) -> int:
+        """Equivalente a `select rebuild_spending_rollups()` da migration."""
+        with self._lock:
+            return self._rpc_rebuild_spending_rollups({})
+
+    def issue_token(self, user_uuid: str, email: str, ttl: int = 3600) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": user_uuid,
+            "email": email,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + ttl,
+        }
+        return jwt.encode(claims, self._signing_key, algorithm="ES256", headers={"kid": _KID})
+
+    # ── Roteamento ────────────────────────────────────────────────────────────
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        counter = query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+        path = request.url.path
+        try:
+            with self._lock:
+                self.requests += 1
+                if path.startswith("/rest/v1/rpc/"):
+                    return self._handle_rpc(request, path.rsplit("/", 1)[1])
+                if path.startswith("/rest/v1/"):
+                    return self._handle_table(request, path[len("/rest/v1/"):])
+                if path.startswith("/auth/v1/"):
+                    return self._handle_auth(request, path[len("/auth/v1/"):])
+        except _PostgrestError as exc:
+            return httpx.Response(exc.status, json=exc.body)
+        return httpx.Response(404, json={"message": f"rota desconhecida: {path}"})
+
+    # ── PostgREST: tabelas ────────────────────────────────────────────────────
+
+    def _handle_table(self, request: httpx.Request, table: str) -> httpx.Response:
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        prefer = request.headers.get("prefer", "")
+        filters: list[Callable[[dict], bool]] = []
+        select, order, offset, limit, on_conflict = "*", None, 0, None, None
+        user_uuid = None
+        for key, value in params:
+            if key == "user_uuid" and value.startswith("eq."):
+                user_uuid = value[3:]
+            if key == "select":
+                select = value
+            elif key == "order":
+                order = value
+            elif key == "offset":
+                offset = int(value)
+            elif key == "limit":
+                limit = int(value)
+            elif key == "on_conflict":
+                on_conflict = value
+            elif key == "columns":
+                continue
+            elif key in ("or", "and"):
+                filters.append(_logic_predicate(key, value))
+            else:
+                filters.append(_predicate(key, value))
+
+        rows = self.tables[table] if user_uuid is None else self.user_rows(table, user_uuid)
+        matched = [r for r in rows if all(f(r) for f in filters)]
+        method = request.method
+
+        if method in ("GET", "HEAD"):
+            total = len(matched)
+            if order:
+                matched = self._sorted(matched, order)
+            page = matched[offset: offset + limit if limit is not None else None]
+            data = [self._project(r, select) for r in page]
+            headers = {}
+            if "count=" in prefer:
+                end = offset + len(page) - 1
+                headers["content-range"] = f"{offset}-{end}/{total}" if page else f"*/{total}"
+            if method == "HEAD":
+                return httpx.Response(200, headers=headers)
+            return self._respond(request, data, headers)
+
+        if method == "POST":
+            body = json.loads(request.content or b"[]")
+            items = body if isinstance(body, list) else [body]
+            created = []
+            # Índice pela chave de conflito: upserts em lote não varrem a tabela por item
+            keys = on_conflict.split(",") if "resolution=" in prefer and on_conflict else None
+            index = {tuple(r.get(k) for k in keys): r for r in rows} if keys else {}
+            for item in items:
+                existing = index.get(tuple(item.get(k) for k in keys)) if keys else None
+                if existing is not None:
+                    if "merge-duplicates" in prefer:
+                        existing.update(item)
+                    created.append(existing)
+                else:
+                    row = self.insert(table, item)
+                    if keys:
+                        index[tuple(row.get(k) for k in keys)] = row
+                    created.append(row)
+            return self._respond(request, [self._project(r, select) for r in created], status=201)
+
+        if method == "PATCH":
+            body = json.loads(request.content or b"{}")
+            for row in matched:
+                row.update(body)
+            return self._respond(request, [self._project(r, select) for r in matched])
+
+        if method == "DELETE":
+            ids = {id(r) for r in matched}
+            self.tables[table] = [r for r in self.tables[table] if id(r) not in ids]
+            for owner in {r.get("user_uuid") for r in matched if "user_uuid" in r}:
+                owned = self._by_user[table][owner]
+                owned[:] = [r for r in owned if id(r) not in ids]
+            return self._respond(request, [self._project(r, select) for r in matched])
+
+        raise _PostgrestError(405, "PGRST000", f"método não suportado: {method}")
+
+    def _respond(self, request: httpx.Request, data: Any, headers: dict | None = None, status: int = 200) -> httpx.Response:
+        accept = request.headers.get("accept", "")
+        if "vnd.pgrst.object" in accept and isinstance(data, list):
+            if len(data) != 1:
+                raise _PostgrestError(
+                    406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                    f"The result contains {len(data)} rows",
+                )
+            data = data[0]
+        if request.method != "GET" and "return=minimal" in request.headers.get("prefer", ""):
+            return httpx.Response(204 if status == 200 else status, headers=headers)
+        return httpx.Response(status, json=data, headers=headers)
+
+    @staticmethod
+    def _sorted(rows: list[dict], order: str) -> list[dict]:
+        for clause in reversed(order.split(",")):
+            column, *mods = clause.split(".")
+            desc = "desc" in mods
+            rows = sorted(
+                rows,
+                key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else 0),
+                reverse=desc,
+            )
+        return rows
+
+    def _project(self, row: dict, select: str) -> dict:
+        if select in ("", "*"):
+            return copy.deepcopy(row)
+        out: dict = {}
+        for column in _split_top_level(select):
+            m = re.match(r"^(\w+)\((.*)\)$", column)
+            if m:
+                relation, inner = m.groups()
+                fk = row.get(f"{relation.rstrip('s')}_id")
+                target = next((r for r in self.tables[relation] if r.get("id") == fk), None)
+                out[relation] = self._project(target, inner) if target else None
+            elif column == "*":
+                out.update(copy.deepcopy(row))
+            else:
+                out[column] = copy.deepcopy(row.get(column))
+        return out
+
+    # ── PostgREST: RPC ────────────────────────────────────────────────────────
+
+    def _handle_rpc(self, request: httpx.Request, fn: str) -> httpx.Response:
+        handler = self._rpcs.get(fn) if self.rpc_enabled else None
+        if handler is None:
+            raise _PostgrestError(404, "PGRST202", f"Could not find the function public.{fn}")
+        if request.method in ("GET", "HEAD"):
+            params: dict = dict(parse_qsl(request.url.query.decode()))
+        else:
+            params = json.loads(request.content or b"{}")
+        result = handler(params)
+        if result is None:
+            return httpx.Response(204)
+        return httpx.Response(200, json=result)
+
+    def _rpc_transaction_summary(self, p: dict) -> dict:
+        rows = [
+            r for r in self.user_rows("transactions", p["p_user_uuid"])
+            if (not p.get("p_date_from") or r["date"] >= p["p_date_from"])
+            and (not p.get("p_date_to") or r["date"] <= p["p_date_to"])
+        ]
+        return {
+            "total_entrada": sum(r["amount"] for r in rows if r["type"] == "entrada"),
+            "total_saida": sum(r["amount"] for r in rows if r["type"] == "saida"),
+            "count": len(rows),
+        }
+
+    def _rpc_category_transaction_stats(self, p: dict) -> list[dict]:
+        cid_filter = int(p["p_category_id"]) if p.get("p_category_id") else None
+        stats: dict[int, list] = {}
+        for r in self.user_rows("transactions", p["p_user_uuid"]):
+            cid = r.get("category_id")
+            if cid is None:
+                continue
+            if cid_filter is not None and cid != cid_filter:
+                continue
+            entry = stats.setdefault(cid, [0, 0.0])
+            entry[0] += 1
+            entry[1] += r["amount"]
+        return [{"category_id": cid, "count": c, "total": t} for cid, (c, t) in stats.items()]
+
+    def _rpc_month_spending(self, p: dict) -> list[dict]:
+        month = p["p_month"][:7] + "-01"
+        return [
+            {"category_id": r["category_id"], "spent": r["spent"]}
+            for r in self.user_rows("spending_rollups", p["p_user_uuid"])
+            if r["month"] == month
+        ]
+
+    def _rpc_apply_spending_deltas(self, p: dict) -> None:
+        deltas = p["p_deltas"] if isinstance(p["p_deltas"], list) else json.loads(p["p_deltas"])
+        rollups = self.user_rows("spending_rollups", p["p_user_uuid"])
+        for d in deltas:
+            month = str(d["month"])[:7] + "-01"
+            row = next(
+                (r for r in rollups if r["category_id"] == d["category_id"] and r["month"] == month),
+                None,
+            )
+            if row is None:
+                self.insert("spending_rollups", {
+                    "user_uuid": p["p_user_uuid"], "category_id": d["category_id"],
+                    "month": month, "spent": float(d["spent"]), "count": int(d["count"]),
+                })
+            else:
+                row["spent"] += float(d["spent"])
+                row["count"] += int(d["count"])
+        return None
+
+    def _rpc_update_user_transaction(self, p: dict) -> dict:
+        fields = p["p_fields"] if isinstance(p["p_fields"], dict) else json.loads(p["p_fields"])
+        row = next(
+            (r for r in self.user_rows("transactions", p["p_user_uuid"]) if r["id"] == int(p["p_id"])),
+            None,
+        )
+        if row is None:
+            return {"old": None, "new": None}
+        old = copy.deepcopy(row)
+        editable = ("category_id", "description", "amount", "date", "type", "notes", "payment_method")
+        row.update({k: v for k, v in fields.items() if k in editable})
+        return {"old": old, "new": copy.deepcopy(row)}
+
+    def _rpc_update_user_transactions(self, p: dict) -> list[dict]:
+        items = p["p_items"] if isinstance(p["p_items"], list) else json.loads(p["p_items"])
+        return [
+            self._rpc_update_user_transaction(
+                {"p_user_uuid": p["p_user_uuid"], "p_id": item["id"], "p_fields": item["fields"]}
+            )
+            for item in items
+        ]
+
+    def _rpc_add_goal_progress(self, p: dict) -> list[dict]:
+        row = next(
+            (r for r in self.user_rows("goals", p["p_user_uuid"]) if r["id"] == int(p["p_goal_id"])),
+            None,
+        )
+        if row is None:
+            return []
+        new_amount = round(row["current_amount"] + float(p["p_amount"]), 2)
+        if not row["is_completed"] and new_amount >= row["target_amount"]:
+            row["is_completed"] = True
+            row["completed_at"] = datetime.now(timezone.utc).isoformat()
+        row["current_amount"] = new_amount
+        return [copy.deepcopy(row)]
+
+    def _rpc_claim_outbox_events(self, p: dict) -> list[dict]:
+        now = datetime.now(timezone.utc)
+        due = sorted(
+            (
+                r for r in self.tables["outbox"]
+                if r.get("status", "pending") == "pending"
+                and datetime.fromisoformat(r.get("next_attempt_at") or r["created_at"]) <= now
+            ),
+            key=lambda r: r.get("next_attempt_at") or r["created_at"],
+        )[: int(p["p_limit"])]
+        for row in due:
+            row["attempts"] = row.get("attempts", 0) + 1
+            row["next_attempt_at"] = (now + timedelta(seconds=int(p["p_lease_seconds"]))).isoformat()
+        return copy.deepcopy(due)
+
+    def _rpc_expire_trials(self, p: dict) -> dict:
+        checkpoint = next((r for r in self.tables["job_checkpoints"] if r["name"] == p["p_job"]), None)
+        if checkpoint is None:
+            checkpoint = self.insert("job_checkpoints", {"name": p["p_job"], "watermark": {}})
+        mark = checkpoint["watermark"]
+        if "cutoff" in mark and not mark["done"]:
+            cutoff, after = mark["cutoff"], (mark["after_trial_ends_at"], mark["after_user_uuid"])
+        else:
+            cutoff, after = datetime.now(timezone.utc).isoformat(), (None, None)
+        batch = sorted(
+            (
+                r for r in self.tables["users"]
+                if r["plan_status"] == "trial" and r["trial_ends_at"] <= cutoff
+                and (after[0] is None or (r["trial_ends_at"], r["user_uuid"]) > after)
+            ),
+            key=lambda r: (r["trial_ends_at"], r["user_uuid"]),
+        )[: int(p["p_limit"])]
+        for row in batch:
+            row["plan_status"] = "expired"
+        if batch:
+            after = (batch[-1]["trial_ends_at"], batch[-1]["user_uuid"])
+        checkpoint["watermark"] = {
+            "cutoff": cutoff,
+            "after_trial_ends_at": after[0],
+            "after_user_uuid": after[1],
+            "done": len(batch) < int(p["p_limit"]),
+        }
+        return {**checkpoint["watermark"], "scanned": len(batch), "expired": len(batch)}
+
+    def _rpc_monthly_summary_inputs(self, p: dict) -> list[dict]:
+        start = date.fromisoformat(p["p_month"]).replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        previous = (start - timedelta(days=1)).replace(day=1).isoformat()
+        out = []
+        for user in p["p_user_uuids"]:
+            totals: dict[tuple, list] = {}
+            for t in self.user_rows("transactions", user):
+                if start.isoformat() <= t["date"] < end.isoformat():
+                    entry = totals.setdefault((t["type"], t.get("category_id")), [0.0, 0])
+                    entry[0] += t["amount"]
+                    entry[1] += 1
+            summary = next((s for s in self.user_rows("monthly_summaries", user) if s["month"] == previous), None)
+            out.append({
+                "user_uuid": user,
+                "transactions": [
+                    {"type": k[0], "category_id": k[1], "total": v[0], "count": v[1]} for k, v in totals.items()
+                ],
+                "categories": [
+                    {k: c[k] for k in ("id", "name", "icon", "color")} for c in self.user_rows("categories", user)
+                ],
+                "limits": [
+                    {k: r[k] for k in ("id", "category_id", "amount", "period")}
+                    for r in self.user_rows("spending_limits", user)
+                ],
+                "goals": [
+                    {k: g[k] for k in ("id", "title", "target_amount", "current_amount", "is_completed")}
+                    for g in self.user_rows("goals", user)
+                ],
+                "previous_goals": copy.deepcopy(summary["goals"]) if summary else None,
+            })
+        return out
+
+    def _rpc_scan_goal_alerts(self, p: dict) -> dict:
+        checkpoint = next((r for r in self.tables["job_checkpoints"] if r["name"] == p["p_job"]), None)
+        if checkpoint is None:
+            checkpoint = self.insert("job_checkpoints", {"name": p["p_job"], "watermark": {}})
+        mark = checkpoint["watermark"]
+        after = mark["after_goal_id"] if "after_goal_id" in mark and not mark["done"] else 0
+        today = date.today()
+        month = today.replace(day=1)
+        limit = int(p["p_limit"])
+        batch = sorted(
+            (g for g in self.tables["goals"] if not g["is_completed"] and g["id"] > after),
+            key=lambda g: g["id"],
+        )[:limit]
+        alerted_goals = {a["goal_id"] for a in self.tables["goal_alerts"] if a["month"] == month.isoformat()}
+        alerted = 0
+        for g in batch:
+            if g.get("last_alerted_at") and g["last_alerted_at"] >= month.isoformat():
+                continue
+            target, current = g["target_amount"], g["current_amount"]
+            target_date = date.fromisoformat(g["target_date"]) if g.get("target_date") else None
+            created_on = date.fromisoformat(g["created_at"][:10])
+            expected = None
+            if target_date is None:
+                pass
+            elif target_date <= today:
+                expected = target
+            elif g.get("monthly_contribution") is not None:
+                expected = max(target - g["monthly_contribution"] * ((target_date - today).days / 30.4375), 0)
+            elif target_date > created_on:
+                expected = target * (today - created_on).days / (target_date - created_on).days
+            if current >= target * float(p["p_near_ratio"]):
+                kind = "near_completion"
+            elif expected is not None and current < expected:
+                kind = "off_track"
+            else:
+                continue
+            if g["id"] in alerted_goals:
+                continue
+            self.insert("goal_alerts", {
+                "user_uuid": g["user_uuid"], "goal_id": g["id"], "kind": kind, "month": month.isoformat(),
+                "current_amount": current, "target_amount": target,
+                "expected_amount": round(expected, 2) if kind == "off_track" else None,
+            })
+            g["last_alerted_at"] = datetime.now(timezone.utc).isoformat()
+            alerted += 1
+        checkpoint["watermark"] = {
+            "after_goal_id": batch[-1]["id"] if batch else after,
+            "done": len(batch) < limit,
+        }
+        return {**checkpoint["watermark"], "scanned": len(batch), "alerted": alerted}
+
+    def _rpc_claim_job(self, p: dict) -> bool:
+        row = next((r for r in self.tables["job_checkpoints"] if r["name"] == p["p_name"]), None)
+        if row is None:
+            row = self.insert("job_checkpoints", {"name": p["p_name"]})
+        now = datetime.now(timezone.utc)
+        if row["lease_owner"] not in (None, p["p_owner"]) and datetime.fromisoformat(row["lease_until"]) > now:
+            return False
+        row["lease_owner"] = p["p_owner"]
+        row["lease_until"] = (now + timedelta(seconds=int(p["p_lease_seconds"]))).isoformat()
+        return True
+
+    def _rpc_rebuild_spending_rollups(self, p: dict) -> int:
+        user = p.get("p_user_uuid")
+        source = self.user_rows("transactions", user) if user else self.tables["transactions"]
+        acc: dict[tuple, list] = {}
+        for r in source:
+            if r["type"] != "saida" or r.get("category_id") is None:
+                continue
+            key = (r["user_uuid"], r["category_id"], r["date"][:7] + "-01")
+            entry = acc.setdefault(key, [0.0, 0])
+            entry[0] += r["amount"]
+            entry[1] += 1
+        stale = {id(r) for r in self.tables["spending_rollups"] if not user or r["user_uuid"] == user}
+        for owner in [user] if user else list(self._by_user["spending_rollups"]):
+            self._by_user["spending_rollups"][owner] = []
+        self.tables["spending_rollups"] = [r for r in self.tables["spending_rollups"] if id(r) not in stale]
+        for (u, c, m), (total, n) in acc.items():
+            self.insert("spending_rollups", {"user_uuid": u, "category_id": c, "month": m, "spent": total, "count": n})
+        return len(acc)
+
+    # ── GoTrue ────────────────────────────────────────────────────────────────
+
+    def _handle_auth(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path == ".well-known/jwks.json":
+            jwk = json.loads(ECAlgorithm.to_jwk(self._signing_key.public_key()))
+            jwk.update(kid=_KID, alg="ES256", use="sig")
+            return httpx.Response(200, json={"keys": [jwk]})
+        if path == "logout":
+            return httpx.Response(204)
+        if path == "signup":
+            # Confirmação por email ligada: devolve só o usuário, sem sessão
+            body = json.loads(request.content or b"{}")
+            now = datetime.now(timezone.utc).isoformat()
+            return httpx.Response(200, json={
+                "id": str(uuid.uuid4()),
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": body.get("email"),
+                "app_metadata": {"provider": "email"},
+                "user_metadata": {},
+                "created_at": now,
+            })
+        if path == "token":
+            body = json.loads(request.content or b"{}")
+            grant = request.url.params.get("grant_type")
+            if grant == "password":
+                user = next((u for u in self.tables["users"] if u["email"] == body.get("email")), None)
+                if user is None or body.get("password") != BENCH_PASSWORD:
+                    return httpx.Response(400, json={"error": "invalid_grant", "error_description": "Invalid login credentials"})
+                return httpx.Response(200, json=self._session(user))
+            if grant == "refresh_token":
+                user_uuid = self._refresh_tokens.pop(body.get("refresh_token", ""), None)
+                user = next((u for u in self.tables["users"] if u["user_uuid"] == user_uuid), None)
+                if user is None:
+                    return httpx.Response(400, json={"error": "invalid_grant", "error_description": "Invalid Refresh Token: Refresh Token Not Found"})
+                return httpx.Response(200, json=self._session(user))
+        return httpx.Response(404, json={"message": f"rota de auth desconhecida: {path}"})
+
+    def _session(self, user: dict) -> dict:
+        refresh_token = uuid.uuid4().hex
+        self._refresh_tokens[refresh_token] = user["user_uuid"]
+        return {
+            "access_token": self.issue_token(user["user_uuid"], user["email"]),
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "expires_at": int(time.time()) + 3600,
+            "refresh_token": refresh_token,
+            "user": {
+                "id": user["user_uuid"],
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": user["email"],
+                "app_metadata": {"provider": "email"},
+                "user_metadata": {},
+                "created_at": user["created_at"],
+                "email_confirmed_at": user["created_at"],
+            },
+        }
@@ -0,0 +1,209 @@
+"""Executa o mix contra o app em processo e agrega latência e consultas."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator
+
+import httpx
+import structlog
+
+from bench.fake_supabase import FakeSupabase, query_counter
+from bench.scenarios import MIXES, Session, Step
+from bench.seed import SeedConfig, seed
+
+FAKE_URL = "http://supabase.bench"
+
+# Settings do app exigem estas variáveis; o bench nunca fala com um Supabase real
+os.environ.setdefault("SUPABASE_URL", FAKE_URL)
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-service-role-key")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-jwt-secret")
+
+
+@dataclass
+class RunConfig:
+    requests: int = 5000
+    concurrency: int = 32
+    warmup: int = 200
+    mix: str = "default"
+    async_client: bool = True  # SUPABASE_ASYNC do app
+    rpc: bool = True  # False força os caminhos de fallback sem as migrations
+    db_latency_ms: float = 0.0
+    seed: SeedConfig = field(default_factory=SeedConfig)
+
+
+@dataclass
+class Sample:
+    label: str
+    status: int
+    latency_ms: float
+    queries: int
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summarize(samples: list[Sample], elapsed: float) -> dict:
+    by_label: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_label[sample.label].append(sample)
+
+    def stats(group: list[Sample]) -> dict:
+        latencies = [s.latency_ms for s in group]
+        return {
+            "count": len(group),
+            "errors": sum(1 for s in group if s.status >= 400),
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "queries_per_request": round(statistics.fmean(s.queries for s in group), 2) if group else 0.0,
+        }
+
+    return {
+        "overall": {**stats(samples), "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0},
+        "routes": {label: stats(group) for label, group in sorted(by_label.items())},
+    }
+
+
+async def _send(client: httpx.AsyncClient, session: Session, step: Step) -> Sample:
+    headers = {"Authorization": f"Bearer {session.access_token}"} if step.auth else {}
+    counter = [0]
+    token = query_counter.set(counter)
+    start = time.perf_counter()
+    try:
+        response = await client.request(step.method, step.url, json=step.json, headers=headers)
+    finally:
+        query_counter.reset(token)
+    latency_ms = (time.perf_counter() - start) * 1000
+    if step.on_response is not None:
+        step.on_response(response)
+    return Sample(step.label, response.status_code, latency_ms, counter[0])
+
+
+@asynccontextmanager
+async def harness(config: RunConfig) -> AsyncIterator[tuple[httpx.AsyncClient, FakeSupabase, list[Session]]]:
+    """App em processo sobre o FakeSupabase já populado, com um cliente HTTP e as sessões do seed."""
+    # Logs por requisição distorcem a medição
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    from app.core.config import settings
+    from app.core.security import jwks_cache
+    from app.core.supabase_client import supabase_registry
+    from app.main import create_app
+    from app.repositories.base import BaseRepository
+
+    settings.SUPABASE_ASYNC = config.async_client
+    # RPCs vistas ausentes num harness anterior do mesmo processo (ex.: --no-rpc)
+    BaseRepository._missing_rpcs.clear()
+    fake = FakeSupabase(settings.SUPABASE_URL, rpc=config.rpc, latency_ms=config.db_latency_ms)
+    users = seed(fake, config.seed)
+    sessions = [Session(user=u, access_token=fake.issue_token(u.user_uuid, u.email)) for u in users]
+
+    supabase_registry.startup(transport=fake.async_transport() if config.async_client else fake.sync_transport())
+    jwks_cache.transport = fake.async_transport()
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client, fake, sessions
+
+
+async def run(config: RunConfig) -> dict:
+    from app.core.security import token_cache
+
+    mix = MIXES[config.mix]
+    scenarios, weights = list(mix), list(mix.values())
+    rng = random.Random(config.seed.seed)
+    samples: list[Sample] = []
+
+    async with harness(config) as (client, fake, sessions):
+
+        async def phase(total: int, record: bool) -> None:
+            remaining = total
+
+            async def worker() -> None:
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    session = rng.choice(sessions)
+                    step = rng.choices(scenarios, weights)[0](session, rng)
+                    sample = await _send(client, session, step)
+                    if record:
+                        samples.append(sample)
+
+            await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+
+        await phase(config.warmup, record=False)
+        fake.requests = 0
+        start = time.perf_counter()
+        await phase(config.requests, record=True)
+        elapsed = time.perf_counter() - start
+
+    report = _summarize(samples, elapsed)
+    report["config"] = {**asdict(config), "fake_requests": fake.requests}
+    report["token_cache"] = token_cache.stats()
+    return report
+
+
+# ── Saída ─────────────────────────────────────────────────────────────────────
+
+def format_report(report: dict) -> str:
+    header = f"{'rota':<30}{'n':>7}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>8}"
+    lines = [header, "-" * len(header)]
+    for label, s in report["routes"].items():
+        lines.append(
+            f"{label:<30}{s['count']:>7}{s['errors']:>6}{s['p50_ms']:>10.2f}"
+            f"{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['queries_per_request']:>8.2f}"
+        )
+    o = report["overall"]
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'total':<30}{o['count']:>7}{o['errors']:>6}{o['p50_ms']:>10.2f}"
+        f"{o['p95_ms']:>10.2f}{o['p99_ms']:>10.2f}{o['queries_per_request']:>8.2f}"
+    )
+    lines.append(f"throughput: {o['throughput_rps']} req/s")
+    return "\n".join(lines)
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Rotas cujo p95 ou q/req pioraram mais que `threshold` (ex.: 0.2 = 20%)."""
+    regressions = []
+    for label, current in report["routes"].items():
+        previous = baseline.get("routes", {}).get(label)
+        if not previous:
+            continue
+        for metric in ("p95_ms", "queries_per_request"):
+            before, after = previous[metric], current[metric]
+            if before > 0 and (after - before) / before > threshold:
+                regressions.append(f"{label}: {metric} {before} -> {after}")
+    before_rps = baseline.get("overall", {}).get("throughput_rps", 0)
+    after_rps = report["overall"]["throughput_rps"]
+    if before_rps and (before_rps - after_rps) / before_rps > threshold:
+        regressions.append(f"throughput_rps {before_rps} -> {after_rps}")
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
@@ -0,0 +1,332 @@
+"""Mix de requisições do bench: uma função por rota de /api/v1, com peso.
+
+Ficam de fora as rotas com efeito externo (cadastro, emails de senha e
+confirmação, chamadas à IA) e o PATCH /onboarding/complete, que só roda uma
+vez por usuário.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable
+
+import httpx
+
+from bench.fake_supabase import BENCH_PASSWORD
+from bench.seed import SeededUser
+
+API = "/api/v1"
+
+
+@dataclass
+class Session:
+    """Usuário do seed mais o estado que o cliente carregaria entre telas."""
+    user: SeededUser
+    access_token: str
+    refresh_token: str | None = None
+    next_cursor: str | None = None
+    created_transactions: list[int] = field(default_factory=list)
+    created_categories: list[int] = field(default_factory=list)
+    created_goals: list[int] = field(default_factory=list)
+    created_limits: list[tuple[int, int]] = field(default_factory=list)  # (id, category_id)
+
+
+@dataclass
+class Step:
+    label: str
+    method: str
+    url: str
+    json: dict | None = None
+    auth: bool = True
+    on_response: Callable[[httpx.Response], None] | None = None
+
+
+Scenario = Callable[[Session, random.Random], Step]
+
+
+def _pick(rng: random.Random, ids: list[int]) -> int:
+    return rng.choice(ids) if ids else 0
+
+
+def _recent_day(rng: random.Random) -> str:
+    return (date.today() - timedelta(days=rng.randrange(20))).isoformat()
+
+
+# ── Transações ────────────────────────────────────────────────────────────────
+
+def transactions_list(s: Session, rng: random.Random) -> Step:
+    def keep_cursor(r: httpx.Response) -> None:
+        s.next_cursor = r.json().get("next_cursor") if r.is_success else None
+
+    return Step("transactions.list", "GET", f"{API}/transactions/?limit=50", on_response=keep_cursor)
+
+
+def transactions_list_next(s: Session, rng: random.Random) -> Step:
+    if not s.next_cursor:
+        return transactions_list(s, rng)
+
+    def keep_cursor(r: httpx.Response) -> None:
+        s.next_cursor = r.json().get("next_cursor") if r.is_success else None
+
+    return Step(
+        "transactions.list_next", "GET", f"{API}/transactions/?limit=50&cursor={s.next_cursor}",
+        on_response=keep_cursor,
+    )
+
+
+def transactions_list_filtered(s: Session, rng: random.Random) -> Step:
+    since = (date.today() - timedelta(days=90)).isoformat()
+    url = f"{API}/transactions/?type=saida&category_id={_pick(rng, s.user.category_ids)}&date_from={since}"
+    return Step("transactions.list_filtered", "GET", url)
+
+
+def transactions_summary(s: Session, rng: random.Random) -> Step:
+    first = date.today().replace(day=1).isoformat()
+    url = f"{API}/transactions/summary" if rng.random() < 0.5 else f"{API}/transactions/summary?date_from={first}"
+    return Step("transactions.summary", "GET", url)
+
+
+def transactions_get(s: Session, rng: random.Random) -> Step:
+    return Step("transactions.get", "GET", f"{API}/transactions/{_pick(rng, s.user.transaction_ids)}")
+
+
+def transactions_create(s: Session, rng: random.Random) -> Step:
+    def remember(r: httpx.Response) -> None:
+        if r.is_success:
+            s.created_transactions.append(r.json()["id"])
+
+    body = {
+        "category_id": _pick(rng, s.user.category_ids),
+        "description": "Compra bench",
+        "amount": round(rng.uniform(5, 300), 2),
+        "date": _recent_day(rng),
+        "type": "saida",
+        "payment_method": "pix",
+    }
+    return Step("transactions.create", "POST", f"{API}/transactions/", json=body, on_response=remember)
+
+
+def transactions_update(s: Session, rng: random.Random) -> Step:
+    if not s.created_transactions:
+        return transactions_create(s, rng)
+    body = {"amount": round(rng.uniform(5, 300), 2), "category_id": _pick(rng, s.user.category_ids)}
+    return Step("transactions.update", "PUT", f"{API}/transactions/{rng.choice(s.created_transactions)}", json=body)
+
+
+def transactions_delete(s: Session, rng: random.Random) -> Step:
+    if not s.created_transactions:
+        return transactions_create(s, rng)
+    tx_id = s.created_transactions.pop()
+    return Step("transactions.delete", "DELETE", f"{API}/transactions/{tx_id}")
+
+
+# ── Categorias ────────────────────────────────────────────────────────────────
+
+def categories_list(s: Session, rng: random.Random) -> Step:
+    return Step("categories.list", "GET", f"{API}/categories/")
+
+
+def categories_create(s: Session, rng: random.Random) -> Step:
+    def remember(r: httpx.Response) -> None:
+        if r.is_success:
+            s.created_categories.append(r.json()["id"])
+
+    body = {"name": f"Bench {rng.getrandbits(40):x}", "icon": "tag", "color": "#999999", "type": "variavel"}
+    return Step("categories.create", "POST", f"{API}/categories/", json=body, on_response=remember)
+
+
+def categories_update(s: Session, rng: random.Random) -> Step:
+    body = {"color": f"#{rng.getrandbits(24):06x}"}
+    return Step("categories.update", "PUT", f"{API}/categories/{_pick(rng, s.user.category_ids)}", json=body)
+
+
+def categories_delete(s: Session, rng: random.Random) -> Step:
+    if not s.created_categories:
+        return categories_create(s, rng)
+    return Step("categories.delete", "DELETE", f"{API}/categories/{s.created_categories.pop()}")
+
+
+# ── Limites ───────────────────────────────────────────────────────────────────
+
+def limits_list(s: Session, rng: random.Random) -> Step:
+    return Step("limits.list", "GET", f"{API}/limits/")
+
+
+def limits_create(s: Session, rng: random.Random) -> Step:
+    if not s.user.free_limit_categories:
+        return limits_update(s, rng)
+    category_id = s.user.free_limit_categories.pop()
+
+    def remember(r: httpx.Response) -> None:
+        if r.is_success:
+            s.created_limits.append((r.json()["id"], category_id))
+        else:
+            s.user.free_limit_categories.append(category_id)
+
+    body = {"category_id": category_id, "amount": float(rng.randrange(200, 3000, 50))}
+    return Step("limits.create", "POST", f"{API}/limits/", json=body, on_response=remember)
+
+
+def limits_update(s: Session, rng: random.Random) -> Step:
+    body = {"amount": float(rng.randrange(200, 3000, 50))}
+    return Step("limits.update", "PUT", f"{API}/limits/{_pick(rng, s.user.limit_ids)}", json=body)
+
+
+def limits_delete(s: Session, rng: random.Random) -> Step:
+    if not s.created_limits:
+        return limits_create(s, rng)
+    limit_id, category_id = s.created_limits.pop()
+
+    def release(r: httpx.Response) -> None:
+        s.user.free_limit_categories.append(category_id)
+
+    return Step("limits.delete", "DELETE", f"{API}/limits/{limit_id}", on_response=release)
+
+
+# ── Metas ─────────────────────────────────────────────────────────────────────
+
+def goals_list(s: Session, rng: random.Random) -> Step:
+    return Step("goals.list", "GET", f"{API}/goals/")
+
+
+def goals_get(s: Session, rng: random.Random) -> Step:
+    return Step("goals.get", "GET", f"{API}/goals/{_pick(rng, s.user.goal_ids)}")
+
+
+def goals_create(s: Session, rng: random.Random) -> Step:
+    def remember(r: httpx.Response) -> None:
+        if r.is_success:
+            s.created_goals.append(r.json()["id"])
+
+    body = {"title": "Meta bench", "target_amount": float(rng.randrange(1000, 20000, 500)), "priority": "media"}
+    return Step("goals.create", "POST", f"{API}/goals/", json=body, on_response=remember)
+
+
+def goals_update(s: Session, rng: random.Random) -> Step:
+    body = {"priority": rng.choice(["alta", "media", "baixa"])}
+    return Step("goals.update", "PUT", f"{API}/goals/{_pick(rng, s.user.goal_ids)}", json=body)
+
+
+def goals_progress(s: Session, rng: random.Random) -> Step:
+    body = {"amount": round(rng.uniform(10, 200), 2)}
+    return Step("goals.progress", "PATCH", f"{API}/goals/{_pick(rng, s.user.goal_ids)}/progress", json=body)
+
+
+def goals_delete(s: Session, rng: random.Random) -> Step:
+    if not s.created_goals:
+        return goals_create(s, rng)
+    return Step("goals.delete", "DELETE", f"{API}/goals/{s.created_goals.pop()}")
+
+
+# ── Perfil e onboarding ───────────────────────────────────────────────────────
+
+def profile_get(s: Session, rng: random.Random) -> Step:
+    return Step("profile.get", "GET", f"{API}/profile/")
+
+
+def profile_update(s: Session, rng: random.Random) -> Step:
+    return Step("profile.update", "PUT", f"{API}/profile/", json={"phone": f"119{rng.randrange(10**7, 10**8)}"})
+
+
+def profile_payments(s: Session, rng: random.Random) -> Step:
+    return Step("profile.payments", "GET", f"{API}/profile/payments?page=1&limit=10")
+
+
+def profile_plan(s: Session, rng: random.Random) -> Step:
+    body = {"plan": rng.choice(["essential", "premium"]), "billing_period": "mensal"}
+    return Step("profile.plan", "PUT", f"{API}/profile/plan", json=body)
+
+
+def onboarding_get(s: Session, rng: random.Random) -> Step:
+    return Step("onboarding.get", "GET", f"{API}/onboarding/")
+
+
+def onboarding_save(s: Session, rng: random.Random) -> Step:
+    body = {"income": 8000.0, "monthly_cost": 4500.0, "current_step": 5}
+    return Step("onboarding.save", "POST", f"{API}/onboarding/", json=body)
+
+
+def onboarding_suggested_limits(s: Session, rng: random.Random) -> Step:
+    url = f"{API}/onboarding/suggested-limits?income=8000&categories=Mercado,Transporte,Lazer"
+    return Step("onboarding.suggested_limits", "GET", url)
+
+
+# ── Auth ──────────────────────────────────────────────────────────────────────
+
+def auth_login(s: Session, rng: random.Random) -> Step:
+    def keep_tokens(r: httpx.Response) -> None:
+        if r.is_success:
+            s.refresh_token = r.json()["refresh_token"]
+
+    body = {"email": s.user.email, "password": BENCH_PASSWORD}
+    return Step("auth.login", "POST", f"{API}/auth/login", json=body, auth=False, on_response=keep_tokens)
+
+
+def auth_refresh(s: Session, rng: random.Random) -> Step:
+    if not s.refresh_token:
+        return auth_login(s, rng)
+    token, s.refresh_token = s.refresh_token, None
+
+    def keep_tokens(r: httpx.Response) -> None:
+        if r.is_success:
+            s.refresh_token = r.json()["refresh_token"]
+
+    return Step(
+        "auth.refresh", "POST", f"{API}/auth/refresh", json={"refresh_token": token},
+        auth=False, on_response=keep_tokens,
+    )
+
+
+def auth_logout(s: Session, rng: random.Random) -> Step:
+    return Step("auth.logout", "POST", f"{API}/auth/logout")
+
+
+# ── Mix ───────────────────────────────────────────────────────────────────────
+
+# Pesos aproximam o uso do app: leituras das telas principais dominam
+DEFAULT_MIX: dict[Scenario, float] = {
+    transactions_list: 18,
+    transactions_list_next: 6,
+    transactions_list_filtered: 3,
+    transactions_summary: 12,
+    transactions_get: 4,
+    transactions_create: 5,
+    transactions_update: 2,
+    transactions_delete: 2,
+    categories_list: 12,
+    categories_create: 0.5,
+    categories_update: 1,
+    categories_delete: 0.5,
+    limits_list: 8,
+    limits_create: 0.5,
+    limits_update: 1,
+    limits_delete: 0.5,
+    goals_list: 5,
+    goals_get: 2,
+    goals_create: 0.5,
+    goals_update: 0.5,
+    goals_progress: 1.5,
+    goals_delete: 0.5,
+    profile_get: 4,
+    profile_update: 0.5,
+    profile_payments: 1.5,
+    profile_plan: 0.2,
+    onboarding_get: 1,
+    onboarding_save: 0.3,
+    onboarding_suggested_limits: 0.5,
+    auth_login: 1,
+    auth_refresh: 1,
+    auth_logout: 0.3,
+}
+
+# Só as telas quentes: útil para comparar antes/depois de mudanças de leitura
+HOT_PATHS_MIX: dict[Scenario, float] = {
+    transactions_list: 4,
+    transactions_list_next: 2,
+    transactions_summary: 3,
+    categories_list: 3,
+    limits_list: 2,
+}
+
+MIXES: dict[str, dict[Scenario, float]] = {"default": DEFAULT_MIX, "hot": HOT_PATHS_MIX}
@@ -0,0 +1,148 @@
+"""Massa sintética para o bench: usuários, categorias, transações, limites e metas."""
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from bench.fake_supabase import FakeSupabase
+
+_CATEGORIES = [
+    ("Mercado", "shopping-cart", "#22c55e", "variavel"),
+    ("Aluguel", "home", "#3b82f6", "fixa"),
+    ("Transporte", "car", "#f59e0b", "variavel"),
+    ("Restaurantes", "utensils", "#ef4444", "variavel"),
+    ("Saúde", "heart", "#ec4899", "fixa"),
+    ("Educação", "book", "#8b5cf6", "fixa"),
+    ("Lazer", "gamepad", "#14b8a6", "variavel"),
+    ("Assinaturas", "tv", "#6366f1", "fixa"),
+    ("Vestuário", "shirt", "#f97316", "variavel"),
+    ("Salário", "wallet", "#10b981", "fixa"),
+    ("Freelance", "briefcase", "#0ea5e9", "variavel"),
+    ("Pets", "paw", "#a855f7", "variavel"),
+    ("Viagens", "plane", "#06b6d4", "variavel"),
+    ("Presentes", "gift", "#e11d48", "variavel"),
+    ("Impostos", "receipt", "#64748b", "fixa"),
+]
+
+
+@dataclass
+class SeedConfig:
+    users: int = 20
+    categories_per_user: int = 12
+    transactions_per_user: int = 2000
+    limits_per_user: int = 6
+    goals_per_user: int = 5
+    payments_per_user: int = 12
+    months: int = 24  # histórico de transações, em meses
+    seed: int = 42
+
+
+@dataclass
+class SeededUser:
+    user_uuid: str
+    email: str
+    category_ids: list[int] = field(default_factory=list)
+    transaction_ids: list[int] = field(default_factory=list)
+    limit_ids: list[int] = field(default_factory=list)
+    free_limit_categories: list[int] = field(default_factory=list)
+    goal_ids: list[int] = field(default_factory=list)
+
+
+def seed(fake: FakeSupabase, config: SeedConfig) -> list[SeededUser]:
+    rng = random.Random(config.seed)
+    now = datetime.now(timezone.utc)
+    today = date.today()
+    history_days = max(config.months * 30, 1)
+
+    fake.insert("plans", {"id": 1, "name": "Essential"})
+    fake.insert("plans", {"id": 2, "name": "Premium"})
+
+    users: list[SeededUser] = []
+    for i in range(config.users):
+        user_uuid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        user = SeededUser(user_uuid=user_uuid, email=f"bench-user-{i}@example.com")
+        users.append(user)
+
+        fake.insert("users", {
+            "user_uuid": user_uuid,
+            "name": f"Usuário Bench {i}",
+            "email": user.email,
+            "phone": f"55119{rng.randrange(10**7, 10**8)}",  # como RegisterRequest normaliza
+            "tax_id": None,
+            "plan_id": 1,
+            "plan_status": "active",
+            "trial_starts_at": (now - timedelta(days=400)).isoformat(),
+            "trial_ends_at": (now - timedelta(days=386)).isoformat(),
+        })
+        fake.insert("onboarding", {
+            "user_uuid": user_uuid,
+            "current_step": 5,
+            "completed": True,
+            "monthly_income": 8000.0,
+            "monthly_cost": 4500.0,
+            "selected_categories": ["Mercado", "Transporte", "Lazer"],
+        })
+
+        for name, icon, color, type_ in _CATEGORIES[: config.categories_per_user]:
+            row = fake.insert("categories", {
+                "user_uuid": user_uuid, "name": name, "icon": icon, "color": color, "type": type_,
+            })
+            user.category_ids.append(row["id"])
+
+        for _ in range(config.transactions_per_user):
+            entrada = rng.random() < 0.15
+            row = fake.insert("transactions", {
+                "user_uuid": user_uuid,
+                "category_id": rng.choice(user.category_ids),
+                "description": "Receita" if entrada else "Despesa",
+                "amount": round(rng.uniform(3000, 9000) if entrada else rng.lognormvariate(4, 1), 2),
+                "date": (today - timedelta(days=rng.randrange(history_days))).isoformat(),
+                "type": "entrada" if entrada else "saida",
+                "notes": None,
+                "payment_method": rng.choice(["pix", "debito", "credito", "dinheiro"]),
+            })
+            user.transaction_ids.append(row["id"])
+
+        limited = rng.sample(user.category_ids, min(config.limits_per_user, len(user.category_ids)))
+        for category_id in limited:
+            row = fake.insert("spending_limits", {
+                "user_uuid": user_uuid, "category_id": category_id,
+                "amount": float(rng.randrange(200, 3000, 50)), "period": "mensal",
+            })
+            user.limit_ids.append(row["id"])
+        user.free_limit_categories = [c for c in user.category_ids if c not in limited]
+
+        for g in range(config.goals_per_user):
+            target = float(rng.randrange(1000, 50000, 500))
+            row = fake.insert("goals", {
+                "user_uuid": user_uuid,
+                "title": f"Meta {g + 1}",
+                "description": None,
+                "target_amount": target,
+                "current_amount": round(target * rng.random() * 0.8, 2),
+                "priority": rng.choice(["alta", "media", "baixa"]),
+                "target_date": (today + timedelta(days=rng.randrange(60, 900))).isoformat(),
+                "monthly_contribution": None,
+                "is_completed": False,
+                "completed_at": None,
+            })
+            user.goal_ids.append(row["id"])
+
+        for p in range(config.payments_per_user):
+            starts = now - timedelta(days=30 * (p + 1))
+            fake.insert("user_plan_subscriptions", {
+                "user_uuid": user_uuid,
+                "plan_id": 1,
+                "recurrence": "mensal",
+                "amount_paid": 29.90,
+                "payment_method": "PIX",
+                "abacatepay_charge_id": f"char_{uuid.UUID(int=rng.getrandbits(128)).hex[:12]}",
+                "starts_at": starts.isoformat(),
+                "ends_at": (starts + timedelta(days=30)).isoformat(),
+                "status": "active" if p == 0 else "expired",
+            })
+
+    fake.rebuild_rollups()
+    return users
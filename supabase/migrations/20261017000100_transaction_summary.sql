@@ -0,0 +1,30 @@
+-- Totais de transações agregados no Postgres (GET /transactions/summary).
+-- Devolve um único objeto JSON em vez de todas as linhas type/amount.
+
+create index if not exists transactions_user_uuid_date_idx
+    on public.transactions (user_uuid, date);
+
+create or replace function public.transaction_summary(
+    p_user_uuid uuid,
+    p_date_from date default null,
+    p_date_to   date default null
+)
+returns json
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select json_build_object(
+        'total_entrada', coalesce(sum(amount) filter (where type = 'entrada'), 0),
+        'total_saida',   coalesce(sum(amount) filter (where type = 'saida'), 0),
+        'count',         count(*)
+    )
+    from public.transactions
+    where user_uuid = p_user_uuid
+      and (p_date_from is null or date >= p_date_from)
+      and (p_date_to   is null or date <= p_date_to);
+$$;
+
+revoke all on function public.transaction_summary(uuid, date, date) from public, anon, authenticated;
+grant execute on function public.transaction_summary(uuid, date, date) to service_role;
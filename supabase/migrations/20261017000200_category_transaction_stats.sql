@@ -0,0 +1,27 @@
+-- Contagem e total de transações por categoria (GET /categories/).
+-- Agrupa no Postgres em vez de devolver todas as linhas category_id/amount.
+
+create index if not exists transactions_user_uuid_category_id_idx
+    on public.transactions (user_uuid, category_id)
+    include (amount);
+
+create or replace function public.category_transaction_stats(
+    p_user_uuid   uuid,
+    p_category_id bigint default null
+)
+returns table (category_id bigint, count bigint, total numeric)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select t.category_id, count(*), coalesce(sum(t.amount), 0)
+    from public.transactions t
+    where t.user_uuid = p_user_uuid
+      and t.category_id is not null
+      and (p_category_id is null or t.category_id = p_category_id)
+    group by t.category_id;
+$$;
+
+revoke all on function public.category_transaction_stats(uuid, bigint) from public, anon, authenticated;
+grant execute on function public.category_transaction_stats(uuid, bigint) to service_role;
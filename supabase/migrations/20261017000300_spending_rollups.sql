@@ -0,0 +1,92 @@
+-- Gasto mensal por (usuário, categoria, mês), mantido incrementalmente pela API.
+-- Telas de limites leem daqui em vez de varrer as saídas do mês.
+
+create table if not exists public.spending_rollups (
+    user_uuid   uuid    not null,
+    category_id bigint  not null,
+    month       date    not null,  -- primeiro dia do mês
+    spent       numeric not null default 0,
+    count       integer not null default 0,
+    updated_at  timestamptz not null default now(),
+    primary key (user_uuid, month, category_id)
+);
+
+alter table public.spending_rollups enable row level security;
+
+-- Aplica deltas [{category_id, month, spent, count}] numa única ida ao banco.
+create or replace function public.apply_spending_deltas(
+    p_user_uuid uuid,
+    p_deltas    jsonb
+)
+returns void
+language sql
+volatile
+security invoker
+set search_path = public
+as $$
+    insert into public.spending_rollups as r (user_uuid, category_id, month, spent, count)
+    select p_user_uuid,
+           (d ->> 'category_id')::bigint,
+           date_trunc('month', (d ->> 'month')::date)::date,
+           (d ->> 'spent')::numeric,
+           (d ->> 'count')::integer
+    from jsonb_array_elements(p_deltas) as d
+    on conflict (user_uuid, month, category_id) do update
+        set spent      = r.spent + excluded.spent,
+            count      = r.count + excluded.count,
+            updated_at = now();
+$$;
+
+create or replace function public.month_spending(
+    p_user_uuid uuid,
+    p_month     date
+)
+returns table (category_id bigint, spent numeric)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select r.category_id, r.spent
+    from public.spending_rollups r
+    where r.user_uuid = p_user_uuid
+      and r.month = date_trunc('month', p_month)::date;
+$$;
+
+-- Recalcula a partir de transactions (backfill/reparo); null = todos os usuários.
+create or replace function public.rebuild_spending_rollups(
+    p_user_uuid uuid default null
+)
+returns integer
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_rows integer;
+begin
+    delete from public.spending_rollups
+    where p_user_uuid is null or user_uuid = p_user_uuid;
+
+    insert into public.spending_rollups (user_uuid, category_id, month, spent, count)
+    select t.user_uuid, t.category_id, date_trunc('month', t.date)::date, sum(t.amount), count(*)
+    from public.transactions t
+    where t.type = 'saida'
+      and t.category_id is not null
+      and (p_user_uuid is null or t.user_uuid = p_user_uuid)
+    group by 1, 2, 3;
+
+    get diagnostics v_rows = row_count;
+    return v_rows;
+end;
+$$;
+
+revoke all on function public.apply_spending_deltas(uuid, jsonb) from public, anon, authenticated;
+revoke all on function public.month_spending(uuid, date) from public, anon, authenticated;
+revoke all on function public.rebuild_spending_rollups(uuid) from public, anon, authenticated;
+grant execute on function public.apply_spending_deltas(uuid, jsonb) to service_role;
+grant execute on function public.month_spending(uuid, date) to service_role;
+grant execute on function public.rebuild_spending_rollups(uuid) to service_role;
+
+select public.rebuild_spending_rollups();
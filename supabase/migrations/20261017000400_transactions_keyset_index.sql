@@ -0,0 +1,4 @@
+-- Paginação por cursor em GET /transactions/: seek em (date desc, id desc).
+
+create index if not exists transactions_user_uuid_date_id_idx
+    on public.transactions (user_uuid, date desc, id desc);
@@ -0,0 +1,47 @@
+-- Update de transação que devolve a versão anterior e a nova numa ida ao banco.
+-- A API usa o par para ajustar spending_rollups sem ler a transação antes.
+-- Só as colunas editáveis pela API são aplicadas a partir de p_fields.
+create or replace function public.update_user_transaction(
+    p_user_uuid uuid,
+    p_id        bigint,
+    p_fields    jsonb
+)
+returns json
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_old public.transactions;
+    v_new public.transactions;
+begin
+    select * into v_old
+    from public.transactions
+    where id = p_id
+      and user_uuid = p_user_uuid
+    for update;
+
+    if not found then
+        return json_build_object('old', null, 'new', null);
+    end if;
+
+    v_new := jsonb_populate_record(v_old, p_fields);
+
+    update public.transactions t
+    set category_id    = v_new.category_id,
+        description    = v_new.description,
+        amount         = v_new.amount,
+        date           = v_new.date,
+        type           = v_new.type,
+        notes          = v_new.notes,
+        payment_method = v_new.payment_method
+    where t.id = p_id
+    returning t.* into v_new;
+
+    return json_build_object('old', row_to_json(v_old), 'new', row_to_json(v_new));
+end;
+$$;
+
+revoke all on function public.update_user_transaction(uuid, bigint, jsonb) from public, anon, authenticated;
+grant execute on function public.update_user_transaction(uuid, bigint, jsonb) to service_role;
@@ -0,0 +1,29 @@
+-- Incremento atômico do progresso de uma meta: soma, conclui ao atingir o alvo
+-- e devolve a linha, num único update. Nenhuma linha = meta inexistente ou de
+-- outro usuário.
+create or replace function public.add_goal_progress(
+    p_user_uuid uuid,
+    p_goal_id   bigint,
+    p_amount    numeric
+)
+returns setof public.goals
+language sql
+volatile
+security invoker
+set search_path = public
+as $$
+    update public.goals g
+    set current_amount = round(g.current_amount + p_amount, 2),
+        is_completed   = g.is_completed or g.current_amount + p_amount >= g.target_amount,
+        completed_at   = case
+                             when not g.is_completed and g.current_amount + p_amount >= g.target_amount
+                             then now()
+                             else g.completed_at
+                         end
+    where g.id = p_goal_id
+      and g.user_uuid = p_user_uuid
+    returning g.*;
+$$;
+
+revoke all on function public.add_goal_progress(uuid, bigint, numeric) from public, anon, authenticated;
+grant execute on function public.add_goal_progress(uuid, bigint, numeric) to service_role;
@@ -0,0 +1,31 @@
+-- Versão em lote de update_user_transaction, para POST /transactions/batch.
+-- p_items: [{"id": 1, "fields": {...}}, ...]; os itens são aplicados na ordem
+-- do array, numa única transação. Devolve um {old, new} por item, na mesma
+-- ordem, com nulls para ids inexistentes ou de outro usuário.
+create or replace function public.update_user_transactions(
+    p_user_uuid uuid,
+    p_items     jsonb
+)
+returns json
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_item   jsonb;
+    v_result jsonb := '[]'::jsonb;
+begin
+    for v_item in
+        select e from jsonb_array_elements(p_items) with ordinality as t(e, ord) order by ord
+    loop
+        v_result := v_result || jsonb_build_array(
+            public.update_user_transaction(p_user_uuid, (v_item->>'id')::bigint, v_item->'fields')::jsonb
+        );
+    end loop;
+    return v_result::json;
+end;
+$$;
+
+revoke all on function public.update_user_transactions(uuid, jsonb) from public, anon, authenticated;
+grant execute on function public.update_user_transactions(uuid, jsonb) to service_role;
@@ -0,0 +1,52 @@
+-- Fila de chamadas externas feitas fora do caminho da requisição (ex.: criar
+-- o cliente na AbacatePay após o cadastro). A API grava o evento e o worker
+-- de app/core/outbox.py o processa com retry e backoff exponencial.
+create table if not exists public.outbox (
+    id              bigint generated always as identity primary key,
+    kind            text        not null,
+    payload         jsonb       not null,
+    idempotency_key text        not null unique,  -- também enviada ao serviço externo
+    status          text        not null default 'pending',  -- pending | done | dead
+    attempts        integer     not null default 0,
+    next_attempt_at timestamptz not null default now(),
+    last_error      text,
+    created_at      timestamptz not null default now(),
+    processed_at    timestamptz
+);
+
+create index if not exists outbox_pending_idx
+    on public.outbox (next_attempt_at)
+    where status = 'pending';
+
+alter table public.outbox enable row level security;
+
+-- Reserva até p_limit eventos vencidos. A reserva empurra next_attempt_at por
+-- p_lease_seconds: se o worker morrer no meio, o evento volta sozinho à fila.
+-- skip locked deixa vários workers consumirem a fila sem disputa.
+create or replace function public.claim_outbox_events(
+    p_limit         integer,
+    p_lease_seconds integer
+)
+returns setof public.outbox
+language sql
+volatile
+security invoker
+set search_path = public
+as $$
+    update public.outbox o
+    set attempts        = o.attempts + 1,
+        next_attempt_at = now() + make_interval(secs => p_lease_seconds)
+    where o.id in (
+        select id
+        from public.outbox
+        where status = 'pending'
+          and next_attempt_at <= now()
+        order by next_attempt_at
+        limit p_limit
+        for update skip locked
+    )
+    returning o.*;
+$$;
+
+revoke all on function public.claim_outbox_events(integer, integer) from public, anon, authenticated;
+grant execute on function public.claim_outbox_events(integer, integer) to service_role;
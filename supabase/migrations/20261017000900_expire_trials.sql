@@ -0,0 +1,106 @@
+-- Expiração de trials em lote, fora do login. O job de app/tasks/expire_trials.py
+-- chama expire_trials até `done`; cada chamada é uma transação que expira um
+-- pedaço e grava o watermark, então o job pode parar e retomar de onde estava.
+
+-- Progresso de jobs agendados: um registro por job
+create table if not exists public.job_checkpoints (
+    name       text        primary key,
+    watermark  jsonb       not null default '{}'::jsonb,
+    updated_at timestamptz not null default now()
+);
+
+alter table public.job_checkpoints enable row level security;
+
+-- Só os trials ainda ativos entram no índice: a varredura não cresce com a base
+create index if not exists users_trial_ends_at_idx
+    on public.users (trial_ends_at, user_uuid)
+    where plan_status = 'trial';
+
+-- Expira até p_limit trials vencidos, em ordem de (trial_ends_at, user_uuid).
+-- Watermark: {"cutoff", "after_trial_ends_at", "after_user_uuid", "done"}.
+-- Uma rodada nova (sem watermark ou com done) fixa cutoff = now(); as chamadas
+-- seguintes continuam do último usuário visto até esgotar os vencidos antes do
+-- cutoff. O lock no checkpoint serializa workers que rodem o job ao mesmo tempo.
+create or replace function public.expire_trials(
+    p_job   text,
+    p_limit integer
+)
+returns jsonb
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_watermark  jsonb;
+    v_cutoff     timestamptz;
+    v_after_ends timestamptz;
+    v_after_uuid uuid;
+    v_scanned    integer;
+    v_expired    integer;
+    v_last_ends  timestamptz;
+    v_last_uuid  uuid;
+begin
+    insert into public.job_checkpoints (name) values (p_job)
+    on conflict (name) do nothing;
+
+    select watermark into v_watermark
+    from public.job_checkpoints
+    where name = p_job
+    for update;
+
+    if v_watermark ? 'cutoff' and not coalesce((v_watermark ->> 'done')::boolean, false) then
+        v_cutoff     := (v_watermark ->> 'cutoff')::timestamptz;
+        v_after_ends := (v_watermark ->> 'after_trial_ends_at')::timestamptz;
+        v_after_uuid := (v_watermark ->> 'after_user_uuid')::uuid;
+    else
+        v_cutoff := now();
+    end if;
+
+    with batch as (
+        select user_uuid, trial_ends_at
+        from public.users
+        where plan_status = 'trial'
+          and trial_ends_at <= v_cutoff
+          and (v_after_ends is null or (trial_ends_at, user_uuid) > (v_after_ends, v_after_uuid))
+        order by trial_ends_at, user_uuid
+        limit p_limit
+        for update
+    ),
+    updated as (
+        update public.users u
+        set plan_status = 'expired'
+        from batch b
+        where u.user_uuid = b.user_uuid
+        returning u.user_uuid
+    ),
+    last as (
+        select trial_ends_at, user_uuid
+        from batch
+        order by trial_ends_at desc, user_uuid desc
+        limit 1
+    )
+    select
+        (select count(*) from batch)::integer,
+        (select count(*) from updated)::integer,
+        (select trial_ends_at from last),
+        (select user_uuid from last)
+    into v_scanned, v_expired, v_last_ends, v_last_uuid;
+
+    v_watermark := jsonb_build_object(
+        'cutoff', v_cutoff,
+        'after_trial_ends_at', coalesce(v_last_ends, v_after_ends),
+        'after_user_uuid', coalesce(v_last_uuid, v_after_uuid),
+        'done', v_scanned < p_limit
+    );
+
+    update public.job_checkpoints
+    set watermark = v_watermark, updated_at = now()
+    where name = p_job;
+
+    return v_watermark || jsonb_build_object('scanned', v_scanned, 'expired', v_expired);
+end;
+$$;
+
+revoke all on function public.expire_trials(text, integer) from public, anon, authenticated;
+grant execute on function public.expire_trials(text, integer) to service_role;
@@ -0,0 +1,86 @@
+-- Resumo mensal pré-calculado por usuário (GET /summaries/monthly). O job de
+-- app/tasks/monthly_summary.py preenche o mês anterior na virada do mês; a
+-- API só lê daqui, sem somar transações sob demanda.
+
+create table if not exists public.monthly_summaries (
+    user_uuid         uuid        not null,
+    month             date        not null,  -- primeiro dia do mês
+    income            numeric     not null default 0,
+    expenses          numeric     not null default 0,
+    balance           numeric     not null default 0,
+    transaction_count integer     not null default 0,
+    categories        jsonb       not null default '[]'::jsonb,  -- total por (tipo, categoria)
+    limits            jsonb       not null default '[]'::jsonb,  -- aderência aos limites
+    goals             jsonb       not null default '[]'::jsonb,  -- saldo das metas e variação no mês
+    computed_at       timestamptz not null default now(),
+    primary key (user_uuid, month)
+);
+
+alter table public.monthly_summaries enable row level security;
+
+-- Entradas do resumo de um pedaço de usuários, numa única ida ao banco: as
+-- transações do mês já agrupadas por (tipo, categoria), categorias, limites,
+-- metas e as metas gravadas no resumo do mês anterior (base da variação).
+create or replace function public.monthly_summary_inputs(
+    p_user_uuids uuid[],
+    p_month      date
+)
+returns table (
+    user_uuid      uuid,
+    transactions   jsonb,
+    categories     jsonb,
+    limits         jsonb,
+    goals          jsonb,
+    previous_goals jsonb
+)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select
+        u.id,
+        coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'type', t.type, 'category_id', t.category_id, 'total', t.total, 'count', t.count
+            ))
+            from (
+                select type, category_id, sum(amount) as total, count(*) as count
+                from public.transactions
+                where transactions.user_uuid = u.id
+                  and date >= date_trunc('month', p_month)::date
+                  and date < (date_trunc('month', p_month) + interval '1 month')::date
+                group by type, category_id
+            ) t
+        ), '[]'::jsonb),
+        coalesce((
+            select jsonb_agg(jsonb_build_object('id', c.id, 'name', c.name, 'icon', c.icon, 'color', c.color))
+            from public.categories c
+            where c.user_uuid = u.id
+        ), '[]'::jsonb),
+        coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'id', l.id, 'category_id', l.category_id, 'amount', l.amount, 'period', l.period
+            ) order by l.id)
+            from public.spending_limits l
+            where l.user_uuid = u.id
+        ), '[]'::jsonb),
+        coalesce((
+            select jsonb_agg(jsonb_build_object(
+                'id', g.id, 'title', g.title, 'target_amount', g.target_amount,
+                'current_amount', g.current_amount, 'is_completed', g.is_completed
+            ) order by g.id)
+            from public.goals g
+            where g.user_uuid = u.id
+        ), '[]'::jsonb),
+        (
+            select s.goals
+            from public.monthly_summaries s
+            where s.user_uuid = u.id
+              and s.month = (date_trunc('month', p_month) - interval '1 month')::date
+        )
+    from unnest(p_user_uuids) as u(id);
+$$;
+
+revoke all on function public.monthly_summary_inputs(uuid[], date) from public, anon, authenticated;
+grant execute on function public.monthly_summary_inputs(uuid[], date) to service_role;
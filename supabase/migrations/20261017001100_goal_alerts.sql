@@ -0,0 +1,139 @@
+-- Alertas de metas (app/tasks/goal_alerts.py): metas atrasadas frente ao
+-- caminho linear até target_date e metas perto de concluir. O job percorre as
+-- metas abertas em pedaços, com uma única instrução por pedaço.
+
+-- Watermark por meta: quando ela gerou o último alerta
+alter table public.goals add column if not exists last_alerted_at timestamptz;
+
+create index if not exists goals_open_id_idx
+    on public.goals (id)
+    where is_completed = false;
+
+-- Um alerta por meta por mês; quem entrega a notificação lê daqui
+create table if not exists public.goal_alerts (
+    id              bigint generated always as identity primary key,
+    user_uuid       uuid        not null,
+    goal_id         bigint      not null references public.goals (id) on delete cascade,
+    kind            text        not null,  -- off_track | near_completion
+    month           date        not null,  -- primeiro dia do mês do alerta
+    current_amount  numeric     not null,
+    target_amount   numeric     not null,
+    expected_amount numeric,               -- off_track: onde a meta deveria estar hoje
+    created_at      timestamptz not null default now(),
+    unique (goal_id, month)
+);
+
+create index if not exists goal_alerts_user_uuid_idx
+    on public.goal_alerts (user_uuid, created_at desc);
+
+alter table public.goal_alerts enable row level security;
+
+-- Analisa até p_limit metas abertas depois do watermark do job e grava os
+-- alertas novos. Caminho esperado para hoje:
+--   com monthly_contribution: target - contribuição * meses até target_date
+--   sem: fração linear de target entre created_at e target_date
+--   prazo vencido: target
+-- off_track quando current_amount fica abaixo dele; near_completion quando
+-- current_amount >= target * p_near_ratio (tem precedência). Metas que já
+-- alertaram no mês ficam de fora, então rodar de novo não repete alertas.
+-- Checkpoint como em expire_trials: rodada nova depois de `done`, lock no
+-- registro do job.
+create or replace function public.scan_goal_alerts(
+    p_job        text,
+    p_limit      integer,
+    p_near_ratio numeric
+)
+returns jsonb
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_watermark jsonb;
+    v_after     bigint := 0;
+    v_today     date := current_date;
+    v_month     date := date_trunc('month', current_date)::date;
+    v_scanned   integer;
+    v_alerted   integer;
+    v_last      bigint;
+begin
+    insert into public.job_checkpoints (name) values (p_job)
+    on conflict (name) do nothing;
+
+    select watermark into v_watermark
+    from public.job_checkpoints
+    where name = p_job
+    for update;
+
+    if v_watermark ? 'after_goal_id' and not coalesce((v_watermark ->> 'done')::boolean, false) then
+        v_after := (v_watermark ->> 'after_goal_id')::bigint;
+    end if;
+
+    with batch as (
+        select id, user_uuid, target_amount, current_amount, target_date,
+               monthly_contribution, created_at::date as created_on, last_alerted_at
+        from public.goals
+        where is_completed = false
+          and id > v_after
+        order by id
+        limit p_limit
+    ),
+    expected as (
+        select b.*,
+               case
+                   when b.target_date is null then null
+                   when b.target_date <= v_today then b.target_amount
+                   when b.monthly_contribution is not null then
+                       greatest(b.target_amount - b.monthly_contribution * ((b.target_date - v_today) / 30.4375), 0)
+                   when b.target_date > b.created_on then
+                       b.target_amount * (v_today - b.created_on)::numeric / (b.target_date - b.created_on)
+               end as expected_amount
+        from batch b
+        where b.last_alerted_at is null or b.last_alerted_at < v_month
+    ),
+    classified as (
+        select e.*,
+               case
+                   when e.current_amount >= e.target_amount * p_near_ratio then 'near_completion'
+                   when e.current_amount < e.expected_amount then 'off_track'
+               end as kind
+        from expected e
+    ),
+    inserted as (
+        insert into public.goal_alerts (user_uuid, goal_id, kind, month, current_amount, target_amount, expected_amount)
+        select user_uuid, id, kind, v_month, current_amount, target_amount,
+               case when kind = 'off_track' then round(expected_amount, 2) end
+        from classified
+        where kind is not null
+        on conflict (goal_id, month) do nothing
+        returning goal_id
+    ),
+    marked as (
+        update public.goals g
+        set last_alerted_at = now()
+        from inserted i
+        where g.id = i.goal_id
+        returning g.id
+    )
+    select
+        (select count(*) from batch)::integer,
+        (select count(*) from marked)::integer,
+        (select max(id) from batch)
+    into v_scanned, v_alerted, v_last;
+
+    v_watermark := jsonb_build_object(
+        'after_goal_id', coalesce(v_last, v_after),
+        'done', v_scanned < p_limit
+    );
+
+    update public.job_checkpoints
+    set watermark = v_watermark, updated_at = now()
+    where name = p_job;
+
+    return v_watermark || jsonb_build_object('scanned', v_scanned, 'alerted', v_alerted);
+end;
+$$;
+
+revoke all on function public.scan_goal_alerts(text, integer, numeric) from public, anon, authenticated;
+grant execute on function public.scan_goal_alerts(text, integer, numeric) to service_role;
@@ -0,0 +1,47 @@
+-- Lease de execução em job_checkpoints: com o agendador em cada worker do
+-- uvicorn, só quem reserva o job roda (ex.: monthly_summary na virada do mês).
+-- Os demais encontram o lease válido e pulam a rodada.
+
+alter table public.job_checkpoints add column if not exists lease_owner text;
+alter table public.job_checkpoints add column if not exists lease_until timestamptz;
+
+-- Reserva p_name para p_owner por p_lease_seconds. Falha (false) enquanto
+-- outro dono tiver lease válido; o mesmo dono renova. O lock no registro
+-- serializa reservas simultâneas, como em expire_trials.
+create or replace function public.claim_job(
+    p_name          text,
+    p_owner         text,
+    p_lease_seconds integer
+)
+returns boolean
+language plpgsql
+volatile
+security invoker
+set search_path = public
+as $$
+declare
+    v_owner text;
+    v_until timestamptz;
+begin
+    insert into public.job_checkpoints (name) values (p_name)
+    on conflict (name) do nothing;
+
+    select lease_owner, lease_until into v_owner, v_until
+    from public.job_checkpoints
+    where name = p_name
+    for update;
+
+    if v_owner is not null and v_owner <> p_owner and v_until > now() then
+        return false;
+    end if;
+
+    update public.job_checkpoints
+    set lease_owner = p_owner,
+        lease_until = now() + make_interval(secs => p_lease_seconds)
+    where name = p_name;
+    return true;
+end;
+$$;
+
+revoke all on function public.claim_job(text, text, integer) from public, anon, authenticated;
+grant execute on function public.claim_job(text, text, integer) to service_role;
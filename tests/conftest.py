@@ -0,0 +1,24 @@
+"""Fixtures: o app em processo sobre o FakeSupabase do bench (ver bench/runner.py)."""
+from __future__ import annotations
+
+import pytest
+
+from bench.runner import RunConfig, harness
+from bench.seed import SeedConfig
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def run_config() -> RunConfig:
+    return RunConfig(seed=SeedConfig(users=2, transactions_per_user=20, months=2))
+
+
+@pytest.fixture
+async def app_harness(run_config: RunConfig):
+    """(cliente HTTP, FakeSupabase, sessões do seed) com o lifespan do app rodando."""
+    async with harness(run_config) as handles:
+        yield handles
@@ -0,0 +1,113 @@
+"""Geração de sugestões: prazo total, início sob demanda e uma chamada entre workers."""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import fakeredis
+import pytest
+
+from app.core.cache import MemoryCache, RedisCache
+from app.core.config import settings
+from app.services import ai_service
+
+pytestmark = pytest.mark.anyio
+
+
+class _SlowStream:
+    """Stream que entrega trechos sem nunca estourar o timeout de leitura."""
+
+    def __init__(self, chunks: int, interval: float) -> None:
+        self.chunks = chunks
+        self.interval = interval
+
+    @property
+    async def text_stream(self):
+        for i in range(self.chunks):
+            await asyncio.sleep(self.interval)
+            yield f"trecho {i} "
+
+
+class _FakeClient:
+    def __init__(self, stream: _SlowStream) -> None:
+        self.messages = self
+        self._stream = stream
+        self.calls = 0
+
+    @asynccontextmanager
+    async def stream(self, **kwargs):
+        self.calls += 1
+        yield self._stream
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    def install(chunks: int, interval: float) -> _FakeClient:
+        client = _FakeClient(_SlowStream(chunks, interval))
+        monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+        return client
+
+    monkeypatch.setattr(ai_service, "cache", MemoryCache(100))
+    monkeypatch.setattr(settings, "AI_TIMEOUT_SECONDS", 0.2)
+    return install
+
+
+async def _final_event(user_uuid: str, prompt: str) -> str:
+    _, suggestion_id = await ai_service.start_suggestion(user_uuid, "test", prompt, "texto padrão")
+    assert suggestion_id is not None
+    events = [e async for e in await ai_service.stream_suggestion(user_uuid, suggestion_id)]
+    return events[-1].decode()
+
+
+async def test_slow_stream_falls_back_after_total_timeout(fake_model):
+    # 20 trechos a cada 50 ms: nenhuma leitura demora, mas o total passa de 0,2 s
+    fake_model(chunks=20, interval=0.05)
+
+    started = asyncio.get_running_loop().time()
+    done = await _final_event("u1", "prompt lento")
+
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert '"fallback":true' in done
+    assert "texto padrão" in done
+
+
+async def test_stream_within_timeout_returns_model_text(fake_model):
+    fake_model(chunks=3, interval=0.01)
+
+    done = await _final_event("u1", "prompt rápido")
+
+    assert '"fallback":false' in done
+    assert "trecho 2" in done
+
+
+async def test_model_is_called_only_when_the_stream_opens(fake_model):
+    client = fake_model(chunks=3, interval=0.01)
+
+    _, suggestion_id = await ai_service.start_suggestion("u1", "test", "prompt sob demanda", "texto padrão")
+    await asyncio.sleep(0.05)
+    assert client.calls == 0
+
+    events = [e async for e in await ai_service.stream_suggestion("u1", suggestion_id)]
+    assert client.calls == 1
+    assert "trecho 2" in events[-1].decode()
+
+
+async def test_second_worker_waits_for_the_first_generation(fake_model, monkeypatch):
+    client = fake_model(chunks=5, interval=0.02)
+    monkeypatch.setattr(ai_service, "cache", RedisCache(client=fakeredis.FakeAsyncRedis()))
+    monkeypatch.setattr(ai_service, "_POLL_INTERVAL", 0.01)
+
+    _, suggestion_id = await ai_service.start_suggestion("u1", "test", "prompt compartilhado", "texto padrão")
+    first = await ai_service.stream_suggestion("u1", suggestion_id)
+    first_events = [await anext(first)]
+    # Outro processo: não enxerga a geração em andamento deste
+    ai_service._inflight.clear()
+    second = await ai_service.stream_suggestion("u1", suggestion_id)
+
+    first_events += [e async for e in first]
+    second_events = [e async for e in second]
+
+    assert client.calls == 1
+    assert '"fallback":false' in second_events[-1].decode()
+    assert "trecho 4" in second_events[-1].decode()
+    assert first_events[-1] == second_events[-1]
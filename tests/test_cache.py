@@ -0,0 +1,109 @@
+"""Backend redis do cache (sobre fakeredis) e invalidação pelo CategoryRepository."""
+from __future__ import annotations
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core.cache import RedisCache
+from app.core.supabase_client import supabase_registry
+from app.repositories import category_repository
+from app.repositories.category_repository import CategoryRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+def redis_cache(redis_client, monkeypatch) -> RedisCache:
+    backend = RedisCache(client=redis_client)
+    monkeypatch.setattr(category_repository, "cache", backend)
+    return backend
+
+
+class _BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis fora do ar")
+
+    async def set(self, key, value, px):
+        raise ConnectionError("redis fora do ar")
+
+    async def delete(self, key):
+        raise ConnectionError("redis fora do ar")
+
+
+# ── RedisCache ────────────────────────────────────────────────────────────────
+
+async def test_set_get_delete(redis_cache, redis_client):
+    value = [{"id": 1, "name": "Mercado"}]
+    assert await redis_cache.get("k") is None
+
+    await redis_cache.set("k", value, ttl=60)
+    assert await redis_cache.get("k") == value
+    assert await redis_client.exists("clarix:k")
+
+    await redis_cache.delete("k")
+    assert await redis_cache.get("k") is None
+
+
+async def test_entry_expires_after_ttl(redis_cache):
+    await redis_cache.set("k", {"a": 1}, ttl=0.05)
+    await asyncio.sleep(0.1)
+    assert await redis_cache.get("k") is None
+
+
+async def test_redis_failure_is_a_miss():
+    backend = RedisCache(client=_BrokenRedis())
+    await backend.set("k", 1, ttl=60)
+    assert await backend.get("k") is None
+    await backend.delete("k")
+
+
+# ── Invalidação pelo CategoryRepository ───────────────────────────────────────
+
+async def _create(repo, user_uuid, categories):
+    row = await repo.create(user_uuid, "Nova", "tag", "#000000", "variavel")
+    return lambda after: row["id"] in after
+
+
+async def _update(repo, user_uuid, categories):
+    category_id = next(iter(categories))
+    await repo.update(user_uuid, category_id, {"name": "Renomeada"})
+    return lambda after: after[category_id]["name"] == "Renomeada"
+
+
+async def _delete(repo, user_uuid, categories):
+    category_id = next(iter(categories))
+    await repo.delete(user_uuid, category_id)
+    return lambda after: category_id not in after
+
+
+async def _bulk_create(repo, user_uuid, categories):
+    rows = await repo.bulk_create(user_uuid, [
+        {"name": "Lote 1", "type": "variavel"},
+        {"name": "Lote 2", "type": "fixa"},
+    ])
+    return lambda after: {r["id"] for r in rows} <= after.keys()
+
+
+@pytest.mark.parametrize("write", [_create, _update, _delete, _bulk_create], ids=lambda f: f.__name__[1:])
+async def test_category_writes_invalidate_redis(app_harness, redis_cache, redis_client, write):
+    _, _, sessions = app_harness
+    user_uuid = sessions[0].user.user_uuid
+    # Dois workers: o que escreve e o que lê compartilham só o Redis
+    writer = CategoryRepository(supabase_registry.client)
+    reader = CategoryRepository(supabase_registry.client)
+
+    before = await reader.get_categories_map(user_uuid)
+    assert before
+    assert await redis_client.exists(f"clarix:categories:{user_uuid}")
+
+    applied = await write(writer, user_uuid, before)
+
+    assert not await redis_client.exists(f"clarix:categories:{user_uuid}")
+    assert applied(await reader.get_categories_map(user_uuid))
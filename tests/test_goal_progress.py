@@ -0,0 +1,67 @@
+"""PATCH /goals/{id}/progress concorrente via RPC add_goal_progress."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.repositories.base import BaseRepository
+from bench.runner import RunConfig
+from bench.seed import SeedConfig
+
+pytestmark = pytest.mark.anyio
+
+CALLS = 50
+
+
+@pytest.fixture(params=[True, False], ids=["async", "sync"])
+def run_config(request) -> RunConfig:
+    # Latência no fake intercala as requisições, como num banco real
+    return RunConfig(
+        async_client=request.param,
+        db_latency_ms=2,
+        seed=SeedConfig(users=1, transactions_per_user=10, months=1),
+    )
+
+
+def _goal(fake, session, goal_id: int) -> dict:
+    return next(r for r in fake.user_rows("goals", session.user.user_uuid) if r["id"] == goal_id)
+
+
+async def test_concurrent_progress_loses_no_updates(app_harness):
+    client, fake, sessions = app_harness
+    session = sessions[0]
+    goal_id = session.user.goal_ids[0]
+    goal = _goal(fake, session, goal_id)
+    goal["target_amount"] = 10**9  # não conclui no meio
+    before = goal["current_amount"]
+
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    responses = await asyncio.gather(*(
+        client.patch(f"/api/v1/goals/{goal_id}/progress", json={"amount": 1.25}, headers=headers)
+        for _ in range(CALLS)
+    ))
+
+    assert [r.status_code for r in responses] == [200] * CALLS
+    assert "add_goal_progress" not in BaseRepository._missing_rpcs
+    assert goal["current_amount"] == pytest.approx(before + CALLS * 1.25)
+    # Cada resposta viu um valor diferente: nenhum incremento sobrescreveu outro
+    seen = {r.json()["current_amount"] for r in responses}
+    assert len(seen) == CALLS
+
+
+async def test_concurrent_progress_completes_goal_once(app_harness):
+    client, fake, sessions = app_harness
+    session = sessions[0]
+    goal_id = session.user.goal_ids[0]
+    goal = _goal(fake, session, goal_id)
+    goal.update(current_amount=0.0, target_amount=CALLS / 2, is_completed=False)
+
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    await asyncio.gather(*(
+        client.patch(f"/api/v1/goals/{goal_id}/progress", json={"amount": 1.0}, headers=headers)
+        for _ in range(CALLS)
+    ))
+
+    assert goal["current_amount"] == pytest.approx(CALLS)
+    assert goal["is_completed"] is True
@@ -0,0 +1,57 @@
+"""Estatísticas das consultas ao Supabase: rótulo por método e bytes recebidos."""
+from __future__ import annotations
+
+import gzip
+import json
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import query_stats
+
+pytestmark = pytest.mark.anyio
+
+
+def _count(caller: str, operation: str) -> float:
+    labels = {"caller": caller, "operation": operation}
+    return REGISTRY.get_sample_value("supabase_query_duration_seconds_count", labels) or 0.0
+
+
+async def test_queries_on_the_same_table_are_labelled_by_method(app_harness):
+    client, _, sessions = app_harness
+    session = sessions[0]
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    callers = [
+        ("TransactionRepository.list_by_user", "select"),
+        ("TransactionRepository.count_by_user", "count"),
+        ("TransactionRepository.get_by_id", "select"),
+    ]
+    before = {c: _count(*c) for c in callers}
+
+    await client.get("/api/v1/transactions/", headers=headers)
+    await client.get(f"/api/v1/transactions/{session.user.transaction_ids[0]}", headers=headers)
+
+    for caller in callers:
+        assert _count(*caller) == before[caller] + 1, caller
+
+
+@pytest.mark.parametrize("encoding", ["chunked", "gzip"])
+async def test_bytes_count_the_decoded_body(encoding):
+    body = json.dumps([{"id": i, "amount": 10.5} for i in range(500)]).encode()
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if encoding == "gzip":
+            return httpx.Response(200, content=gzip.compress(body), headers={"content-encoding": "gzip"})
+        return httpx.Response(200, content=chunks())  # sem Content-Length
+
+    async def chunks():
+        yield body[:1000]
+        yield body[1000:]
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handle), event_hooks=query_stats.event_hooks(True)) as client:
+        counter = query_stats.begin_query()
+        response = await client.get("http://supabase.test/rest/v1/transactions")
+
+    assert response.json()[0]["id"] == 0
+    assert counter[0] == len(body)
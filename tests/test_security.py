@@ -0,0 +1,86 @@
+"""JWKSCache: cliente HTTP reaproveitado e chaves antigas servidas quando a busca falha."""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import JWKSCache
+
+pytestmark = pytest.mark.anyio
+
+
+def _jwks(kid: str) -> dict:
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(ec.generate_private_key(ec.SECP256R1()).public_key()))
+    jwk.update(kid=kid, alg="ES256", use="sig")
+    return {"keys": [jwk]}
+
+
+class _Server:
+    """JWKS servido por MockTransport; `body` troca a resposta seguinte."""
+
+    def __init__(self) -> None:
+        self.body: bytes = json.dumps(_jwks("k1")).encode()
+        self.status = 200
+        self.requests = 0
+        self.transport = httpx.MockTransport(self._handle)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return httpx.Response(self.status, content=self.body, headers={"content-type": "application/json"})
+
+
+@pytest.fixture
+async def server_and_cache():
+    server = _Server()
+    cache = JWKSCache(transport=server.transport)
+    yield server, cache
+    await cache.close()
+
+
+async def test_refreshes_reuse_one_client(server_and_cache):
+    server, cache = server_and_cache
+    await cache.refresh()
+    client = cache._client
+    await cache.refresh()
+
+    assert server.requests == 2
+    assert cache._client is client
+    await cache.close()
+    assert client.is_closed
+
+
+@pytest.mark.parametrize("body,status", [
+    (b"<html>erro</html>", 200),   # ValueError: não é JSON
+    (b'{"chaves": []}', 200),      # formato inesperado
+    (b'["k1"]', 200),
+    (b"{}", 502),                  # httpx.HTTPStatusError
+])
+async def test_background_refresh_failure_keeps_stale_keys(server_and_cache, monkeypatch, body, status):
+    server, cache = server_and_cache
+    await cache.refresh()
+    key = await cache.get_key("k1")
+
+    server.body, server.status = body, status
+    monkeypatch.setattr(settings, "SUPABASE_JWKS_TTL", 0)
+    assert await cache.get_key("k1") is key
+    await asyncio.sleep(0)
+    await cache._refresh_task
+
+    assert server.requests == 2
+    assert await cache.get_key("k1") is key
+
+
+async def test_unknown_kid_with_broken_jwks_is_503(server_and_cache):
+    server, cache = server_and_cache
+    server.body = b"nao e json"
+
+    with pytest.raises(HTTPException) as exc:
+        await cache.get_key("k1")
+    assert exc.value.status_code == 503
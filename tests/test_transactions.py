@@ -0,0 +1,44 @@
+"""GET /transactions/{id} e export: mesmas colunas e export completo."""
+from __future__ import annotations
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_by_id_returns_payment_method(app_harness):
+    client, fake, sessions = app_harness
+    session = sessions[0]
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    transaction_id = session.user.transaction_ids[0]
+    row = next(r for r in fake.user_rows("transactions", session.user.user_uuid) if r["id"] == transaction_id)
+    row["payment_method"] = "pix"
+
+    single = await client.get(f"/api/v1/transactions/{transaction_id}", headers=headers)
+    listed = await client.get("/api/v1/transactions/", params={"limit": 100}, headers=headers)
+
+    assert single.json()["payment_method"] == "pix"
+    assert next(t for t in listed.json()["data"] if t["id"] == transaction_id)["payment_method"] == "pix"
+
+
+async def test_export_is_complete_when_max_rows_caps_the_page(app_harness, monkeypatch):
+    from app.core.config import settings
+    from app.repositories.transaction_repository import TransactionRepository
+
+    client, fake, sessions = app_harness
+    session = sessions[0]
+    headers = {"Authorization": f"Bearer {session.access_token}"}
+    list_by_user = TransactionRepository.list_by_user
+
+    async def capped(self, *args, **kwargs):
+        # PostgREST com max-rows = 7, abaixo do bloco do export
+        return (await list_by_user(self, *args, **kwargs))[:7]
+
+    monkeypatch.setattr(settings, "TRANSACTION_EXPORT_CHUNK_SIZE", 10)
+    monkeypatch.setattr(TransactionRepository, "list_by_user", capped)
+
+    response = await client.get("/api/v1/transactions/export", params={"format": "ndjson"}, headers=headers)
+
+    lines = response.text.splitlines()
+    assert len(lines) == len(fake.user_rows("transactions", session.user.user_uuid))
+    assert len({line for line in lines}) == len(lines)